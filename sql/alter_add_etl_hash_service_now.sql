@@ -0,0 +1,22 @@
+-- alter_add_etl_hash_service_now.sql
+-- Adiciona a coluna etl_hash (hash do conteúdo da linha calculado na extração)
+-- nas tabelas do ServiceNow que ainda não a possuem. As models são managed=False,
+-- então a coluna precisa ser criada manualmente no banco nid_qa.
+
+IF COL_LENGTH('dbo.incident', 'etl_hash') IS NULL
+BEGIN
+    ALTER TABLE dbo.incident ADD etl_hash NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL;
+END
+ELSE
+BEGIN
+    PRINT 'A coluna dbo.incident.etl_hash já existe.';
+END
+
+IF COL_LENGTH('dbo.groups', 'etl_hash') IS NULL
+BEGIN
+    ALTER TABLE dbo.groups ADD etl_hash NVARCHAR(MAX) COLLATE SQL_Latin1_General_CP1_CI_AS NULL;
+END
+ELSE
+BEGIN
+    PRINT 'A coluna dbo.groups.etl_hash já existe.';
+END
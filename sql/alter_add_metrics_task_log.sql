@@ -0,0 +1,61 @@
+-- alter_add_metrics_task_log.sql
+-- Adiciona à dbo.task_log as colunas de métricas gravadas por MixinTaskLog
+-- (capacity_datacenter.utils.task_log) e o índice (task_name, run_at) usado pelo
+-- endpoint de tendência (task-logs/trend/). Logs antigos ficam com as colunas NULL.
+SET NOCOUNT ON;
+
+DECLARE @sql NVARCHAR(MAX);
+
+CREATE TABLE #to_create (colname SYSNAME, coldef NVARCHAR(200));
+
+INSERT INTO #to_create VALUES
+('status','VARCHAR(20) NULL'),
+('finished_at','DATETIME2 NULL'),
+('duration_seconds','FLOAT NULL'),
+('extract_seconds','FLOAT NULL'),
+('transform_seconds','FLOAT NULL'),
+('delete_seconds','FLOAT NULL'),
+('insert_seconds','FLOAT NULL'),
+('rows_read','BIGINT NULL'),
+('rows_written','BIGINT NULL'),
+('bytes_fetched','BIGINT NULL'),
+('rows_per_second','FLOAT NULL');
+
+DECLARE cur CURSOR FOR SELECT colname, coldef FROM #to_create;
+OPEN cur;
+DECLARE @col SYSNAME, @coldef NVARCHAR(200);
+FETCH NEXT FROM cur INTO @col, @coldef;
+WHILE @@FETCH_STATUS = 0
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_NAME = 'task_log' AND COLUMN_NAME = @col
+    )
+    BEGIN
+        SET @sql = N'ALTER TABLE dbo.task_log ADD ' + QUOTENAME(@col) + ' ' + @coldef + ';';
+        PRINT @sql;
+        EXEC sp_executesql @sql;
+    END
+    ELSE
+    BEGIN
+        PRINT 'A coluna task_log.' + @col + ' já existe.';
+    END
+    FETCH NEXT FROM cur INTO @col, @coldef;
+END
+CLOSE cur;
+DEALLOCATE cur;
+DROP TABLE #to_create;
+GO
+
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'ix_task_log_task_run_at' AND object_id = OBJECT_ID('dbo.task_log')
+)
+BEGIN
+    CREATE INDEX ix_task_log_task_run_at ON dbo.task_log(task_name, run_at);
+END
+ELSE
+BEGIN
+    PRINT 'O índice ix_task_log_task_run_at já existe.';
+END
+GO
@@ -0,0 +1,36 @@
+-- Script para criar a tabela f_avaliacao_tecnica_node no SQL Server
+-- Local: src/capacity_datacenter/models -> f_avaliacao_tecnica_node
+-- Observações:
+--  - Uma linha por (node_id, date) com valor, classificação e nota de cada critério
+--  - Acrescenta colunas de auditoria ([created_at], [updated_at], [user])
+
+SET NOCOUNT ON;
+
+IF NOT EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[dbo].[f_avaliacao_tecnica_node]') AND type in (N'U'))
+BEGIN
+    CREATE TABLE [dbo].[f_avaliacao_tecnica_node](
+        [id] BIGINT IDENTITY(1,1) NOT NULL PRIMARY KEY,
+        [node_id] VARCHAR(100) NULL,
+        [date] DATE NOT NULL,
+        [tecnologia] VARCHAR(30) NULL,
+        [regiao] VARCHAR(10) NULL,
+        [latencia] FLOAT NULL,
+        [classificacao_latencia] VARCHAR(10) NULL,
+        [nota_latencia] SMALLINT NULL,
+        [jitter] FLOAT NULL,
+        [classificacao_jitter] VARCHAR(10) NULL,
+        [nota_jitter] SMALLINT NULL,
+        [perda_pacote] FLOAT NULL,
+        [classificacao_perda_pacote] VARCHAR(10) NULL,
+        [nota_perda_pacote] SMALLINT NULL,
+        [nota_total] SMALLINT NULL,
+        [created_at] DATETIME2 NULL,
+        [updated_at] DATETIME2 NULL,
+        [user] VARCHAR(255) NULL
+    );
+
+    CREATE NONCLUSTERED INDEX IX_f_avaliacao_tecnica_node_node_date ON [dbo].[f_avaliacao_tecnica_node]([node_id], [date]);
+END
+ELSE
+    PRINT 'Tabela f_avaliacao_tecnica_node já existe.';
+GO
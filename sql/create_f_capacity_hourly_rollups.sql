@@ -0,0 +1,57 @@
+-- Script para criar as tabelas de rollup horário do capacity_datacenter no SQL Server
+-- Local: src/capacity_datacenter/models -> f_interface_traffic_hourly, f_response_time_hourly
+-- Observações:
+--  - Uma linha por (node_id, date, hour) com média, máximo, p95 e nº de amostras
+--  - Acrescenta colunas de auditoria ([created_at], [updated_at], [user])
+
+SET NOCOUNT ON;
+
+IF NOT EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[dbo].[f_interface_traffic_hourly]') AND type in (N'U'))
+BEGIN
+    CREATE TABLE [dbo].[f_interface_traffic_hourly](
+        [id] BIGINT IDENTITY(1,1) NOT NULL PRIMARY KEY,
+        [node_id] VARCHAR(100) NULL,
+        [date] DATE NOT NULL,
+        [hour] SMALLINT NOT NULL,
+        [in_mean_bps] FLOAT NULL,
+        [in_max_bps] FLOAT NULL,
+        [in_p95_bps] FLOAT NULL,
+        [out_mean_bps] FLOAT NULL,
+        [out_max_bps] FLOAT NULL,
+        [out_p95_bps] FLOAT NULL,
+        [n_samples] INT NULL,
+        [created_at] DATETIME2 NULL,
+        [updated_at] DATETIME2 NULL,
+        [user] VARCHAR(255) NULL
+    );
+
+    CREATE NONCLUSTERED INDEX IX_f_interface_traffic_hourly_node_date ON [dbo].[f_interface_traffic_hourly]([node_id], [date], [hour]);
+END
+ELSE
+    PRINT 'Tabela f_interface_traffic_hourly já existe.';
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[dbo].[f_response_time_hourly]') AND type in (N'U'))
+BEGIN
+    CREATE TABLE [dbo].[f_response_time_hourly](
+        [id] BIGINT IDENTITY(1,1) NOT NULL PRIMARY KEY,
+        [node_id] VARCHAR(100) NULL,
+        [date] DATE NOT NULL,
+        [hour] SMALLINT NOT NULL,
+        [avg_response_time_mean] FLOAT NULL,
+        [avg_response_time_max] FLOAT NULL,
+        [avg_response_time_p95] FLOAT NULL,
+        [percent_loss_mean] FLOAT NULL,
+        [percent_loss_max] FLOAT NULL,
+        [percent_loss_p95] FLOAT NULL,
+        [n_samples] INT NULL,
+        [created_at] DATETIME2 NULL,
+        [updated_at] DATETIME2 NULL,
+        [user] VARCHAR(255) NULL
+    );
+
+    CREATE NONCLUSTERED INDEX IX_f_response_time_hourly_node_date ON [dbo].[f_response_time_hourly]([node_id], [date], [hour]);
+END
+ELSE
+    PRINT 'Tabela f_response_time_hourly já existe.';
+GO
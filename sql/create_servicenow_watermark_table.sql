@@ -0,0 +1,21 @@
+-- create_servicenow_watermark_table.sql
+-- Tabela de high-watermark da sincronização incremental do ServiceNow (banco nid_qa).
+-- Uma linha por tabela com o maior sys_updated_on (UTC) já gravado e a execução
+-- (servicenow_execution_log) que o avançou. A model é managed=False.
+
+IF OBJECT_ID('dbo.servicenow_watermark', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.servicenow_watermark (
+        id BIGINT IDENTITY(1,1) PRIMARY KEY NOT NULL,
+        table_name NVARCHAR(100) COLLATE SQL_Latin1_General_CP1_CI_AS NOT NULL,
+        watermark DATETIME2 NULL,
+        n_records INT NULL DEFAULT 0,
+        execution_log_id INT NULL,
+        updated_at DATETIME2 NULL,
+        CONSTRAINT uq_servicenow_watermark_table_name UNIQUE (table_name)
+    );
+END
+ELSE
+BEGIN
+    PRINT 'A tabela dbo.servicenow_watermark já existe.';
+END
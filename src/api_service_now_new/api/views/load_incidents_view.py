@@ -17,6 +17,8 @@ from ...tasks import (
     LoadIncidentTask,
     LoadIncidentTaskUpdated,
     LoadTaskTimeWorked,
+    SyncIncidentSlaIncremental,
+    SyncIncidentsIncremental,
 )
 
 logger = logging.getLogger(__name__)
@@ -40,6 +42,21 @@ class LoadIncidentsView(APIView):
     def post(self, request, *args, **kwargs) -> Response:
         data_inicio = request.data.get("data_inicio")
         data_fim = request.data.get("data_fim")
+        if request.data.get("modo") == "incremental":
+            # sync por watermark: data_inicio só é usada se ainda não houver watermark
+            patch_requests_ssl()
+            thread = threading.Thread(
+                target=self._run_incremental_in_background,
+                args=(data_inicio,),
+                daemon=True,
+            )
+            thread.start()
+            return Response(
+                {
+                    "status": "accepted",
+                    "message": "Incremental sync started in background",
+                }
+            )
         # se não informado, usar dia anterior
         if not data_inicio or not data_fim:
             ontem = (
@@ -205,3 +222,74 @@ class LoadIncidentsView(APIView):
                 )
             except Exception:
                 logger.exception("Falha ao salvar ServiceNowExecutionLog")
+
+    def _run_incremental_in_background(self, initial_date):
+        """Executa o sync incremental (watermark por `sys_updated_on`) de incident e incident_sla.
+
+        Cada tabela tem o próprio watermark, avançado só após a carga concluída; o id do
+        ServiceNowExecutionLog fica registrado junto ao watermark.
+        """
+        started_at = datetime.datetime.now()
+        results = {}
+        errors = []
+        exec_log = ServiceNowExecutionLog.objects.create(
+            execution_type="incremental",
+            started_at=started_at,
+            status="running",
+        )
+        sync_tasks = [
+            ("sync_incidents_incremental", SyncIncidentsIncremental),
+            ("sync_incident_sla_incremental", SyncIncidentSlaIncremental),
+        ]
+        threads = []
+        for name, cls in sync_tasks:
+            th = threading.Thread(
+                target=self._run_sync_task,
+                args=(name, cls, initial_date, exec_log.id, results, errors),
+                daemon=True,
+            )
+            th.start()
+            threads.append(th)
+        for th in threads:
+            th.join()
+
+        total = datetime.datetime.now() - started_at
+        try:
+            exec_log.ended_at = datetime.datetime.now()
+            exec_log.duration_seconds = Decimal(
+                str(round(total.total_seconds(), 2))
+            )
+            exec_log.status = "error" if errors else "success"
+            exec_log.error_message = (
+                "; ".join(e for _, e in errors)[:1000] if errors else None
+            )
+            exec_log.total_records_processed = sum(
+                r.get("n_received", 0) for r in results.values() if r
+            )
+            exec_log.save(
+                update_fields=[
+                    "ended_at",
+                    "duration_seconds",
+                    "status",
+                    "error_message",
+                    "total_records_processed",
+                ]
+            )
+        except Exception:
+            logger.exception("Falha ao salvar ServiceNowExecutionLog")
+
+    def _run_sync_task(
+        self, task_name, task_cls, initial_date, execution_log_id, results, errors
+    ):
+        try:
+            t0 = datetime.datetime.now()
+            with task_cls(
+                initial_date=initial_date, execution_log_id=execution_log_id
+            ) as sync:
+                results[task_name] = sync.run()
+            print(
+                f"[Incidents] Concluída: {task_name} em {self._fmt_hms(datetime.datetime.now() - t0)}"
+            )
+        except Exception as e:
+            logger.exception("Erro na task %s", task_name)
+            errors.append((task_name, str(e)))
@@ -0,0 +1,126 @@
+import random
+import time
+
+import polars as pl
+from django.core.management.base import BaseCommand
+
+from ...utils.servicenow import normalize_page, normalize_records
+
+
+class Command(BaseCommand):
+    help = (
+        "Micro-benchmark da normalização de páginas do ServiceNow: "
+        "normalize_records (linha a linha) x normalize_page (colunar)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000)
+        parser.add_argument("--columns", type=int, default=80)
+        parser.add_argument(
+            "--reference-columns",
+            type=int,
+            default=15,
+            help="Quantas colunas são referências ({'link': ..., 'value': ...})",
+        )
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        page = self._fake_page(
+            rows=options["rows"],
+            columns=options["columns"],
+            reference_columns=options["reference_columns"],
+        )
+        schema = {c: pl.String for c in page[0].keys()}
+
+        if not self._same_result(page + self._edge_cases(page[0]), schema):
+            self.stdout.write(
+                self.style.ERROR(
+                    "normalize_page diverge de normalize_records!"
+                )
+            )
+            return
+
+        legacy = self._measure(
+            lambda: pl.DataFrame(normalize_records(page), schema=schema),
+            repeat=options["repeat"],
+        )
+        columnar = self._measure(
+            lambda: normalize_page(page, schema=schema),
+            repeat=options["repeat"],
+        )
+
+        rows = options["rows"]
+        self.stdout.write(
+            f"normalize_records: {legacy:.3f}s ({rows / legacy:,.0f} linhas/s)"
+        )
+        self.stdout.write(
+            f"normalize_page:    {columnar:.3f}s ({rows / columnar:,.0f} linhas/s)"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Ganho: {legacy / columnar:.1f}x")
+        )
+
+    def _same_result(self, page, schema) -> bool:
+        """Os dois caminhos produzem o mesmo DataFrame (fora os carimbos etl_*)."""
+        etl = ["etl_created_at", "etl_updated_at"]
+        legacy = pl.DataFrame(normalize_records(page), schema=schema)
+        columnar = normalize_page(page, schema=schema)
+        return legacy.drop(etl, strict=False).equals(
+            columnar.drop(etl, strict=False)
+        )
+
+    def _edge_cases(self, template: dict) -> list:
+        """Referências sem URL ou com querystring/barra final e valores JSON não textuais."""
+        base_url = "https://instance.service-now.com/api/now/table/sys_user"
+        valores = [
+            {"value": "abc", "display_value": "Rede/Infra"},
+            {"value": "a?b", "display_value": "x/y?z"},
+            {},
+            {"link": f"{base_url}/abc123/?sysparm_view=x", "value": "abc123"},
+            {"display_value": "Rede", "url": f"{base_url}/def456"},
+        ]
+        key = next(k for k in template if k != "sys_id")
+        edge = [
+            {**template, "sys_id": f"edge{i}", key: valor}
+            for i, valor in enumerate(valores)
+        ]
+        # valores JSON que não são texto, na última coluna
+        last = list(template)[-1]
+        for i, valor in enumerate([True, False, 10, 1.5, 1e20]):
+            edge.append({**template, "sys_id": f"json{i}", last: valor})
+        return edge
+
+    def _measure(self, func, repeat: int) -> float:
+        """Melhor tempo entre `repeat` execuções."""
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def _fake_page(self, rows: int, columns: int, reference_columns: int):
+        """Gera registros no formato da Table API (strings, vazios e referências)."""
+        rnd = random.Random(42)
+        base_url = "https://instance.service-now.com/api/now/table/sys_user"
+        page = []
+        for i in range(rows):
+            record = {"sys_id": f"{i:032x}"}
+            for c in range(columns):
+                key = f"field_{c}"
+                if c < reference_columns:
+                    sys_id = f"{rnd.getrandbits(128):032x}"
+                    record[key] = (
+                        {"link": f"{base_url}/{sys_id}", "value": sys_id}
+                        if rnd.random() > 0.2
+                        else ""
+                    )
+                else:
+                    record[key] = (
+                        f"valor {rnd.randint(0, 1000)}"
+                        if rnd.random() > 0.3
+                        else ""
+                    )
+            page.append(record)
+        return page
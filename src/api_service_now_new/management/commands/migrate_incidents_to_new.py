@@ -6,7 +6,7 @@ from django.db import models, transaction
 from django.utils import timezone
 
 from ...models import Incident, IncidentNew
-from ...utils.servicenow import parse_datetime
+from ...utils.servicenow import INCIDENT_DATETIME_COLUMNS, coerce_datetime
 
 
 class Command(BaseCommand):
@@ -49,21 +49,9 @@ class Command(BaseCommand):
                 infer_schema_length=CHUNK_SIZE,
             )
 
-            date_cols = [
-                "opened_at",
-                "closed_at",
-                "resolved_at",
-                "u_fim_indisponibilidade",
-                "u_data_normalizacao_servico",
-            ]
-            for c in date_cols:
-                if c in df.columns:
-                    self.stdout.write(f"Normalizando a coluna: {c}")
-                    df = df.with_columns(
-                        pl.col(c)
-                        .map_elements(parse_datetime, return_dtype=pl.Datetime)
-                        .alias(c)
-                    )
+            date_cols = [c for c in INCIDENT_DATETIME_COLUMNS if c in df.columns]
+            self.stdout.write(f"Normalizando as colunas: {', '.join(date_cols)}")
+            df = df.with_columns([coerce_datetime(c) for c in date_cols])
 
             self._save(dataset=df, model=IncidentNew)
 
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.10 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_service_now_new', '0005_alter_incident_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='groups',
+            name='etl_hash',
+            field=models.TextField(blank=True, db_collation='SQL_Latin1_General_CP1_CI_AS', null=True),
+        ),
+        migrations.AddField(
+            model_name='incident',
+            name='etl_hash',
+            field=models.TextField(blank=True, db_collation='SQL_Latin1_General_CP1_CI_AS', null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.10 on 2026-10-18 11:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_service_now_new', '0006_groups_etl_hash_incident_etl_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServiceNowWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table_name', models.CharField(db_collation='SQL_Latin1_General_CP1_CI_AS', max_length=100, unique=True)),
+                ('watermark', models.DateTimeField(blank=True, null=True)),
+                ('n_records', models.IntegerField(default=0, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, null=True)),
+                ('execution_log', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='watermarks', to='api_service_now_new.servicenowexecutionlog')),
+            ],
+            options={
+                'db_table': 'servicenow_watermark',
+                'managed': False,
+            },
+        ),
+    ]
@@ -8,6 +8,7 @@ from .incident_sla import IncidentSla
 from .incident_task import IncidentTask
 from .f_incident import FIncident
 from .servicenow_execution_log import ServiceNowExecutionLog
+from .servicenow_watermark import ServiceNowWatermark
 from .sys_company import SysCompany
 from .sys_user import SysUser
 from .task_time_worked import TaskTimeWorked
@@ -21,6 +22,7 @@ __all__ = [
     "IncidentTask",
     "FIncident",
     "ServiceNowExecutionLog",
+    "ServiceNowWatermark",
     "SysCompany",
     "SysUser",
     "CmdbCiNetworkLink",
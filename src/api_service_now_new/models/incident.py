@@ -232,6 +232,7 @@ class Incident(models.Model):
         auto_now_add=True, null=True, blank=True
     )
     etl_updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
+    etl_hash = models.TextField(null=True, blank=True, db_collation=COLLATION)
 
     class Meta:
         managed = False
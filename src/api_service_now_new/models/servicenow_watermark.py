@@ -0,0 +1,28 @@
+from django.db import models
+
+from .servicenow_execution_log import ServiceNowExecutionLog
+
+COLLATION = "SQL_Latin1_General_CP1_CI_AS"
+
+
+class ServiceNowWatermark(models.Model):
+    """High-watermark da sincronização incremental: maior `sys_updated_on` já gravado por tabela."""
+
+    table_name = models.CharField(
+        max_length=100, unique=True, db_collation=COLLATION
+    )
+    watermark = models.DateTimeField(null=True, blank=True)
+    n_records = models.IntegerField(default=0, null=True)
+    execution_log = models.ForeignKey(
+        ServiceNowExecutionLog,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        db_constraint=False,
+        related_name="watermarks",
+    )
+    updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
+
+    class Meta:
+        managed = False
+        db_table = "servicenow_watermark"
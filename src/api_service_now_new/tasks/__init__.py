@@ -14,6 +14,7 @@ from .load_incidents_updated import LoadIncidentsUpdated
 from .load_sys_company import LoadSysCompany
 from .load_sys_user import LoadSysUser
 from .load_task_time_worked import LoadTaskTimeWorked
+from .sync_incremental import SyncIncidentSlaIncremental, SyncIncidentsIncremental
 
 __all__ = [
     "LoadIncidentsOpened",
@@ -30,4 +31,6 @@ __all__ = [
     "LoadTaskTimeWorked",
     "LoadCmdbCiNetworkLink",
     "LoadFIncident",
+    "SyncIncidentsIncremental",
+    "SyncIncidentSlaIncremental",
 ]
@@ -3,10 +3,10 @@ from typing import Dict
 import polars as pl
 from celery import shared_task
 
-from app.utils import MixinGetDataset, Pipeline
+from app.utils import MixinGetDataset, Pipeline, merge_upsert
 
 from ..models import AstContract
-from ..utils.servicenow import paginate, upsert_by_sys_id
+from ..utils.servicenow import paginate
 
 
 class LoadAstContract(MixinGetDataset, Pipeline):
@@ -26,7 +26,7 @@ class LoadAstContract(MixinGetDataset, Pipeline):
 
     def run(self) -> Dict:
         self.extract_and_transform_dataset()
-        upsert_by_sys_id(dataset=self.dataset, model=AstContract, log=self.log)
+        merge_upsert(dataset=self.dataset, model=AstContract, log=self.log)
         return self.log
 
     def extract_and_transform_dataset(self) -> None:
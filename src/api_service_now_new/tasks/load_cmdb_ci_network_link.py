@@ -3,10 +3,15 @@ from typing import Dict
 import polars as pl
 from celery import shared_task
 
-from app.utils import MixinGetDataset, Pipeline
+from app.utils import (
+    MixinGetDataset,
+    Pipeline,
+    merge_upsert,
+    with_etl_hash,
+)
 
 from ..models import CmdbCiNetworkLink
-from ..utils.servicenow import paginate, upsert_by_sys_id
+from ..utils.servicenow import paginate
 
 
 class LoadCmdbCiNetworkLink(MixinGetDataset, Pipeline):
@@ -21,13 +26,13 @@ class LoadCmdbCiNetworkLink(MixinGetDataset, Pipeline):
 
     def run(self) -> Dict:
         self.extract_and_transform_dataset()
-        upsert_by_sys_id(
+        merge_upsert(
             dataset=self.dataset, model=CmdbCiNetworkLink, log=self.log
         )
         return self.log
 
     def extract_and_transform_dataset(self) -> None:
-        self.dataset = self._dataset
+        self.dataset = with_etl_hash(self._dataset)
 
     @property
     def _dataset(self) -> pl.DataFrame:
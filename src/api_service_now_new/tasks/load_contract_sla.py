@@ -3,10 +3,10 @@ from typing import Dict
 import polars as pl
 from celery import shared_task
 
-from app.utils import MixinGetDataset, Pipeline
+from app.utils import MixinGetDataset, Pipeline, merge_upsert
 
 from ..models import ContractSla
-from ..utils.servicenow import paginate, upsert_by_sys_id
+from ..utils.servicenow import paginate
 
 
 class LoadContractSla(MixinGetDataset, Pipeline):
@@ -26,7 +26,7 @@ class LoadContractSla(MixinGetDataset, Pipeline):
 
     def run(self) -> Dict:
         self.extract_and_transform_dataset()
-        upsert_by_sys_id(dataset=self.dataset, model=ContractSla, log=self.log)
+        merge_upsert(dataset=self.dataset, model=ContractSla, log=self.log)
         return self.log
 
     def extract_and_transform_dataset(self) -> None:
@@ -42,6 +42,7 @@ class LoadFIncident(MixinGetDataset, Pipeline, MixinQuerys):
             dataset=self.dataset,
             model=FIncident,
             filtro=self._opened_at_range,
+            mode="swap",
         )
         return self.log
 
@@ -3,10 +3,15 @@ from typing import Dict
 import polars as pl
 from celery import shared_task
 
-from app.utils import MixinGetDataset, Pipeline
+from app.utils import (
+    MixinGetDataset,
+    Pipeline,
+    merge_upsert,
+    with_etl_hash,
+)
 
 from ..models import Groups
-from ..utils.servicenow import paginate, upsert_by_sys_id
+from ..utils.servicenow import paginate
 
 
 class LoadGroups(MixinGetDataset, Pipeline):
@@ -21,12 +26,12 @@ class LoadGroups(MixinGetDataset, Pipeline):
 
     def run(self) -> Dict:
         self.extract_and_transform_dataset()
-        # usar utilitário genérico de upsert por sys_id
-        upsert_by_sys_id(dataset=self.dataset, model=Groups, log=self.log)
+        # upsert set-based (MERGE) por sys_id
+        merge_upsert(dataset=self.dataset, model=Groups, log=self.log)
         return self.log
 
     def extract_and_transform_dataset(self) -> None:
-        self.dataset = self._groups
+        self.dataset = with_etl_hash(self._groups)
 
     @property
     def _groups(self) -> pl.DataFrame:
@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, Iterator
 
 import polars as pl
 from celery import shared_task
@@ -6,12 +6,19 @@ from celery import shared_task
 from app.utils import MixinGetDataset, Pipeline
 
 from ..models import IncidentSla
-from ..utils.servicenow import ensure_datetime, paginate
+from ..utils.servicenow import (
+    DEFAULT_CONCURRENCY,
+    concat_batches,
+    ensure_datetime,
+    iter_paginate,
+)
 
 
 class LoadIncidentSla(MixinGetDataset, Pipeline):
     """Carrega incident_sla do ServiceNow paginado."""
 
+    load_backend = "fast"
+
     def __init__(self, start_date: str, end_date: str):
         self.start_date = start_date
         self.end_date = end_date
@@ -25,8 +32,12 @@ class LoadIncidentSla(MixinGetDataset, Pipeline):
         }
 
     def run(self) -> Dict:
-        self.extract_and_transform_dataset()
-        self.load(dataset=self.dataset, model=IncidentSla, filtro=self._filtro)
+        # grava cada página assim que chega (memória limitada ao tamanho da página)
+        self.load_batches(
+            batches=self._incident_sla_batches,
+            model=IncidentSla,
+            filtro=self._filtro,
+        )
         return self.log
 
     def extract_and_transform_dataset(self) -> None:
@@ -34,6 +45,14 @@ class LoadIncidentSla(MixinGetDataset, Pipeline):
 
     @property
     def _incident_sla(self) -> pl.DataFrame:
+        return concat_batches(self._incident_sla_batches, schema=self._schema)
+
+    @property
+    def _schema(self) -> dict:
+        return {f.name: pl.String for f in IncidentSla._meta.fields}
+
+    @property
+    def _incident_sla_batches(self) -> Iterator[pl.DataFrame]:
         fields = ",".join(
             [
                 f.name
@@ -43,18 +62,14 @@ class LoadIncidentSla(MixinGetDataset, Pipeline):
         )
         query = f"sys_created_on>={self.start_date} 00:00:00^sys_created_on<={self.end_date} 23:59:59^taskISNOTEMPTY^task.assignment_group.nameSTARTSWITHvita^ORtask.assignment_groupSTARTSWITHvivo b2b centro servi^sla.nameLIKE[vita^ORsla.nameLIKE[vgr^ORsla.nameLIKEbradesco^ORsla.nameLIKE[vgr^ORsla.nameLIKE"
         # query = f"task.closed_at>={self.start_date} 00:00:00^task.closed_at<={self.end_date} 23:59:59^taskISNOTEMPTY^task.assignment_group.nameSTARTSWITHvita^sla.nameLIKE[vita^ORsla.nameLIKE[vgr^ORsla.nameLIKEbradesco"
-        result_list = paginate(
+        return iter_paginate(
             path="task_sla",
             params={"sysparm_fields": fields, "sysparm_query": query},
-            mode="offset",
+            schema=self._schema,
             limit_param="sysparm_limit",
             offset_param="sysparm_offset",
             result_key="result",
-        )
-
-        return pl.DataFrame(
-            result_list,
-            schema={f.name: pl.String for f in IncidentSla._meta.fields},
+            concurrency=DEFAULT_CONCURRENCY,
         )
 
 
@@ -8,7 +8,7 @@ from django.utils import timezone
 from app.utils import MixinGetDataset, Pipeline
 
 from ..models import IncidentSla
-from ..utils.servicenow import ensure_datetime, paginate
+from ..utils.servicenow import DEFAULT_CONCURRENCY, ensure_datetime, paginate
 
 
 class LoadIncidentSlaUpdated(MixinGetDataset, Pipeline):
@@ -106,6 +106,7 @@ class LoadIncidentSlaUpdated(MixinGetDataset, Pipeline):
             limit_param="sysparm_limit",
             offset_param="sysparm_offset",
             result_key="result",
+            concurrency=DEFAULT_CONCURRENCY,
         )
 
         return pl.DataFrame(
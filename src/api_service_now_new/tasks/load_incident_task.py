@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, Iterator
 
 import polars as pl
 from celery import shared_task
@@ -6,7 +6,11 @@ from celery import shared_task
 from app.utils import MixinGetDataset, Pipeline
 
 from ..models import IncidentTask
-from ..utils.servicenow import ensure_datetime, paginate
+from ..utils.servicenow import (
+    concat_batches,
+    ensure_datetime,
+    iter_paginate,
+)
 
 
 class LoadIncidentTask(MixinGetDataset, Pipeline):
@@ -25,9 +29,11 @@ class LoadIncidentTask(MixinGetDataset, Pipeline):
         }
 
     def run(self) -> Dict:
-        self.extract_and_transform_dataset()
-        self.load(
-            dataset=self.dataset, model=IncidentTask, filtro=self._filtro
+        # grava cada página assim que chega (memória limitada ao tamanho da página)
+        self.load_batches(
+            batches=self._incident_task_batches,
+            model=IncidentTask,
+            filtro=self._filtro,
         )
         return self.log
 
@@ -36,6 +42,16 @@ class LoadIncidentTask(MixinGetDataset, Pipeline):
 
     @property
     def _incident_task(self) -> pl.DataFrame:
+        return concat_batches(
+            self._incident_task_batches, schema=self._schema
+        )
+
+    @property
+    def _schema(self) -> dict:
+        return {f.name: pl.String for f in IncidentTask._meta.fields}
+
+    @property
+    def _incident_task_batches(self) -> Iterator[pl.DataFrame]:
         # excluir campos de controle do ETL
         fields = ",".join(
             [
@@ -47,20 +63,15 @@ class LoadIncidentTask(MixinGetDataset, Pipeline):
 
         query = f"opened_at>={self.start_date} 00:00:00^opened_at<={self.end_date} 23:59:59^assignment_groupSTARTSWITHvita^ORassignment_groupSTARTSWITHvivo b2b centro servi"
 
-        result_list = paginate(
+        return iter_paginate(
             path="incident_task",
             params={"sysparm_fields": fields, "sysparm_query": query},
-            mode="offset",
+            schema=self._schema,
             limit_param="sysparm_limit",
             offset_param="sysparm_offset",
             result_key="result",
         )
 
-        return pl.DataFrame(
-            result_list,
-            schema={f.name: pl.String for f in IncidentTask._meta.fields},
-        )
-
 
 @shared_task(
     name="api_service_now_new.load_incident_task_async",
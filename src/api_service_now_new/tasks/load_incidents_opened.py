@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, Iterator
 
 import polars as pl
 from celery import shared_task
@@ -6,7 +6,14 @@ from celery import shared_task
 from app.utils import MixinGetDataset, Pipeline
 
 from ..models import Incident
-from ..utils.servicenow import ensure_datetime, paginate, parse_datetime
+from ..utils.servicenow import (
+    DEFAULT_CONCURRENCY,
+    INCIDENT_DATETIME_COLUMNS,
+    coerce_datetime,
+    concat_batches,
+    ensure_datetime,
+    iter_paginate,
+)
 
 
 class LoadIncidentsOpened(MixinGetDataset, Pipeline):
@@ -30,34 +37,37 @@ class LoadIncidentsOpened(MixinGetDataset, Pipeline):
         }
 
     def run(self) -> Dict:
-        """Método principal: executa extração, persiste via `self.load` e retorna o log."""
-        self.extract_and_transform_dataset()
-        self.load(dataset=self.dataset, model=Incident, filtro=self._filtro)
+        """Método principal: extrai e persiste página a página via `self.load_batches` e retorna o log."""
+        self.load_batches(
+            batches=map(self._transform, self._incident_batches),
+            model=Incident,
+            filtro=self._filtro,
+        )
         return self.log
 
     def extract_and_transform_dataset(self) -> None:
         """Preenche `self.dataset` a partir da property `_incidents` (polars DataFrame)."""
-        self.dataset = self._incidents.with_columns(
-            pl.col("opened_at")
-            .map_elements(parse_datetime, return_dtype=pl.Datetime)
-            .alias("opened_at"),
-            pl.col("closed_at")
-            .map_elements(parse_datetime, return_dtype=pl.Datetime)
-            .alias("closed_at"),
-            pl.col("resolved_at")
-            .map_elements(parse_datetime, return_dtype=pl.Datetime)
-            .alias("resolved_at"),
-            pl.col("u_fim_indisponibilidade")
-            .map_elements(parse_datetime, return_dtype=pl.Datetime)
-            .alias("u_fim_indisponibilidade"),
-            pl.col("u_data_normalizacao_servico")
-            .map_elements(parse_datetime, return_dtype=pl.Datetime)
-            .alias("u_data_normalizacao_servico"),
+        self.dataset = self._transform(self._incidents)
+
+    def _transform(self, dataset: pl.DataFrame) -> pl.DataFrame:
+        return dataset.with_columns(
+            [coerce_datetime(c) for c in INCIDENT_DATETIME_COLUMNS]
         )
 
     @property
     def _incidents(self) -> pl.DataFrame:
         """Retorna o dataset `polars.DataFrame` de incidents paginado do ServiceNow filtrado por opened_at."""
+        return concat_batches(self._incident_batches, schema=self._schema)
+
+    @property
+    def _schema(self) -> dict:
+        return {
+            f.name: pl.String for f in Incident._meta.fields if f.name != "id"
+        }
+
+    @property
+    def _incident_batches(self) -> Iterator[pl.DataFrame]:
+        """Gera um `polars.DataFrame` por página de incidents do ServiceNow."""
         start_ts = ensure_datetime(self.start_date, end=False)
         end_ts = ensure_datetime(self.end_date, end=True)
 
@@ -78,21 +88,14 @@ class LoadIncidentsOpened(MixinGetDataset, Pipeline):
             "sysparm_fields": fields,
             "sysparm_display_value": "true",
         }
-        result_list = paginate(
+        return iter_paginate(
             path="incident",
             params=params,
-            mode="offset",
+            schema=self._schema,
             limit_param="sysparm_limit",
             offset_param="sysparm_offset",
             result_key="result",
-        )
-        return pl.DataFrame(
-            result_list,
-            schema={
-                f.name: pl.String
-                for f in Incident._meta.fields
-                if f.name != "id"
-            },
+            concurrency=DEFAULT_CONCURRENCY,
         )
 
 
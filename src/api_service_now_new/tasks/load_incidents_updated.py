@@ -5,10 +5,16 @@ from celery import shared_task
 from django.db import transaction
 from django.utils import timezone
 
-from app.utils import MixinGetDataset, Pipeline
+from app.utils import MixinGetDataset, Pipeline, with_etl_hash
 
 from ..models.incident import Incident
-from ..utils.servicenow import ensure_datetime, paginate, parse_datetime
+from ..utils.servicenow import (
+    DEFAULT_CONCURRENCY,
+    INCIDENT_DATETIME_COLUMNS,
+    coerce_datetime,
+    ensure_datetime,
+    paginate,
+)
 
 
 class LoadIncidentsUpdated(MixinGetDataset, Pipeline):
@@ -33,27 +39,12 @@ class LoadIncidentsUpdated(MixinGetDataset, Pipeline):
     def extract_and_transform_dataset(self) -> None:
         """Preenche `self.dataset` a partir da property `_incidents` (polars DataFrame)."""
         self.dataset = self._incidents.with_columns(
-            pl.col("opened_at")
-            .map_elements(parse_datetime, return_dtype=pl.Datetime)
-            .dt.strftime("%Y-%m-%d %H:%M:%S")
-            .alias("opened_at"),
-            pl.col("closed_at")
-            .map_elements(parse_datetime, return_dtype=pl.Datetime)
-            .dt.strftime("%Y-%m-%d %H:%M:%S")
-            .alias("closed_at"),
-            pl.col("resolved_at")
-            .map_elements(parse_datetime, return_dtype=pl.Datetime)
-            .dt.strftime("%Y-%m-%d %H:%M:%S")
-            .alias("resolved_at"),
-            pl.col("u_fim_indisponibilidade")
-            .map_elements(parse_datetime, return_dtype=pl.Datetime)
-            .dt.strftime("%Y-%m-%d %H:%M:%S")
-            .alias("u_fim_indisponibilidade"),
-            pl.col("u_data_normalizacao_servico")
-            .map_elements(parse_datetime, return_dtype=pl.Datetime)
-            .dt.strftime("%Y-%m-%d %H:%M:%S")
-            .alias("u_data_normalizacao_servico"),
+            [
+                coerce_datetime(c).dt.strftime("%Y-%m-%d %H:%M:%S")
+                for c in INCIDENT_DATETIME_COLUMNS
+            ]
         )
+        self.dataset = with_etl_hash(self.dataset)
 
     def load(self, dataset: pl.DataFrame, model) -> None:
         """Override: não faz delete+insert; apenas faz update dos registros por `sys_id`."""
@@ -67,6 +58,7 @@ class LoadIncidentsUpdated(MixinGetDataset, Pipeline):
         Estratégia:
         - Extrair sys_ids do dataset
         - Buscar as instâncias existentes em um único query
+        - Ignorar as linhas cujo `etl_hash` é igual ao já gravado
         - Atualizar atributos em memória e usar `bulk_update`
         """
         if dataset.is_empty():
@@ -92,11 +84,15 @@ class LoadIncidentsUpdated(MixinGetDataset, Pipeline):
         ]
 
         instances_to_update = []
+        n_unchanged = 0
         for row in rows:
             sid = row.get("sys_id")
             inst = existing_map.get(sid)
             if not inst:
                 continue
+            if row.get("etl_hash") and inst.etl_hash == row["etl_hash"]:
+                n_unchanged += 1
+                continue
             for k, v in row.items():
                 if k in updatable_fields:
                     # Garantir que valores não-string sejam convertidos para string
@@ -116,10 +112,12 @@ class LoadIncidentsUpdated(MixinGetDataset, Pipeline):
         finished = timezone.now()
         duration = round((finished - started).total_seconds(), 2)
         self.log["n_updated"] = len(instances_to_update)
+        self.log["n_unchanged"] = n_unchanged
         self.log["update_duration"] = duration
         print(
             f"...{len(instances_to_update)} REGISTROS ATUALIZADOS NO BANCO DE DADOS..."
         )
+        print(f"...{n_unchanged} REGISTROS SEM ALTERAÇÃO (etl_hash)...")
         print(f"...UPDATE DURATION: {duration}s...")
 
     @property
@@ -146,6 +144,7 @@ class LoadIncidentsUpdated(MixinGetDataset, Pipeline):
             limit_param="sysparm_limit",
             offset_param="sysparm_offset",
             result_key="result",
+            concurrency=DEFAULT_CONCURRENCY,
         )
         return pl.DataFrame(
             result_list,
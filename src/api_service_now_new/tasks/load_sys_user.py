@@ -3,10 +3,15 @@ from typing import Dict, List
 import polars as pl
 from celery import shared_task
 
-from app.utils import MixinGetDataset, Pipeline
+from app.utils import (
+    MixinGetDataset,
+    Pipeline,
+    merge_upsert,
+    with_etl_hash,
+)
 
 from ..models import Incident, SysUser
-from ..utils.servicenow import fetch_single_record, upsert_by_sys_id
+from ..utils.servicenow import fetch_records_by_ids, mark_fresh, stale_ids
 
 
 def _chunked(seq: List[str], size: int = 100) -> List[List[str]]:
@@ -25,11 +30,14 @@ class LoadSysUser(MixinGetDataset, Pipeline):
 
     def run(self) -> Dict:
         self.extract_and_transform_dataset()
-        upsert_by_sys_id(dataset=self.dataset, model=SysUser, log=self.log)
+        merge_upsert(dataset=self.dataset, model=SysUser, log=self.log)
+        mark_fresh(
+            model=SysUser, ids=self.dataset.get_column("sys_id").to_list()
+        )
         return self.log
 
     def extract_and_transform_dataset(self) -> None:
-        self.dataset = self._users
+        self.dataset = with_etl_hash(self._users)
 
     @property
     def _users(self) -> pl.DataFrame:
@@ -64,21 +72,17 @@ class LoadSysUser(MixinGetDataset, Pipeline):
                 schema={f.name: pl.String for f in SysUser._meta.fields}
             )
 
-        all_results: List[Dict] = []
-        for sid in ids:
-            rec = fetch_single_record(
-                path="sys_user", sys_id=sid, params={"sysparm_fields": fields}
-            )
-            if rec:
-                all_results.append(rec)
-
-        if not all_results:
-            return pl.DataFrame(
-                schema={f.name: pl.String for f in SysUser._meta.fields}
-            )
-
-        return pl.DataFrame(
-            all_results,
+        # só busca os ids ausentes ou com etl_updated_at antigo
+        stale = stale_ids(model=SysUser, ids=ids)
+        self.log["n_skipped_fresh"] = len(ids) - len(stale)
+        print(
+            f"...{len(stale)} IDS A BUSCAR, "
+            f"{self.log['n_skipped_fresh']} JÁ ATUALIZADOS..."
+        )
+        return fetch_records_by_ids(
+            path="sys_user",
+            ids=stale,
+            params={"sysparm_fields": fields},
             schema={f.name: pl.String for f in SysUser._meta.fields},
         )
 
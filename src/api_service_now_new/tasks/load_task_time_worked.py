@@ -1,12 +1,17 @@
-from typing import Dict
+from typing import Dict, Iterator
 
 import polars as pl
 from celery import shared_task
+from django.db import router
+from django.utils import timezone
 
-from app.utils import MixinGetDataset, Pipeline
+from app.utils import MixinGetDataset, Pipeline, merge_upsert, with_etl_hash
 
 from ..models import TaskTimeWorked
-from ..utils.servicenow import ensure_datetime, paginate
+from ..utils.servicenow import ensure_datetime, iter_paginate
+
+# sys_ids por DELETE (limite de 2100 parâmetros do SQL Server)
+DELETE_BATCH_SIZE = 2000
 
 
 class LoadTaskTimeWorked(MixinGetDataset, Pipeline):
@@ -25,17 +30,54 @@ class LoadTaskTimeWorked(MixinGetDataset, Pipeline):
         }
 
     def run(self) -> Dict:
-        self.extract_and_transform_dataset()
-        self.load(
-            dataset=self.dataset, model=TaskTimeWorked, filtro=self._filtro
+        """Upsert por `sys_id` página a página e, no fim, remove da janela os registros
+        que não vieram mais do ServiceNow.
+
+        Linhas com `etl_hash` igual ao gravado não são reescritas; só uma página
+        fica em memória (mais os `sys_id`s vistos).
+        """
+        started = timezone.now()
+        seen = set()
+        n_batches = 0
+        for batch in self._task_time_worked_batches:
+            seen.update(batch["sys_id"].drop_nulls().to_list())
+            merge_upsert(
+                dataset=with_etl_hash(batch),
+                model=TaskTimeWorked,
+                key="sys_id",
+                log=self.log,
+            )
+            n_batches += 1
+        self._delete_stale(seen)
+        self.log["n_batches"] = n_batches
+        self.log["load_duration"] = round(
+            (timezone.now() - started).total_seconds(), 2
         )
         return self.log
 
-    def extract_and_transform_dataset(self) -> None:
-        self.dataset = self._task_time_worked
+    def _delete_stale(self, seen: set) -> None:
+        """Deleta os registros da janela (`_filtro`) cujo `sys_id` não veio na carga."""
+        stale = [
+            sys_id
+            for sys_id in TaskTimeWorked.objects.filter(
+                **self._filtro
+            ).values_list("sys_id", flat=True)
+            if sys_id not in seen
+        ]
+        n_deleted = 0
+        for i in range(0, len(stale), DELETE_BATCH_SIZE):
+            n_deleted += TaskTimeWorked.objects.filter(
+                sys_id__in=stale[i : i + DELETE_BATCH_SIZE]
+            )._raw_delete(using=router.db_for_write(TaskTimeWorked))
+        self.log["n_deleted"] = n_deleted
+        print(f"...{n_deleted} REGISTROS FORA DA JANELA DELETADOS...")
+
+    @property
+    def _schema(self) -> dict:
+        return {f.name: pl.String for f in TaskTimeWorked._meta.fields}
 
     @property
-    def _task_time_worked(self) -> pl.DataFrame:
+    def _task_time_worked_batches(self) -> Iterator[pl.DataFrame]:
         fields = ",".join(
             [
                 f.name
@@ -46,20 +88,15 @@ class LoadTaskTimeWorked(MixinGetDataset, Pipeline):
 
         query = f"sys_created_on>={self.start_date} 00:00:00^sys_created_on<={self.end_date} 23:59:59^task.assignment_groupSTARTSWITHvita"
 
-        result_list = paginate(
+        return iter_paginate(
             path="task_time_worked",
             params={"sysparm_fields": fields, "sysparm_query": query},
-            mode="offset",
+            schema=self._schema,
             limit_param="sysparm_limit",
             offset_param="sysparm_offset",
             result_key="result",
         )
 
-        return pl.DataFrame(
-            result_list,
-            schema={f.name: pl.String for f in TaskTimeWorked._meta.fields},
-        )
-
 
 @shared_task(
     name="api_service_now_new.load_task_time_worked_async",
@@ -1,12 +1,27 @@
-import logging
 import os
-from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import polars as pl
 import requests
-from django.db import transaction
 from django.utils import timezone as dj_timezone
+from requests.adapters import HTTPAdapter
+
+from app.utils.merge_upsert import merge_upsert
+
+# limite de requisições simultâneas ao ServiceNow (também é o tamanho do pool HTTP)
+MAX_CONCURRENCY = int(os.getenv("SERVICE_NOW_MAX_CONCURRENCY", "8"))
+# concorrência usada pelas cargas grandes (incident, task_sla)
+DEFAULT_CONCURRENCY = int(os.getenv("SERVICE_NOW_CONCURRENCY", "4"))
+# ids por requisição `sys_idIN...` (mantém a URL bem abaixo do limite do ServiceNow)
+LOOKUP_CHUNK_SIZE = int(os.getenv("SERVICE_NOW_LOOKUP_CHUNK_SIZE", "100"))
+# registros de lookup (sys_user, core_company) mais novos que isso não são rebuscados
+LOOKUP_MAX_AGE_HOURS = int(os.getenv("SERVICE_NOW_LOOKUP_MAX_AGE_HOURS", "24"))
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
 
 
 def get_servicenow_env() -> Tuple[str, Tuple[str, str], Dict[str, str]]:
@@ -34,6 +49,101 @@ def ensure_datetime(s: str, end: bool = False) -> str:
     return s
 
 
+def get_servicenow_session() -> requests.Session:
+    """Session HTTP compartilhada (keep-alive + pool de conexões) para o ServiceNow."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1, pool_maxsize=MAX_CONCURRENCY
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+    return _session
+
+
+def _get(url: str, auth, headers, params: Dict) -> requests.Response:
+    resp = get_servicenow_session().get(
+        url, auth=auth, headers=headers, params=params
+    )
+    if resp.status_code != 200:
+        raise RuntimeError(f"API error: {resp.status_code} - {resp.text}")
+    return resp
+
+
+def _with_order_by(params: Dict, order_by: str = "sys_id") -> Dict:
+    """Garante ordenação estável (necessária para buscar offsets em paralelo)."""
+    query = params.get("sysparm_query") or ""
+    if "ORDERBY" in query:
+        return params
+    params = dict(params)
+    params["sysparm_query"] = (
+        f"{query}^ORDERBY{order_by}" if query else f"ORDERBY{order_by}"
+    )
+    return params
+
+
+def iter_offset_pages(
+    path: str,
+    params: Optional[Dict] = None,
+    limit: int = 10000,
+    limit_param: str = "sysparm_limit",
+    offset_param: str = "sysparm_offset",
+    result_key: str = "result",
+    concurrency: int = 1,
+) -> Iterator[List[Dict]]:
+    """Gera as páginas (listas de registros crus) de uma paginação por offset, em ordem.
+
+    Com `concurrency > 1`, a primeira página informa o total (`X-Total-Count`) e as
+    demais são buscadas em paralelo, `concurrency` páginas por vez, sobre a mesma
+    `requests.Session`. Sem o header de total, segue sequencial.
+    """
+    base_url, auth, headers = get_servicenow_env()
+    url = f"{base_url}/{path}"
+    params = dict(params or {})
+    concurrency = max(1, min(concurrency, MAX_CONCURRENCY))
+    if concurrency > 1:
+        params = _with_order_by(params)
+
+    def fetch(offset: int) -> Tuple[List[Dict], requests.Response]:
+        params_local = dict(params)
+        params_local[limit_param] = limit
+        params_local[offset_param] = offset
+        resp = _get(url, auth, headers, params_local)
+        return resp.json().get(result_key, []), resp
+
+    page, resp = fetch(0)
+    if not page:
+        return
+    yield page
+    print(f"...{limit} REGISTROS LIDOS...")
+
+    total = resp.headers.get("X-Total-Count")
+    if concurrency > 1 and total and total.isdigit():
+        offsets = list(range(limit, int(total), limit))
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for i in range(0, len(offsets), concurrency):
+                window = offsets[i : i + concurrency]
+                for offset, (page, _resp) in zip(
+                    window, executor.map(fetch, window)
+                ):
+                    if page:
+                        yield page
+                    print(f"...{offset + limit} REGISTROS LIDOS...")
+        return
+
+    offset = limit
+    while True:
+        page, _resp = fetch(offset)
+        if not page:
+            break
+        yield page
+        offset += limit
+        print(f"...{offset} REGISTROS LIDOS...")
+
+
 def paginate(
     path: str,
     params: Optional[Dict] = None,
@@ -44,6 +154,7 @@ def paginate(
     cursor_param: str = "startingAfter",
     cursor_field: Optional[str] = None,
     result_key: str = "result",
+    concurrency: int = 1,
 ) -> List[Dict]:
     """Paginação genérica para APIs REST.
 
@@ -51,42 +162,28 @@ def paginate(
     - `path` é concatenado a `base_url` como f"{base_url}/{path}".
     - `params` contém query params fixos (ex: {'sysparm_query': '...'}).
     - `cursor_field` (opcional) indica qual campo do último item usar como próximo cursor.
+    - `concurrency` (modo offset) quantas páginas buscar em paralelo (ver `iter_offset_pages`).
 
     Retorna lista completa de itens obtidos via `result_key` no JSON.
     """
     all_results = []
     params = dict(params or {})
 
-    # sempre pega env internamente (simplifica chamadas)
-    base_url, auth, headers = get_servicenow_env()
-
     if mode == "offset":
-        offset = 0
-        while True:
-            params_local = dict(params)
-            params_local[limit_param] = limit
-            params_local[offset_param] = offset
-
-            resp = requests.get(
-                f"{base_url}/{path}",
-                auth=auth,
-                headers=headers,
-                params=params_local,
-            )
-            if resp.status_code != 200:
-                raise RuntimeError(
-                    f"API error: {resp.status_code} - {resp.text}"
-                )
-
-            page = resp.json().get(result_key, [])
-            if not page:
-                break
-
+        for page in iter_offset_pages(
+            path=path,
+            params=params,
+            limit=limit,
+            limit_param=limit_param,
+            offset_param=offset_param,
+            result_key=result_key,
+            concurrency=concurrency,
+        ):
             all_results.extend(page)
-            offset += limit
-            print(offset)
 
     elif mode == "cursor":
+        # sempre pega env internamente (simplifica chamadas)
+        base_url, auth, headers = get_servicenow_env()
         cursor = None
         while True:
             params_local = dict(params)
@@ -94,16 +191,7 @@ def paginate(
             if cursor:
                 params_local[cursor_param] = cursor
 
-            resp = requests.get(
-                f"{base_url}/{path}",
-                auth=auth,
-                headers=headers,
-                params=params_local,
-            )
-            if resp.status_code != 200:
-                raise RuntimeError(
-                    f"API error: {resp.status_code} - {resp.text}"
-                )
+            resp = _get(f"{base_url}/{path}", auth, headers, params_local)
 
             page = resp.json().get(result_key, [])
             if not page:
@@ -125,14 +213,121 @@ def paginate(
             "Unsupported pagination mode: must be 'offset' or 'cursor'"
         )
 
-    # Se não houver resultados, retornar lista vazia
     if not all_results:
         return []
+    return normalize_page(all_results).to_dicts()
+
+
+def normalize_page(
+    records: List[Dict], schema: Optional[Dict] = None
+) -> pl.DataFrame:
+    """Versão colunar do `normalize_records`: monta um `pl.DataFrame` por página e normaliza com expressões.
+
+    - Campos de referência (dicts `{"link": ..., "value": ...}`) viram o último segmento
+      da URL (o sys_id), como em `flatten_reference_fields`; sem URL, o dict vira texto.
+    - Strings vazias (ou só com espaços) viram null; demais valores viram texto.
+    - `etl_created_at`/`etl_updated_at` recebem o mesmo timestamp ISO para a página.
+    - Com `schema`, o resultado é projetado nele (colunas ausentes viram null).
+    """
+    if not records:
+        return pl.DataFrame(schema=schema)
+
+    keys = tuple(records[0])
+    if all(tuple(record) == keys for record in records):
+        # caso comum (Table API): todas as linhas com as mesmas chaves na mesma ordem
+        data = dict(zip(keys, zip(*[record.values() for record in records])))
+    else:
+        keys = tuple(dict.fromkeys(key for record in records for key in record))
+        data = {key: [record.get(key) for record in records] for key in keys}
+    for key in ("etl_created_at", "etl_updated_at"):
+        data.pop(key, None)
+    columns = list(data)
+
+    for key, values in data.items():
+        types = set(map(type, values))
+        if dict not in types:
+            if not types <= {str, type(None)}:
+                # bool/número/lista viram texto como no `str()` do `normalize_records`
+                # ("True", não o "true" do cast do Polars)
+                data[key] = [
+                    v if v is None or v.__class__ is str else str(v)
+                    for v in values
+                ]
+            continue
+        if str in types and any(v for v in values if v.__class__ is str):
+            # coluna ora referência, ora texto: segue pelo caminho linha a linha
+            return pl.DataFrame(normalize_records(records), schema=schema)
+        data[key] = [
+            (
+                _reference_id(v)
+                if v.__class__ is dict
+                else None if v is None else str(v)
+            )
+            for v in values
+        ]
+
+    frame = pl.DataFrame(
+        data, schema={key: pl.String for key in columns}, strict=False
+    )
+    now_iso = dj_timezone.now().isoformat()
+    frame = frame.with_columns(
+        [_empty_to_null(pl.col(key)).alias(key) for key in columns]
+        + [
+            pl.lit(now_iso, dtype=pl.String).alias("etl_created_at"),
+            pl.lit(now_iso, dtype=pl.String).alias("etl_updated_at"),
+        ]
+    )
+
+    if schema is None:
+        return frame
+    return frame.select(
+        [
+            (
+                pl.col(name).cast(dtype)
+                if name in frame.columns
+                else pl.lit(None, dtype=dtype).alias(name)
+            )
+            for name, dtype in schema.items()
+        ]
+    )
+
+
+def _reference_id(value: dict) -> str:
+    """Valor de um campo de referência, como em `flatten_reference_fields`.
+
+    Com URL (mesma prioridade de chaves), o último segmento do caminho (o sys_id,
+    sem querystring e barra final); sem URL, o dict inteiro como texto.
+    """
+    for url_key in ("link", "url", "sys_href", "href"):
+        u = value.get(url_key)
+        if u and isinstance(u, str):
+            return u.split("?")[0].rstrip("/").split("/")[-1]
+    for v in value.values():
+        if isinstance(v, str) and (
+            v.startswith("http://") or v.startswith("https://")
+        ):
+            return v.split("?")[0].rstrip("/").split("/")[-1]
+    return str(value)
+
+
+def _empty_to_null(expr: pl.Expr) -> pl.Expr:
+    return pl.when(expr.str.strip_chars() == "").then(None).otherwise(expr)
+
+
+def normalize_records(records: List[Dict]) -> List[Dict]:  # deprecado
+    """Achata referências, converte valores para string (vazio -> None) e carimba etl_*.
+
+    Implementação linha a linha substituída por `normalize_page`; mantida como
+    referência para o benchmark `benchmark_servicenow_normalizer`.
+    """
+    # Se não houver resultados, retornar lista vazia
+    if not records:
+        return []
 
     # 1) Achatar referências e coletar todas as chaves existentes
     processed = []
     all_keys = set()
-    for result in all_results:
+    for result in records:
         if not result:
             continue
         flat = flatten_reference_fields(dict(result))
@@ -168,6 +363,42 @@ def paginate(
     return normalized
 
 
+def iter_paginate(
+    path: str,
+    params: Optional[Dict] = None,
+    schema: Optional[Dict] = None,
+    limit: int = 10000,
+    limit_param: str = "sysparm_limit",
+    offset_param: str = "sysparm_offset",
+    result_key: str = "result",
+    concurrency: int = 1,
+) -> Iterator[pl.DataFrame]:
+    """Versão em streaming do `paginate` (modo offset): gera um `pl.DataFrame` normalizado por página.
+
+    Apenas a página corrente (ou `concurrency` páginas, no modo paralelo) fica em memória.
+    """
+    for page in iter_offset_pages(
+        path=path,
+        params=params,
+        limit=limit,
+        limit_param=limit_param,
+        offset_param=offset_param,
+        result_key=result_key,
+        concurrency=concurrency,
+    ):
+        yield normalize_page(page, schema=schema)
+
+
+def concat_batches(
+    batches: Iterator[pl.DataFrame], schema: Dict
+) -> pl.DataFrame:
+    """Materializa os lotes do `iter_paginate` em um único DataFrame."""
+    frames = list(batches)
+    if not frames:
+        return pl.DataFrame(schema=schema)
+    return pl.concat(frames, how="vertical")
+
+
 def process_data(data: List[Dict]) -> List[Dict]:
     """Mantido para compatibilidade; agora apenas achata refs e retorna strings/None sem parse de datas."""
     out = []
@@ -222,6 +453,51 @@ def parse_datetime(value: str) -> Optional[datetime]:  # deprecado
         return None
 
 
+# formatos testados por `coerce_datetime`, na mesma ordem de `parse_datetime`
+DATETIME_FORMATS = (
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M",
+    "%Y-%m-%d %H:%M:%S%.f",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%dT%H:%M:%S%.f",
+    "%Y-%m-%d",
+)
+# formatos ISO com offset (ex.: `str()` de um datetime aware); convertidos para UTC
+DATETIME_TZ_FORMATS = (
+    "%Y-%m-%d %H:%M:%S%.f%:z",
+    "%Y-%m-%dT%H:%M:%S%.f%:z",
+)
+INCIDENT_DATETIME_COLUMNS = (
+    "opened_at",
+    "closed_at",
+    "resolved_at",
+    "u_fim_indisponibilidade",
+    "u_data_normalizacao_servico",
+)
+
+
+def coerce_datetime(column: str) -> pl.Expr:
+    """Versão vetorizada de `parse_datetime` para uma coluna de strings.
+
+    Cada formato é aplicado com `strict=False` (valor fora do formato vira NULL) e o
+    `coalesce` fica com o primeiro que converteu. Vazios e valores inválidos viram NULL;
+    horários com offset são convertidos para UTC sem timezone. Retorna `pl.Datetime("us")`.
+    """
+    value = pl.col(column).cast(pl.String).str.strip_chars()
+    return pl.coalesce(
+        [
+            value.str.to_datetime(fmt, time_unit="us", strict=False, exact=True)
+            for fmt in DATETIME_FORMATS
+        ]
+        + [
+            value.str.to_datetime(fmt, time_unit="us", strict=False, exact=True)
+            .dt.convert_time_zone("UTC")
+            .dt.replace_time_zone(None)
+            for fmt in DATETIME_TZ_FORMATS
+        ]
+    ).alias(column)
+
+
 def coerce_dates_in_dict(d: dict) -> dict:  # deprecado
     return d
 
@@ -284,7 +560,7 @@ def fetch_single_record(
     else:
         url = f"{base_url.rstrip('/')}/{path.lstrip('/')}"
 
-    resp = requests.get(
+    resp = get_servicenow_session().get(
         url, auth=auth, headers=headers, params=params, timeout=timeout
     )
     if resp.status_code == 404:
@@ -300,88 +576,113 @@ def fetch_single_record(
     return process_data([result])[0]
 
 
-@transaction.atomic
+def fetch_records_by_ids(
+    path: str,
+    ids: List[str],
+    params: Optional[Dict] = None,
+    schema: Optional[Dict] = None,
+    chunk_size: int = LOOKUP_CHUNK_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: int = 60,
+) -> pl.DataFrame:
+    """Busca vários registros por `sys_id` em lotes de `sys_idIN...`.
+
+    Substitui um `fetch_single_record` por id: cada lote de `chunk_size` ids vira uma
+    única requisição e os lotes são buscados em paralelo (`concurrency`) sobre a
+    `requests.Session` compartilhada. Ids inexistentes simplesmente não voltam.
+    Retorna um `pl.DataFrame` normalizado (ver `normalize_page`).
+    """
+    ids = sorted({i for i in ids if i})
+    if not ids:
+        return pl.DataFrame(schema=schema)
+    base_url, auth, headers = get_servicenow_env()
+    url = f"{base_url.rstrip('/')}/{path.lstrip('/')}"
+    params = dict(params or {})
+    concurrency = max(1, min(concurrency, MAX_CONCURRENCY))
+
+    def fetch(chunk: List[str]) -> List[Dict]:
+        params_local = dict(params)
+        params_local["sysparm_query"] = f"sys_idIN{','.join(chunk)}"
+        params_local["sysparm_limit"] = len(chunk)
+        resp = get_servicenow_session().get(
+            url, auth=auth, headers=headers, params=params_local, timeout=timeout
+        )
+        if resp.status_code != 200:
+            raise RuntimeError(f"API error: {resp.status_code} - {resp.text}")
+        return resp.json().get("result", [])
+
+    chunks = [ids[i : i + chunk_size] for i in range(0, len(ids), chunk_size)]
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        batches = [
+            normalize_page(records, schema=schema)
+            for records in executor.map(fetch, chunks)
+            if records
+        ]
+    print(
+        f"...{sum(len(b) for b in batches)} DE {len(ids)} REGISTROS [{path}] "
+        f"EM {len(chunks)} REQUISIÇÕES..."
+    )
+    return concat_batches(batches, schema=schema)
+
+
+def stale_ids(
+    model,
+    ids: List[str],
+    max_age: Optional[timedelta] = None,
+    key: str = "sys_id",
+    chunk_size: int = 2000,
+) -> List[str]:
+    """Filtra os ids que precisam ser buscados: ausentes na tabela local ou com
+    `etl_updated_at` mais antigo que `max_age` (padrão `LOOKUP_MAX_AGE_HOURS`)."""
+    ids = sorted({i for i in ids if i})
+    if max_age is None:
+        max_age = timedelta(hours=LOOKUP_MAX_AGE_HOURS)
+    cutoff = dj_timezone.now() - max_age
+    fresh = set()
+    for i in range(0, len(ids), chunk_size):
+        fresh.update(
+            model.objects.filter(
+                **{f"{key}__in": ids[i : i + chunk_size]},
+                etl_updated_at__gte=cutoff,
+            ).values_list(key, flat=True)
+        )
+    return [i for i in ids if i not in fresh]
+
+
+def mark_fresh(
+    model, ids: List[str], key: str = "sys_id", chunk_size: int = 2000
+) -> int:
+    """Carimba `etl_updated_at` dos ids consultados, inclusive os que não mudaram
+    (o MERGE só toca as linhas alteradas), para o `stale_ids` não buscá-los de novo."""
+    now = dj_timezone.now()
+    n = 0
+    for i in range(0, len(ids), chunk_size):
+        n += model.objects.filter(
+            **{f"{key}__in": ids[i : i + chunk_size]}
+        ).update(etl_updated_at=now)
+    return n
+
+
 def upsert_by_sys_id(
     dataset: pl.DataFrame, model, log: Optional[Dict] = None
-) -> None:
-    """Upsert simples por sys_id. Todos os campos (exceto PK) tratados como texto; sem conversões de data.
+) -> Dict[str, int]:
+    """Upsert por sys_id. Mantido por compatibilidade: delega para `app.utils.merge_upsert`.
 
-    Se o modelo possuir campos etl_created_at/etl_updated_at (DateTimeField) o banco preenche via auto_now/auto_now_add.
+    Aceita `pl.DataFrame` ou lista de dicionários; todos os campos são tratados como texto.
     """
     if dataset is None:
-        return
-    if isinstance(dataset, pl.DataFrame):
-        if dataset.is_empty():
-            return
-        rows = dataset.to_dicts()
-    elif isinstance(dataset, list):
-        rows = dataset
-    else:
-        try:
-            rows = list(dataset)
-        except Exception:
-            rows = []
-    if not rows:
-        return
-
-    field_names = {f.name for f in model._meta.fields}
-    pk_name = model._meta.pk.name
-    processed = []
-    for r in rows:
-        if not r:
-            continue
-        pr = {
-            k: (v if v != "" else None)
-            for k, v in r.items()
-            if k in field_names
-        }
-        if pr.get("sys_id"):
-            processed.append(pr)
-    if not processed:
-        return
-
-    existing = {
-        o.sys_id: o
-        for o in model.objects.filter(
-            sys_id__in=[r["sys_id"] for r in processed]
+        return merge_upsert(dataset=None, model=model, log=log)
+    if not isinstance(dataset, pl.DataFrame):
+        rows = [r for r in dataset if r]
+        dataset = pl.DataFrame(
+            rows,
+            schema={
+                f.name: pl.String
+                for f in model._meta.fields
+                if any(f.name in r for r in rows)
+            },
         )
-    }
-    to_create = []
-    to_update = []
-    for r in processed:
-        sid = r["sys_id"]
-        if sid in existing:
-            obj = existing[sid]
-            for k, v in r.items():
-                if k not in (pk_name,):
-                    setattr(obj, k, v)
-            to_update.append(obj)
-        else:
-            to_create.append(model(**r))
-
-    created = 0
-    if to_create:
-        created = len(model.objects.bulk_create(to_create, batch_size=1000))
-    if to_update:
-        update_fields = [
-            f for f in field_names if f not in (pk_name, "sys_id")
-        ]
-        if update_fields:
-            try:
-                model.objects.bulk_update(
-                    to_update, update_fields, batch_size=1000
-                )
-            except Exception:
-                for obj in to_update:
-                    try:
-                        obj.save(update_fields=update_fields)
-                    except Exception:
-                        logging.exception(
-                            "Falha update individual sys_id=%s",
-                            getattr(obj, "sys_id", None),
-                        )
-    if isinstance(log, dict):
-        log["n_inserted"] = log.get("n_inserted", 0) + created
+    return merge_upsert(dataset=dataset, model=model, key="sys_id", log=log)
 
 
 # parse_datetime acima substitui a versão antiga/errada
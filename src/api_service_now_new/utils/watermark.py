@@ -0,0 +1,65 @@
+import os
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from typing import Optional
+
+import polars as pl
+
+from ..models import ServiceNowWatermark
+from .servicenow import coerce_datetime
+
+# margem de segurança aplicada ao watermark (registros gravados no ServiceNow durante a
+# extração anterior); o upsert é idempotente, então reler alguns minutos é barato
+WATERMARK_OVERLAP_MINUTES = int(
+    os.getenv("SERVICE_NOW_WATERMARK_OVERLAP_MINUTES", "5")
+)
+
+
+def get_watermark(table_name: str) -> Optional[datetime]:
+    """Retorna o maior `sys_updated_on` (UTC) já gravado para a tabela ou None."""
+    return (
+        ServiceNowWatermark.objects.filter(table_name=table_name)
+        .values_list("watermark", flat=True)
+        .first()
+    )
+
+
+def save_watermark(
+    table_name: str,
+    watermark: Optional[datetime],
+    n_records: int = 0,
+    execution_log_id: Optional[int] = None,
+) -> None:
+    """Avança o watermark da tabela; nunca retrocede para um valor menor."""
+    if watermark is None:
+        return
+    current = get_watermark(table_name)
+    if current is not None and current >= watermark:
+        return
+    ServiceNowWatermark.objects.update_or_create(
+        table_name=table_name,
+        defaults={
+            "watermark": watermark,
+            "n_records": n_records,
+            "execution_log_id": execution_log_id,
+        },
+    )
+    print(f"...WATERMARK [{table_name}] AVANÇADO PARA {watermark}...")
+
+
+def max_updated_on(
+    dataset: pl.DataFrame, column: str = "sys_updated_on"
+) -> Optional[datetime]:
+    """Maior `sys_updated_on` do dataset (valores crus do ServiceNow, em UTC)."""
+    if dataset.is_empty() or column not in dataset.columns:
+        return None
+    value = dataset.select(coerce_datetime(column).max()).item()
+    return value.replace(tzinfo=dt_timezone.utc) if value else None
+
+
+def watermark_query(watermark: datetime, column: str = "sys_updated_on") -> str:
+    """Trecho do `sysparm_query` que busca apenas o que mudou desde o watermark."""
+    since = watermark.astimezone(dt_timezone.utc) - timedelta(
+        minutes=WATERMARK_OVERLAP_MINUTES
+    )
+    return f"{column}>={since:%Y-%m-%d %H:%M:%S}"
@@ -1,3 +1,7 @@
+from .cursor_frame import fetch_frame, read_frame
+from .etl_hash import drop_unchanged, with_etl_hash
+from .fast_loader import FastLoader
+from .merge_upsert import merge_upsert
 from .mixin_get_dataset import MixinGetDataset
 from .paginators import CustomLargePagination, CustomPagination
 from .pipeline import Pipeline
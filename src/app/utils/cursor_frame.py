@@ -0,0 +1,110 @@
+import datetime
+import decimal
+import os
+from typing import Dict, List, Optional
+
+import polars as pl
+
+# linhas por `fetchmany`: só um bloco de tuplas Python fica em memória por vez
+FETCH_CHUNK_SIZE = int(os.getenv("CURSOR_FETCH_CHUNK_SIZE", "50000"))
+
+# tipo Python informado em `cursor.description` (pyodbc) -> dtype Polars
+_DTYPES = {
+    str: pl.String,
+    int: pl.Int64,
+    float: pl.Float64,
+    decimal.Decimal: pl.Float64,
+    bool: pl.Boolean,
+    datetime.datetime: pl.Datetime("us"),
+    datetime.date: pl.Date,
+    datetime.time: pl.Time,
+    bytes: pl.Binary,
+    bytearray: pl.Binary,
+}
+
+
+def description_schema(description) -> Dict[str, pl.DataType]:
+    """Schema Polars a partir do `cursor.description` (tipos desconhecidos viram String)."""
+    return {col[0]: _DTYPES.get(col[1], pl.String) for col in description}
+
+
+def fetch_frame(
+    cursor,
+    schema: Optional[Dict[str, pl.DataType]] = None,
+    chunk_size: int = FETCH_CHUNK_SIZE,
+) -> pl.DataFrame:
+    """Lê o resultado do cursor direto para um `pl.DataFrame` tipado, em blocos de `fetchmany`.
+
+    - Sem `schema`, os dtypes vêm do `cursor.description` (Decimal -> Float64, datetime ->
+      Datetime, ...), sem passar por string.
+    - Com `schema`, as colunas são renomeadas/tipadas na ordem do SELECT.
+    """
+    if cursor.description is None:
+        return pl.DataFrame(schema=schema)
+    schema = list((schema or description_schema(cursor.description)).items())
+    frames: List[pl.DataFrame] = []
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        frames.append(
+            pl.DataFrame(
+                [tuple(r) for r in rows],
+                schema=schema,
+                orient="row",
+                strict=False,
+            )
+        )
+    if not frames:
+        return pl.DataFrame(schema=schema)
+    return pl.concat(frames, how="vertical", rechunk=True)
+
+
+def read_frame(
+    sql: str,
+    using: str = "default",
+    schema: Optional[Dict[str, pl.DataType]] = None,
+    chunk_size: int = FETCH_CHUNK_SIZE,
+) -> pl.DataFrame:
+    """Executa `sql` na conexão Django `using` e devolve o resultado com `fetch_frame`.
+
+    Se `arrow-odbc` estiver instalado e `ARROW_ODBC_CONNECTION_STRING` definido, a leitura
+    é colunar (lotes Arrow direto do driver ODBC, sem tuplas Python).
+    """
+    connection_string = os.getenv("ARROW_ODBC_CONNECTION_STRING")
+    if connection_string:
+        try:
+            from arrow_odbc import read_arrow_batches_from_odbc
+        except ImportError:
+            read_arrow_batches_from_odbc = None
+        if read_arrow_batches_from_odbc is not None:
+            return _read_arrow_odbc(
+                read_arrow_batches_from_odbc,
+                sql=sql,
+                connection_string=connection_string,
+                schema=schema,
+                chunk_size=chunk_size,
+            )
+
+    from django.db import connections
+
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql)
+        return fetch_frame(cursor, schema=schema, chunk_size=chunk_size)
+
+
+def _read_arrow_odbc(
+    reader, sql: str, connection_string: str, schema, chunk_size: int
+) -> pl.DataFrame:
+    batches = reader(
+        query=sql, connection_string=connection_string, batch_size=chunk_size
+    )
+    frames = [pl.from_arrow(batch) for batch in batches]
+    if not frames:
+        return pl.DataFrame(schema=schema)
+    frame = pl.concat(frames, how="vertical", rechunk=True)
+    if schema:
+        frame = frame.rename(dict(zip(frame.columns, schema))).cast(
+            schema, strict=False
+        )
+    return frame
@@ -0,0 +1,89 @@
+from typing import Dict, Iterable, List
+
+import polars as pl
+from django.db import models
+
+ETL_HASH_COLUMN = "etl_hash"
+ETL_HASH_SEPARATOR = "\x1f"
+
+
+def with_etl_hash(
+    dataset: pl.DataFrame, exclude: Iterable[str] = ()
+) -> pl.DataFrame:
+    """Adiciona a coluna `etl_hash` com o hash do conteúdo de cada linha.
+
+    O hash é calculado de forma vetorizada no Polars sobre todas as colunas que não
+    começam com `etl_` (em ordem alfabética), tratando NULL e string vazia como iguais.
+    É estável para a mesma versão do Polars; uma troca de versão apenas força uma
+    regravação completa na primeira carga.
+    """
+    if dataset.is_empty():
+        return dataset.with_columns(
+            pl.lit(None, dtype=pl.String).alias(ETL_HASH_COLUMN)
+        )
+    columns = sorted(
+        c
+        for c in dataset.columns
+        if not c.startswith("etl_") and c not in exclude
+    )
+    return dataset.with_columns(
+        pl.concat_str(
+            [pl.col(c).cast(pl.String).fill_null("") for c in columns],
+            separator=ETL_HASH_SEPARATOR,
+        )
+        .hash(seed=0)
+        .cast(pl.String)
+        .alias(ETL_HASH_COLUMN)
+    )
+
+
+def has_etl_hash(model: models.Model) -> bool:
+    return any(f.name == ETL_HASH_COLUMN for f in model._meta.concrete_fields)
+
+
+def stored_etl_hashes(
+    model: models.Model, key: str, ids: List[str], chunk_size: int = 2000
+) -> Dict[str, str]:
+    """Busca `{key: etl_hash}` já gravados na base, em blocos de `chunk_size` ids."""
+    stored = {}
+    for i in range(0, len(ids), chunk_size):
+        stored.update(
+            model.objects.filter(
+                **{f"{key}__in": ids[i : i + chunk_size]}
+            ).values_list(key, ETL_HASH_COLUMN)
+        )
+    return stored
+
+
+def drop_unchanged(
+    dataset: pl.DataFrame, model: models.Model, key: str = "sys_id"
+) -> pl.DataFrame:
+    """Remove do dataset as linhas cujo `etl_hash` é igual ao gravado na base.
+
+    Só atua quando todas as linhas têm `etl_hash` (ver `with_etl_hash`).
+    """
+    if (
+        dataset.is_empty()
+        or ETL_HASH_COLUMN not in dataset.columns
+        or dataset.get_column(ETL_HASH_COLUMN).null_count() > 0
+    ):
+        return dataset
+    stored = stored_etl_hashes(
+        model=model,
+        key=key,
+        ids=dataset.get_column(key).drop_nulls().unique().to_list(),
+    )
+    if not stored:
+        return dataset
+    stored_df = pl.DataFrame(
+        {key: list(stored.keys()), "_stored_hash": list(stored.values())},
+        schema={key: dataset.schema[key], "_stored_hash": pl.String},
+    )
+    return (
+        dataset.join(stored_df, on=key, how="left")
+        .filter(
+            pl.col("_stored_hash").is_null()
+            | (pl.col("_stored_hash") != pl.col(ETL_HASH_COLUMN))
+        )
+        .drop("_stored_hash")
+    )
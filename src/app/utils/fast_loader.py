@@ -0,0 +1,154 @@
+import json
+from datetime import timezone as dt_timezone
+from typing import List, Optional
+
+import polars as pl
+from django.db import connections, models, router, transaction
+from django.utils import timezone
+
+
+class FastLoader:
+    """Carga rápida de um `pl.DataFrame` em SQL Server via `fast_executemany`.
+
+    Não instancia objetos da model: o dataset é convertido para os tipos das
+    colunas no próprio Polars e enviado em lotes como arrays de parâmetros
+    tipados (`setinputsizes`) direto no cursor pyodbc da conexão da model.
+    """
+
+    def __init__(
+        self,
+        model: models.Model,
+        batch_size: int = 20000,
+        table: Optional[str] = None,
+    ):
+        self.model = model
+        self.batch_size = batch_size
+        self.table = table or model._meta.db_table
+        self.using = router.db_for_write(model)
+        self.connection = connections[self.using]
+
+    @classmethod
+    def is_supported(cls, model: models.Model) -> bool:
+        """Indica se a conexão da model permite a carga via pyodbc."""
+        try:
+            import pyodbc  # noqa: F401
+        except ImportError:
+            return False
+        return connections[router.db_for_write(model)].vendor == "microsoft"
+
+    def save(self, dataset: pl.DataFrame) -> int:
+        """Insere o dataset na tabela da model e retorna o total de linhas."""
+        fields = self._insert_fields(dataset)
+        self.columns = [f.column for f in fields]
+        frame = self._prepare(dataset=dataset, fields=fields)
+        qn = self.connection.ops.quote_name
+        sql = "INSERT INTO {table} ({columns}) VALUES ({params})".format(
+            table=qn(self.table),
+            columns=", ".join(qn(c) for c in self.columns),
+            params=", ".join("?" for _ in fields),
+        )
+        input_sizes = [self._input_size(f) for f in fields]
+
+        n_inserted = 0
+        with transaction.atomic(using=self.using):
+            self.connection.ensure_connection()
+            cursor = self.connection.connection.cursor()
+            cursor.fast_executemany = True
+            try:
+                for batch in frame.iter_slices(n_rows=self.batch_size):
+                    cursor.setinputsizes(input_sizes)
+                    cursor.executemany(sql, batch.rows())
+                    n_inserted += batch.height
+            finally:
+                cursor.close()
+        return n_inserted
+
+    def _insert_fields(self, dataset: pl.DataFrame) -> List[models.Field]:
+        """Colunas do INSERT: as do dataset mais as preenchidas pelo Django (auto_now/default)."""
+        fields = []
+        for f in self.model._meta.concrete_fields:
+            if f.name in dataset.columns or self._is_auto_timestamp(f):
+                fields.append(f)
+            elif isinstance(f, models.AutoField):
+                continue
+            elif f.has_default():
+                fields.append(f)
+        return fields
+
+    def _prepare(
+        self, dataset: pl.DataFrame, fields: List[models.Field]
+    ) -> pl.DataFrame:
+        """Projeta e converte o dataset para os tipos das colunas da tabela."""
+        now = timezone.now().astimezone(dt_timezone.utc).replace(tzinfo=None)
+        exprs = []
+        for f in fields:
+            if self._is_auto_timestamp(f):
+                # mesmo comportamento do pre_save do Django em um INSERT
+                exprs.append(pl.lit(now).alias(f.name))
+            elif f.name in dataset.columns:
+                exprs.append(
+                    self._cast(pl.col(f.name), f, dataset.schema[f.name])
+                )
+            elif f.has_default():
+                default = f.get_default()
+                if isinstance(f, models.JSONField):
+                    default = json.dumps(default)
+                exprs.append(pl.lit(default).alias(f.name))
+        return dataset.select(exprs)
+
+    @staticmethod
+    def _is_auto_timestamp(field: models.Field) -> bool:
+        return getattr(field, "auto_now", False) or getattr(
+            field, "auto_now_add", False
+        )
+
+    @staticmethod
+    def _cast(expr: pl.Expr, field: models.Field, dtype) -> pl.Expr:
+        if isinstance(field, models.JSONField):
+            return expr.map_elements(
+                lambda v: json.dumps(
+                    v.to_list() if isinstance(v, pl.Series) else v
+                ),
+                return_dtype=pl.String,
+                skip_nulls=False,
+            )
+        if isinstance(field, models.DateTimeField):
+            if dtype == pl.String:
+                return expr.str.to_datetime(strict=False)
+            if isinstance(dtype, pl.Datetime) and dtype.time_zone:
+                return expr.dt.convert_time_zone("UTC").dt.replace_time_zone(
+                    None
+                )
+            return expr
+        if isinstance(field, models.DateField):
+            if dtype == pl.String:
+                return expr.str.to_date(strict=False)
+            return expr.cast(pl.Date, strict=False)
+        if isinstance(field, (models.FloatField, models.DecimalField)):
+            return expr.cast(pl.Float64, strict=False)
+        if isinstance(field, models.BooleanField):
+            return expr.cast(pl.Boolean, strict=False)
+        if isinstance(field, models.IntegerField):
+            return expr.cast(pl.Int64, strict=False)
+        return expr.cast(pl.String)
+
+    @staticmethod
+    def _input_size(field: models.Field) -> tuple:
+        """Tipo SQL de cada parâmetro, evitando que o pyodbc infira pelo 1º valor."""
+        import pyodbc
+
+        if isinstance(field, models.JSONField):
+            return (pyodbc.SQL_WVARCHAR, 0, 0)
+        if isinstance(field, models.DateTimeField):
+            return (pyodbc.SQL_TYPE_TIMESTAMP, 27, 7)
+        if isinstance(field, models.DateField):
+            return (pyodbc.SQL_TYPE_DATE, 10, 0)
+        if isinstance(field, (models.FloatField, models.DecimalField)):
+            return (pyodbc.SQL_DOUBLE, 0, 0)
+        if isinstance(field, models.BooleanField):
+            return (pyodbc.SQL_BIT, 0, 0)
+        if isinstance(field, models.IntegerField):
+            return (pyodbc.SQL_BIGINT, 0, 0)
+        if isinstance(field, models.CharField) and field.max_length:
+            return (pyodbc.SQL_WVARCHAR, field.max_length, 0)
+        return (pyodbc.SQL_WVARCHAR, 0, 0)
@@ -0,0 +1,205 @@
+import uuid
+from typing import Dict, List, Optional, Sequence, Union
+
+import polars as pl
+from django.db import connections, models, router, transaction
+
+from .etl_hash import ETL_HASH_COLUMN, drop_unchanged, has_etl_hash
+
+# SQL Server aceita no máximo 2100 parâmetros por comando e 1000 linhas por VALUES
+MAX_PARAMS = 2000
+MAX_ROWS_PER_INSERT = 1000
+# carimbos da carga: não contam como mudança da linha; `etl_created_at` nunca é
+# sobrescrito e `etl_updated_at` só muda quando outra coluna mudou
+ETL_CREATED_AT = "etl_created_at"
+ETL_UPDATED_AT = "etl_updated_at"
+
+
+def merge_upsert(
+    dataset: pl.DataFrame,
+    model: models.Model,
+    key: Union[str, Sequence[str]] = "sys_id",
+    log: Optional[Dict] = None,
+) -> Dict[str, int]:
+    """Upsert set-based: carrega o lote numa tabela temporária e executa um único `MERGE`.
+
+    - `key` pode ser uma coluna ou uma chave composta (ex.: `("node_id", "date")`).
+    - Linhas sem `key` são descartadas e chaves repetidas mantêm a última ocorrência.
+    - Strings vazias viram NULL.
+    - Linhas existentes só são atualizadas se alguma coluna mudou (comparação NULL-safe
+      via `EXCEPT`); `auto_now`/`auto_now_add` são preenchidos com `SYSUTCDATETIME()`.
+    - `etl_created_at`/`etl_updated_at` (qualquer que seja o tipo do campo) ficam fora
+      da comparação: `etl_created_at` só é gravado no INSERT e `etl_updated_at` só é
+      atualizado junto com alguma outra coluna.
+    - Se a model tem `etl_hash` e o dataset traz o hash (`with_etl_hash`), as linhas com
+      hash igual ao gravado nem chegam à tabela temporária e o MERGE compara só o hash.
+
+    Retorna `{"n_inserted", "n_updated", "n_unchanged"}` e acumula os mesmos contadores em `log`.
+    """
+    counts = {"n_inserted": 0, "n_updated": 0, "n_unchanged": 0}
+    if dataset is None or dataset.is_empty():
+        return _update_log(log, counts)
+
+    keys = [key] if isinstance(key, str) else list(key)
+    fields = {f.name: f for f in model._meta.concrete_fields}
+    key_columns = [fields[k].column for k in keys]
+    auto_now = [f for f in fields.values() if getattr(f, "auto_now", False)]
+    auto_now_add = [
+        f for f in fields.values() if getattr(f, "auto_now_add", False)
+    ]
+    data_fields = [
+        fields[c]
+        for c in dataset.columns
+        if c in fields and fields[c] not in auto_now + auto_now_add
+    ]
+    dataset = dataset.select([f.name for f in data_fields])
+    dataset = (
+        dataset.with_columns(
+            [
+                pl.when(pl.col(c) == "").then(None).otherwise(pl.col(c)).alias(c)
+                for c, dtype in dataset.schema.items()
+                if dtype == pl.String
+            ]
+        )
+        .filter(pl.all_horizontal([pl.col(k).is_not_null() for k in keys]))
+        .unique(subset=keys, keep="last", maintain_order=True)
+    )
+    n_received = len(dataset)
+    if has_etl_hash(model) and len(keys) == 1:
+        # descarta antes do MERGE as linhas cujo hash não mudou
+        dataset = drop_unchanged(dataset=dataset, model=model, key=keys[0])
+    if dataset.is_empty():
+        counts["n_unchanged"] = n_received
+        return _update_log(log, counts)
+
+    using = router.db_for_write(model)
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    target = qn(model._meta.db_table)
+    temp = qn(f"#merge_{model._meta.db_table}_{uuid.uuid4().hex[:8]}")
+    columns = [f.column for f in data_fields]
+    created_at = fields[ETL_CREATED_AT].column if ETL_CREATED_AT in fields else None
+    updated_at = fields[ETL_UPDATED_AT].column if ETL_UPDATED_AT in fields else None
+    compare_columns = [
+        c for c in columns if c not in key_columns + [created_at, updated_at]
+    ]
+    update_columns = compare_columns + [c for c in columns if c == updated_at]
+
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT {', '.join(qn(c) for c in columns)} INTO {temp} "
+            f"FROM {target} WHERE 1 = 0"
+        )
+        try:
+            _insert_chunked(
+                cursor=cursor,
+                table=temp,
+                columns=[qn(c) for c in columns],
+                dataset=dataset,
+            )
+            cursor.execute(
+                _merge_sql(
+                    target=target,
+                    source=temp,
+                    keys=[qn(c) for c in key_columns],
+                    columns=[qn(c) for c in columns],
+                    update_columns=[qn(c) for c in update_columns],
+                    compare_columns=[qn(c) for c in compare_columns],
+                    hash_column=(
+                        qn(ETL_HASH_COLUMN)
+                        if ETL_HASH_COLUMN in columns
+                        and dataset.get_column(ETL_HASH_COLUMN).null_count() == 0
+                        else None
+                    ),
+                    auto_now=[qn(f.column) for f in auto_now],
+                    auto_now_add=[qn(f.column) for f in auto_now_add],
+                )
+            )
+            n_inserted, n_updated = cursor.fetchone()
+        finally:
+            cursor.execute(f"DROP TABLE {temp}")
+
+    counts["n_inserted"] = n_inserted or 0
+    counts["n_updated"] = n_updated or 0
+    counts["n_unchanged"] = (
+        n_received - counts["n_inserted"] - counts["n_updated"]
+    )
+    print(
+        f"...MERGE [{model.__name__}]: {counts['n_inserted']} INSERIDOS, "
+        f"{counts['n_updated']} ATUALIZADOS, {counts['n_unchanged']} SEM ALTERAÇÃO..."
+    )
+    return _update_log(log, counts)
+
+
+def _insert_chunked(
+    cursor, table: str, columns: List[str], dataset: pl.DataFrame
+) -> None:
+    """INSERT multi-linha em blocos que respeitam o limite de parâmetros do SQL Server."""
+    rows_per_chunk = max(1, min(MAX_ROWS_PER_INSERT, MAX_PARAMS // len(columns)))
+    row_placeholder = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    for chunk in dataset.iter_slices(n_rows=rows_per_chunk):
+        rows = chunk.rows()
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+            + ", ".join([row_placeholder] * len(rows)),
+            [value for row in rows for value in row],
+        )
+
+
+def _merge_sql(
+    target: str,
+    source: str,
+    keys: List[str],
+    columns: List[str],
+    update_columns: List[str],
+    compare_columns: List[str],
+    auto_now: List[str],
+    auto_now_add: List[str],
+    hash_column: Optional[str] = None,
+) -> str:
+    insert_columns = columns + [c for c in auto_now + auto_now_add if c not in columns]
+    insert_values = [f"s.{c}" for c in columns] + [
+        "SYSUTCDATETIME()" for c in insert_columns[len(columns):]
+    ]
+    set_clause = [f"t.{c} = s.{c}" for c in update_columns] + [
+        f"t.{c} = SYSUTCDATETIME()" for c in auto_now
+    ]
+    on_clause = " AND ".join(f"t.{k} = s.{k}" for k in keys)
+    matched = ""
+    if hash_column:
+        # com etl_hash basta comparar uma coluna em vez de todas
+        matched = (
+            f"WHEN MATCHED AND (t.{hash_column} IS NULL "
+            f"OR t.{hash_column} <> s.{hash_column}) THEN UPDATE SET "
+            + ", ".join(set_clause)
+            + "\n"
+        )
+    elif compare_columns:
+        matched = (
+            "WHEN MATCHED AND EXISTS (SELECT "
+            + ", ".join(f"s.{c}" for c in compare_columns)
+            + " EXCEPT SELECT "
+            + ", ".join(f"t.{c}" for c in compare_columns)
+            + ") THEN UPDATE SET "
+            + ", ".join(set_clause)
+            + "\n"
+        )
+    return (
+        "SET NOCOUNT ON;\n"
+        "DECLARE @acoes TABLE (acao NVARCHAR(10));\n"
+        f"MERGE {target} WITH (HOLDLOCK) AS t\n"
+        f"USING {source} AS s ON {on_clause}\n"
+        f"{matched}"
+        f"WHEN NOT MATCHED BY TARGET THEN INSERT ({', '.join(insert_columns)}) "
+        f"VALUES ({', '.join(insert_values)})\n"
+        "OUTPUT $action INTO @acoes;\n"
+        "SELECT SUM(CASE WHEN acao = 'INSERT' THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN acao = 'UPDATE' THEN 1 ELSE 0 END) FROM @acoes;"
+    )
+
+
+def _update_log(log: Optional[Dict], counts: Dict[str, int]) -> Dict[str, int]:
+    if isinstance(log, dict):
+        for k, v in counts.items():
+            log[k] = log.get(k, 0) + v
+    return counts
@@ -1,13 +1,21 @@
+import uuid
+from typing import Iterable, Optional
+
 import polars as pl
 
 # from celery import shared_task
-from django.db import models, transaction
+from django.db import connections, models, router, transaction
 from django.utils import timezone
 
+from .fast_loader import FastLoader
+
 
 class Pipeline:
     """Classe padrão que generaliza os métodos de todas as Pipelines de dados"""
 
+    # "orm" (bulk_create) ou "fast" (FastLoader com fast_executemany)
+    load_backend = "orm"
+
     def __init__(self, **kwargs):
         self.log = {
             "n_inserted": 0,
@@ -35,9 +43,12 @@ class Pipeline:
         """Implementar o método transform_dataset irá fazer o fluxo de transformação do dataset, utilizando os métodos disponíveis nos mixins."""
         raise NotImplementedError("Subclass must implement this method")
 
-    @transaction.atomic
     def load(
-        self, dataset: pl.DataFrame, model: models.Model, filtro: dict
+        self,
+        dataset: pl.DataFrame,
+        model: models.Model,
+        filtro: dict,
+        mode: str = "replace",
     ) -> None:
         """
         Executa a carga de dados no banco de dados de forma transacional.
@@ -62,18 +73,144 @@ class Pipeline:
         - `model` (`models.Model`): Modelo Django que representa a tabela onde os
         dados serão manipulados.
         - `filtro` (`dict`): Critérios para exclusão de registros antes da inserção.
+        - `mode` (`str`): `"replace"` (padrão) faz o DELETE + SAVE descritos acima;
+        `"swap"` carrega primeiro uma tabela de staging e só então troca os dados
+        da tabela final em uma transação curta (ver `_swap`).
 
         """
 
         # medir tempo do load completo
         started = timezone.now()
-        self._delete(filtro=filtro, model=model)
-        self._save(dataset=dataset, model=model)
+        self.log["load_mode"] = mode
+        if mode == "swap" and FastLoader.is_supported(model):
+            self._swap(dataset=dataset, model=model, filtro=filtro)
+        else:
+            with transaction.atomic(using=router.db_for_write(model)):
+                self._delete(filtro=filtro, model=model)
+                self._save(dataset=dataset, model=model)
         finished = timezone.now()
         load_duration = round((finished - started).total_seconds(), 2)
         self.log["load_duration"] = load_duration
         print(f"...LOAD DURATION: {load_duration}s (delete+save)...")
 
+    def load_batches(
+        self, batches: Iterable[pl.DataFrame], model: models.Model, filtro: dict
+    ) -> None:
+        """Carga em streaming: cada lote é gravado assim que chega, só um fica em memória.
+
+        Com SQL Server (`FastLoader.is_supported`), os lotes vão para a staging do
+        `_swap` fora de qualquer transação, e a tabela final só é bloqueada no
+        DELETE + `INSERT ... SELECT` do fim: leitores não esperam o download das
+        páginas. Nos demais bancos, DELETE e SAVE de cada lote ficam em uma única
+        transação, com a mesma garantia de rollback do `load`.
+        """
+        started = timezone.now()
+        if FastLoader.is_supported(model):
+            self.log["load_mode"] = "swap"
+            n_batches = self._swap(batches=batches, model=model, filtro=filtro)
+            print(
+                f"...{n_batches} LOTES / {self.log['n_inserted']} "
+                "REGISTROS SALVOS..."
+            )
+        else:
+            self.log["load_mode"] = "replace"
+            n_inserted = 0
+            save_duration = 0.0
+            n_batches = 0
+            with transaction.atomic(using=router.db_for_write(model)):
+                self._delete(filtro=filtro, model=model)
+                for batch in batches:
+                    self.log["n_inserted"] = 0
+                    self.log["save_duration"] = 0.0
+                    self._save(dataset=batch, model=model)
+                    n_inserted += self.log["n_inserted"]
+                    save_duration += self.log["save_duration"]
+                    n_batches += 1
+            self.log["n_inserted"] = n_inserted
+            self.log["save_duration"] = round(save_duration, 2)
+            print(f"...{n_batches} LOTES / {n_inserted} REGISTROS SALVOS...")
+        finished = timezone.now()
+        self.log["n_batches"] = n_batches
+        load_duration = round((finished - started).total_seconds(), 2)
+        self.log["load_duration"] = load_duration
+        print(f"...LOAD DURATION: {load_duration}s (delete+save em lotes)...")
+
+    def _swap(
+        self,
+        model: models.Model,
+        filtro: dict,
+        dataset: Optional[pl.DataFrame] = None,
+        batches: Optional[Iterable[pl.DataFrame]] = None,
+    ) -> int:
+        """Carga via staging: a tabela final só fica bloqueada durante a troca.
+
+        1. Cria uma tabela temporária (`#stg_<tabela>`) com a mesma estrutura da final.
+        2. Carrega o `dataset` (ou cada um dos `batches`, conforme chegam) na staging
+        com o `FastLoader`, fora da transação da troca.
+        3. Em uma única transação, executa um DELETE set-based com o filtro e um
+        `INSERT ... SELECT` a partir da staging.
+
+        Retorna a quantidade de lotes carregados na staging.
+        """
+        if batches is None:
+            batches = [dataset]
+        using = router.db_for_write(model)
+        connection = connections[using]
+        qn = connection.ops.quote_name
+        target = qn(model._meta.db_table)
+        staging = f"#stg_{model._meta.db_table}_{uuid.uuid4().hex[:8]}"
+
+        print(f"...CRIANDO A TABELA DE STAGING [{staging}]...")
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT * INTO {qn(staging)} FROM {target} WHERE 1 = 0")
+        try:
+            started = timezone.now()
+            loader = FastLoader(model=model, table=staging)
+            n_staged = 0
+            n_batches = 0
+            # colunas gravadas em algum lote (as demais ficam com o default da final)
+            staged_columns = {}
+            for batch in batches:
+                n_batches += 1
+                if batch.is_empty():
+                    continue
+                n_staged += loader.save(dataset=batch)
+                staged_columns.update(dict.fromkeys(loader.columns))
+            self.log["stage_duration"] = round(
+                (timezone.now() - started).total_seconds(), 2
+            )
+            print(f"...{n_staged} REGISTROS CARREGADOS NA STAGING...")
+            print(f"...STAGE DURATION: {self.log['stage_duration']}s...")
+
+            started = timezone.now()
+            with transaction.atomic(using=using):
+                self.log["n_deleted"] = model.objects.using(using).filter(
+                    **filtro
+                )._raw_delete(using=using)
+                n_inserted = 0
+                if n_staged:
+                    columns = ", ".join(qn(c) for c in staged_columns)
+                    with connection.cursor() as cursor:
+                        cursor.execute(
+                            f"INSERT INTO {target} ({columns}) "
+                            f"SELECT {columns} FROM {qn(staging)}"
+                        )
+                        n_inserted = cursor.rowcount
+                self.log["n_inserted"] = n_inserted
+            self.log["swap_duration"] = round(
+                (timezone.now() - started).total_seconds(), 2
+            )
+            print(f"...FILTROS UTILIZADOS: {filtro}...")
+            print(f"...{self.log['n_deleted']} DADOS DELETADOS NO BANCO DE DADOS...")
+            print(f"...{self.log['n_inserted']} REGISTROS SALVOS NO BANCO DE DADOS...")
+            print(f"...SWAP DURATION: {self.log['swap_duration']}s...")
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"IF OBJECT_ID('tempdb..{staging}') IS NOT NULL DROP TABLE {qn(staging)}"
+                )
+        return n_batches
+
     def _delete(self, filtro: dict, model=models.Model) -> None:
         """Deleta os registros na base, conforme o model e o filtro selecionado."""
         print(
@@ -99,11 +236,19 @@ class Pipeline:
             self.log.setdefault("save_duration", 0.0)
             return
         started = timezone.now()
-        objs = [model(**vals) for vals in dataset.to_dicts()]
-        bulk = model.objects.bulk_create(objs=objs, batch_size=1000)
+        if self.load_backend == "fast" and FastLoader.is_supported(model):
+            backend = "fast"
+            n_inserted = FastLoader(model=model).save(dataset=dataset)
+        else:
+            backend = "orm"
+            objs = [model(**vals) for vals in dataset.to_dicts()]
+            n_inserted = len(
+                model.objects.bulk_create(objs=objs, batch_size=1000)
+            )
         finished = timezone.now()
         duration = round((finished - started).total_seconds(), 2)
-        self.log["n_inserted"] = len(bulk)
+        self.log["n_inserted"] = n_inserted
         self.log["save_duration"] = duration
-        print(f"...{len(bulk)} REGISTROS SALVOS NO BANCO DE DADOS...")
-        print(f"...SAVE DURATION: {duration}s...")
+        self.log["save_backend"] = backend
+        print(f"...{n_inserted} REGISTROS SALVOS NO BANCO DE DADOS...")
+        print(f"...SAVE DURATION: {duration}s ({backend})...")
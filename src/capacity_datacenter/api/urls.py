@@ -8,4 +8,14 @@ urlpatterns = [
         views.LoadCapacityDatacenterView.as_view(),
         name="load-capacity-datacenter",
     ),
+    path(
+        "load-capacity-datacenter/<int:job_id>/",
+        views.LoadCapacityDatacenterStatusView.as_view(),
+        name="load-capacity-datacenter-status",
+    ),
+    path(
+        "task-logs/trend/",
+        views.TaskLogTrendView.as_view(),
+        name="task-log-trend",
+    ),
 ]
@@ -1,3 +1,11 @@
-from .load_capacity_datacenter_view import LoadCapacityDatacenterView
+from .load_capacity_datacenter_view import (
+    LoadCapacityDatacenterStatusView,
+    LoadCapacityDatacenterView,
+)
+from .task_log_trend_view import TaskLogTrendView
 
-__all__ = ["LoadCapacityDatacenterView"]
+__all__ = [
+    "LoadCapacityDatacenterView",
+    "LoadCapacityDatacenterStatusView",
+    "TaskLogTrendView",
+]
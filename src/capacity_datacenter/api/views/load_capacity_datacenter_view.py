@@ -1,20 +1,27 @@
-from datetime import datetime, timedelta
+import logging
+import threading
+from datetime import datetime
 
+from django.db import close_old_connections
+from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from ...tasks import (
-    LoadCustomPollerAssignment,
-    LoadCustompollerStatistics,
-    LoadInterface,
-    LoadInterfaceTraffic,
-    LoadNode,
-    LoadResponseTime,
-)
+from ...models import TaskLog
+from ...tasks import LoadCapacityDatacenterRange
+from ...tasks.load_capacity_datacenter_range import JOB_TASK_NAME
+
+logger = logging.getLogger(__name__)
 
 
 class LoadCapacityDatacenterView(APIView):
-    """View que aciona o fluxo completo de carga (sem Celery)."""
+    """View que aciona o fluxo completo de carga (sem Celery).
+
+    A carga roda em uma thread de background (`LoadCapacityDatacenterRange`): dimensões
+    uma vez só, fatos extraídos dia a dia em paralelo e uma carga por tabela para o
+    intervalo inteiro. A resposta traz o `job_id`, consultado em
+    `load-capacity-datacenter/<job_id>/`.
+    """
 
     def post(self, request, *args, **kwargs) -> Response:
         payload = request.data or {}
@@ -25,84 +32,42 @@ class LoadCapacityDatacenterView(APIView):
         end_date = self._parse_date(payload, "data_fim") or self._parse_date(
             payload, "date_fim"
         )
-
-        log = {}
-
-        # 1) Nodes
-        loader = LoadNode()
-        log["load_node"] = loader.run()
-
-        # 2) Interfaces
-        loader = LoadInterface()
-        log["load_interface"] = loader.run()
-
-        # 3) Custom Poller Assignment
-        loader = LoadCustomPollerAssignment()
-        log["load_custom_poller_assignment"] = loader.run()
-
-        # 4) Response Time (recebe start_date/end_date)
-
-        statistics_logs = []
-        if start_date and end_date:
-            current_date = start_date
-            print(f"Data atual: {current_date}")
-            while current_date <= end_date:
-                loader = LoadResponseTime(
-                    start_date=current_date, end_date=current_date
-                )
-                result = loader.run()
-                statistics_logs.append({str(current_date): result})
-                current_date += timedelta(days=1)
-                print(f"Data atual: {current_date}")
-        else:
-            loader = LoadResponseTime(start_date=start_date, end_date=end_date)
-            statistics_logs.append({"single_run": loader.run()})
-
-        log["load_response_time"] = statistics_logs
-
-        # 5) Custom Poller Statistics (executa uma vez por dia)
-        statistics_logs = []
-        if start_date and end_date:
-            current_date = start_date
-            print(f"Data atual: {current_date}")
-            while current_date <= end_date:
-                loader = LoadCustompollerStatistics(
-                    start_date=current_date, end_date=current_date
-                )
-                result = loader.run()
-                statistics_logs.append({str(current_date): result})
-                current_date += timedelta(days=1)
-                print(f"Data atual: {current_date}")
-        else:
-            loader = LoadCustompollerStatistics(
-                start_date=start_date, end_date=end_date
+        if start_date and end_date and start_date > end_date:
+            return Response(
+                {"error": "data_inicio maior que data_fim"},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-            statistics_logs.append({"single_run": loader.run()})
-
-        log["load_custom_poller_statistics"] = statistics_logs
 
-        # 6) Interface Traffic (executa uma vez por dia)
-        statistics_logs = []
-        if start_date and end_date:
-            current_date = start_date
-            print(f"Data atual: {current_date}")
-            while current_date <= end_date:
-                loader = LoadInterfaceTraffic(
-                    start_date=current_date, end_date=current_date
-                )
-                result = loader.run()
-                statistics_logs.append({str(current_date): result})
-                current_date += timedelta(days=1)
-                print(f"Data atual: {current_date}")
-        else:
-            loader = LoadInterfaceTraffic(
-                start_date=start_date, end_date=end_date
-            )
-            statistics_logs.append({"single_run": loader.run()})
-
-        log["load_custom_poller_statistics"] = statistics_logs
+        job = LoadCapacityDatacenterRange.create_job(start_date, end_date)
+        thread = threading.Thread(
+            target=self._run_in_background,
+            args=(job.pk, start_date, end_date, payload.get("parallelism")),
+            daemon=True,
+        )
+        thread.start()
+        return Response(
+            {
+                "status": "accepted",
+                "job_id": job.pk,
+                "start_range_date": job.log["start_range_date"],
+                "end_range_date": job.log["end_range_date"],
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
 
-        return Response(log)
+    def _run_in_background(self, job_id, start_date, end_date, parallelism) -> None:
+        try:
+            LoadCapacityDatacenterRange(
+                start_date=start_date,
+                end_date=end_date,
+                parallelism=parallelism,
+                job_id=job_id,
+            ).run()
+        except Exception:
+            # o erro já foi gravado no TaskLog do job
+            logger.exception("Erro na carga do capacity_datacenter (job %s)", job_id)
+        finally:
+            close_old_connections()
 
     def _parse_date(self, payload: dict, key: str):
         """Tenta parsear `YYYY-MM-DD` ou retorna None.
@@ -117,3 +82,23 @@ class LoadCapacityDatacenterView(APIView):
             return datetime.strptime(val, "%Y-%m-%d").date()
         except (ValueError, TypeError):
             return None
+
+
+class LoadCapacityDatacenterStatusView(APIView):
+    """Status de um job de `LoadCapacityDatacenterView` (lido do `TaskLog`)."""
+
+    def get(self, request, job_id: int, *args, **kwargs) -> Response:
+        job = TaskLog.objects.filter(pk=job_id, task_name=JOB_TASK_NAME).first()
+        if job is None:
+            return Response(
+                {"error": "job não encontrado"}, status=status.HTTP_404_NOT_FOUND
+            )
+        log = job.log or {}
+        return Response(
+            {
+                "job_id": job.pk,
+                "status": log.get("status"),
+                "run_at": job.run_at,
+                "log": log,
+            }
+        )
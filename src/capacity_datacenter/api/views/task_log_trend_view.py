@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+from django.db.models import Avg, Count, Max, Q, Sum
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ...models import TaskLog
+
+# colunas estruturadas gravadas por `MixinTaskLog`
+METRIC_FIELDS = (
+    "duration_seconds",
+    "extract_seconds",
+    "transform_seconds",
+    "delete_seconds",
+    "insert_seconds",
+    "rows_read",
+    "rows_written",
+    "bytes_fetched",
+    "rows_per_second",
+)
+# limite de dias aceito em `days`
+MAX_TREND_DAYS = 365
+
+
+class TaskLogTrendView(APIView):
+    """Tendência das métricas de execução gravadas no `TaskLog`.
+
+    GET `task-logs/trend/?task_name=LoadResponseTime&days=30`
+
+    - com `task_name`: as execuções do período (mais antiga primeiro) com as métricas
+      estruturadas e um resumo (médias, máximos e totais);
+    - sem `task_name`: só o resumo de cada task do período.
+
+    Logs gravados antes das colunas estruturadas aparecem com as métricas nulas.
+    """
+
+    def get(self, request, *args, **kwargs) -> Response:
+        try:
+            days = int(request.query_params.get("days", 30))
+        except (TypeError, ValueError):
+            return Response(
+                {"error": "days deve ser um número inteiro"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not 1 <= days <= MAX_TREND_DAYS:
+            return Response(
+                {"error": f"days deve estar entre 1 e {MAX_TREND_DAYS}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        qs = TaskLog.objects.filter(run_at__gte=timezone.now() - timedelta(days=days))
+        task_name = request.query_params.get("task_name")
+        if not task_name:
+            summaries = (
+                qs.values("task_name").annotate(**self._summary()).order_by("task_name")
+            )
+            return Response({"days": days, "tasks": list(summaries)})
+
+        qs = qs.filter(task_name=task_name)
+        runs = qs.order_by("run_at").values(
+            "id", "run_at", "status", "finished_at", *METRIC_FIELDS
+        )
+        return Response(
+            {
+                "task_name": task_name,
+                "days": days,
+                "summary": qs.aggregate(**self._summary()),
+                "runs": list(runs),
+            }
+        )
+
+    @staticmethod
+    def _summary() -> dict:
+        return {
+            "n_runs": Count("id"),
+            "n_errors": Count("id", filter=Q(status="error")),
+            "avg_duration_seconds": Avg("duration_seconds"),
+            "max_duration_seconds": Max("duration_seconds"),
+            "avg_extract_seconds": Avg("extract_seconds"),
+            "avg_transform_seconds": Avg("transform_seconds"),
+            "avg_delete_seconds": Avg("delete_seconds"),
+            "avg_insert_seconds": Avg("insert_seconds"),
+            "total_rows_read": Sum("rows_read"),
+            "total_rows_written": Sum("rows_written"),
+            "total_bytes_fetched": Sum("bytes_fetched"),
+            "avg_rows_per_second": Avg("rows_per_second"),
+            "last_run_at": Max("run_at"),
+        }
@@ -0,0 +1,61 @@
+# Generated by Django 4.2.10 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('capacity_datacenter', '0013_node_servico'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InterfaceTrafficHourly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, null=True)),
+                ('user', models.CharField(max_length=255, null=True)),
+                ('node_id', models.CharField(max_length=100, null=True)),
+                ('date', models.DateField()),
+                ('hour', models.SmallIntegerField()),
+                ('in_mean_bps', models.FloatField(null=True)),
+                ('in_max_bps', models.FloatField(null=True)),
+                ('in_p95_bps', models.FloatField(null=True)),
+                ('out_mean_bps', models.FloatField(null=True)),
+                ('out_max_bps', models.FloatField(null=True)),
+                ('out_p95_bps', models.FloatField(null=True)),
+                ('n_samples', models.IntegerField(null=True)),
+            ],
+            options={
+                'verbose_name': 'Fato Interface Traffic Horário (Capacity)',
+                'verbose_name_plural': 'Fato Interface Traffics Horários (Capacity)',
+                'db_table': 'f_interface_traffic_hourly',
+            },
+        ),
+        migrations.CreateModel(
+            name='ResponseTimeHourly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, null=True)),
+                ('user', models.CharField(max_length=255, null=True)),
+                ('node_id', models.CharField(max_length=100, null=True)),
+                ('date', models.DateField()),
+                ('hour', models.SmallIntegerField()),
+                ('avg_response_time_mean', models.FloatField(null=True)),
+                ('avg_response_time_max', models.FloatField(null=True)),
+                ('avg_response_time_p95', models.FloatField(null=True)),
+                ('percent_loss_mean', models.FloatField(null=True)),
+                ('percent_loss_max', models.FloatField(null=True)),
+                ('percent_loss_p95', models.FloatField(null=True)),
+                ('n_samples', models.IntegerField(null=True)),
+            ],
+            options={
+                'verbose_name': 'Fato Response Time Horário (Capacity)',
+                'verbose_name_plural': 'Fato Response Times Horários (Capacity)',
+                'db_table': 'f_response_time_hourly',
+            },
+        ),
+    ]
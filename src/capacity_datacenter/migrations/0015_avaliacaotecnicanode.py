@@ -0,0 +1,41 @@
+# Generated by Django 4.2.10 on 2026-10-18 11:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('capacity_datacenter', '0014_interfacetraffichourly_responsetimehourly'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AvaliacaoTecnicaNode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, null=True)),
+                ('user', models.CharField(max_length=255, null=True)),
+                ('node_id', models.CharField(max_length=100, null=True)),
+                ('date', models.DateField()),
+                ('tecnologia', models.CharField(max_length=30, null=True)),
+                ('regiao', models.CharField(max_length=10, null=True)),
+                ('latencia', models.FloatField(null=True)),
+                ('classificacao_latencia', models.CharField(max_length=10, null=True)),
+                ('nota_latencia', models.PositiveSmallIntegerField(null=True)),
+                ('jitter', models.FloatField(null=True)),
+                ('classificacao_jitter', models.CharField(max_length=10, null=True)),
+                ('nota_jitter', models.PositiveSmallIntegerField(null=True)),
+                ('perda_pacote', models.FloatField(null=True)),
+                ('classificacao_perda_pacote', models.CharField(max_length=10, null=True)),
+                ('nota_perda_pacote', models.PositiveSmallIntegerField(null=True)),
+                ('nota_total', models.PositiveSmallIntegerField(null=True)),
+            ],
+            options={
+                'verbose_name': 'Fato Avaliação Técnica por Node',
+                'verbose_name_plural': 'Fato Avaliações Técnicas por Node',
+                'db_table': 'f_avaliacao_tecnica_node',
+            },
+        ),
+    ]
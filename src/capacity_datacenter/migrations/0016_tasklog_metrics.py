@@ -0,0 +1,72 @@
+# Generated by Django 4.2.10 on 2026-10-18 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('capacity_datacenter', '0015_avaliacaotecnicanode'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tasklog',
+            name='status',
+            field=models.CharField(max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='tasklog',
+            name='finished_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name='tasklog',
+            name='duration_seconds',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name='tasklog',
+            name='extract_seconds',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name='tasklog',
+            name='transform_seconds',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name='tasklog',
+            name='delete_seconds',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name='tasklog',
+            name='insert_seconds',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name='tasklog',
+            name='rows_read',
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='tasklog',
+            name='rows_written',
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='tasklog',
+            name='bytes_fetched',
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='tasklog',
+            name='rows_per_second',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddIndex(
+            model_name='tasklog',
+            index=models.Index(fields=['task_name', 'run_at'], name='ix_task_log_task_run_at'),
+        ),
+    ]
@@ -1,19 +1,25 @@
 from .avaliacao_tecnica import AvaliacaoTecnica
+from .avaliacao_tecnica_node import AvaliacaoTecnicaNode
 from .custom_poller_assignment import CustomPollerAssignment
 from .custom_poller_statistics import CustomPollerStatistics
 from .interface import Interface
 from .interface_traffic import InterfaceTraffic
+from .interface_traffic_hourly import InterfaceTrafficHourly
 from .node import Node
 from .response_time import ResponseTime
+from .response_time_hourly import ResponseTimeHourly
 from .task_log import TaskLog
 
 __all__ = [
     "Node",
     "Interface",
     "InterfaceTraffic",
+    "InterfaceTrafficHourly",
     "CustomPollerAssignment",
     "ResponseTime",
+    "ResponseTimeHourly",
     "CustomPollerStatistics",
     "TaskLog",
     "AvaliacaoTecnica",
+    "AvaliacaoTecnicaNode",
 ]
@@ -0,0 +1,34 @@
+from django.db import models
+
+from .mixins import AuditMixin
+
+
+class AvaliacaoTecnicaNode(AuditMixin, models.Model):
+    """Resultado da avaliação técnica por node e dia (faixas de `AvaliacaoTecnica`).
+
+    Para cada critério guarda o valor medido, a classificação e a nota da faixa;
+    `nota_total` soma as notas dos critérios avaliados.
+    """
+
+    node_id = models.CharField(max_length=100, null=True)
+    date = models.DateField()
+    tecnologia = models.CharField(max_length=30, null=True)
+    regiao = models.CharField(max_length=10, null=True)
+    latencia = models.FloatField(null=True)
+    classificacao_latencia = models.CharField(max_length=10, null=True)
+    nota_latencia = models.PositiveSmallIntegerField(null=True)
+    jitter = models.FloatField(null=True)
+    classificacao_jitter = models.CharField(max_length=10, null=True)
+    nota_jitter = models.PositiveSmallIntegerField(null=True)
+    perda_pacote = models.FloatField(null=True)
+    classificacao_perda_pacote = models.CharField(max_length=10, null=True)
+    nota_perda_pacote = models.PositiveSmallIntegerField(null=True)
+    nota_total = models.PositiveSmallIntegerField(null=True)
+
+    def __str__(self):
+        return f"{self.node_id} @ {self.date} -> nota {self.nota_total}"
+
+    class Meta:
+        db_table = "f_avaliacao_tecnica_node"
+        verbose_name = "Fato Avaliação Técnica por Node"
+        verbose_name_plural = "Fato Avaliações Técnicas por Node"
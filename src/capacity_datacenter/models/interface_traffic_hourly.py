@@ -0,0 +1,26 @@
+from django.db import models
+
+from .mixins import AuditMixin
+
+
+class InterfaceTrafficHourly(AuditMixin, models.Model):
+    """Rollup horário do tráfego por node: média, máximo, p95 e nº de amostras."""
+
+    node_id = models.CharField(max_length=100, null=True)
+    date = models.DateField()
+    hour = models.SmallIntegerField()
+    in_mean_bps = models.FloatField(null=True)
+    in_max_bps = models.FloatField(null=True)
+    in_p95_bps = models.FloatField(null=True)
+    out_mean_bps = models.FloatField(null=True)
+    out_max_bps = models.FloatField(null=True)
+    out_p95_bps = models.FloatField(null=True)
+    n_samples = models.IntegerField(null=True)
+
+    def __str__(self):
+        return f"{self.node_id} @ {self.date} {self.hour:02d}h -> in p95 {self.in_p95_bps} out p95 {self.out_p95_bps}"
+
+    class Meta:
+        db_table = "f_interface_traffic_hourly"
+        verbose_name = "Fato Interface Traffic Horário (Capacity)"
+        verbose_name_plural = "Fato Interface Traffics Horários (Capacity)"
@@ -0,0 +1,26 @@
+from django.db import models
+
+from .mixins import AuditMixin
+
+
+class ResponseTimeHourly(AuditMixin, models.Model):
+    """Rollup horário do response time por node: média, máximo, p95 e nº de amostras."""
+
+    node_id = models.CharField(max_length=100, null=True)
+    date = models.DateField()
+    hour = models.SmallIntegerField()
+    avg_response_time_mean = models.FloatField(null=True)
+    avg_response_time_max = models.FloatField(null=True)
+    avg_response_time_p95 = models.FloatField(null=True)
+    percent_loss_mean = models.FloatField(null=True)
+    percent_loss_max = models.FloatField(null=True)
+    percent_loss_p95 = models.FloatField(null=True)
+    n_samples = models.IntegerField(null=True)
+
+    def __str__(self):
+        return f"{self.node_id} @ {self.date} {self.hour:02d}h -> p95 {self.avg_response_time_p95}"
+
+    class Meta:
+        db_table = "f_response_time_hourly"
+        verbose_name = "Fato Response Time Horário (Capacity)"
+        verbose_name_plural = "Fato Response Times Horários (Capacity)"
@@ -8,12 +8,25 @@ class TaskLog(models.Model):
     - task_name: nome da classe/task executada
     - run_at: quando a task foi iniciada
     - log: conteúdo do log (JSON) gerado pela task
+    - status ... rows_per_second: métricas estruturadas gravadas por `MixinTaskLog`
+      (nulas nos logs antigos), consultadas pelo endpoint de tendência
     """
 
     task_name = models.CharField(max_length=255)
     run_at = models.DateTimeField()
     # Use the framework JSONField for portability (Postgres or other backends)
     log = models.JSONField()
+    status = models.CharField(max_length=20, null=True)
+    finished_at = models.DateTimeField(null=True)
+    duration_seconds = models.FloatField(null=True)
+    extract_seconds = models.FloatField(null=True)
+    transform_seconds = models.FloatField(null=True)
+    delete_seconds = models.FloatField(null=True)
+    insert_seconds = models.FloatField(null=True)
+    rows_read = models.BigIntegerField(null=True)
+    rows_written = models.BigIntegerField(null=True)
+    bytes_fetched = models.BigIntegerField(null=True)
+    rows_per_second = models.FloatField(null=True)
 
     def __str__(self):
         return f"{self.task_name} @ {self.run_at}"
@@ -22,3 +35,6 @@ class TaskLog(models.Model):
         db_table = "task_log"
         verbose_name = "Task Log"
         verbose_name_plural = "Task Logs"
+        indexes = [
+            models.Index(fields=["task_name", "run_at"], name="ix_task_log_task_run_at"),
+        ]
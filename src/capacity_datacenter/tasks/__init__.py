@@ -10,3 +10,19 @@ from .load_interface import LoadInterface, load_interface_async
 from .load_node import LoadNode, load_node_async
 from .load_response_time import LoadResponseTime, load_response_time_async
 from .load_interface_traffic import LoadInterfaceTraffic, load_interface_traffic_async
+from .load_interface_traffic_hourly import (
+    LoadInterfaceTrafficHourly,
+    load_interface_traffic_hourly_async,
+)
+from .load_response_time_hourly import (
+    LoadResponseTimeHourly,
+    load_response_time_hourly_async,
+)
+from .load_capacity_datacenter_range import (
+    LoadCapacityDatacenterRange,
+    load_capacity_datacenter_range_async,
+)
+from .score_avaliacao_tecnica import (
+    ScoreAvaliacaoTecnica,
+    score_avaliacao_tecnica_async,
+)
@@ -0,0 +1,274 @@
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+import polars as pl
+from celery import shared_task
+from django.utils import timezone as _tz
+
+from app.utils import MixinGetDataset, Pipeline
+
+from ..models import (
+    CustomPollerStatistics,
+    InterfaceTraffic,
+    InterfaceTrafficHourly,
+    ResponseTime,
+    ResponseTimeHourly,
+    TaskLog,
+)
+from ..utils import bradesco_dimension
+from .load_custom_poller_assignment import LoadCustomPollerAssignment
+from .load_custom_poller_statistics import LoadCustompollerStatistics
+from .load_interface import LoadInterface
+from .load_interface_traffic import LoadInterfaceTraffic
+from .load_interface_traffic_hourly import LoadInterfaceTrafficHourly
+from .load_node import LoadNode
+from .load_response_time import LoadResponseTime
+from .load_response_time_hourly import LoadResponseTimeHourly
+from .score_avaliacao_tecnica import ScoreAvaliacaoTecnica
+
+# dias extraídos simultaneamente (cada dia abre até `parallelism` conexões OPENQUERY)
+RANGE_PARALLELISM = int(os.getenv("CAPACITY_RANGE_PARALLELISM", "3"))
+
+# nome usado no TaskLog que acompanha o job (consultado pelo endpoint de status)
+JOB_TASK_NAME = "LoadCapacityDatacenterRange"
+
+
+class LoadCapacityDatacenterRange(MixinGetDataset, Pipeline):
+    """Orquestra a carga completa do capacity_datacenter para um intervalo de dias.
+
+    1. Dimensões (`LoadNode`, `LoadInterface`, `LoadCustomPollerAssignment`) uma vez só.
+    2. Lista de nodes BRADESCO e mapa de assignments resolvidos uma vez no cache do
+       processo (`bradesco_dimension`), compartilhado por todos os loaders de fato.
+    3. Extração dos fatos (response time, custom poller, interface traffic e os rollups
+       horários) dia a dia,
+       com até `range_parallelism` dias/fatos simultâneos.
+    4. Uma única carga por tabela de fato: DELETE do intervalo + INSERT de todos os dias.
+    5. Avaliação técnica (`ScoreAvaliacaoTecnica`) de todos os node/dia do intervalo.
+
+    O progresso fica no `TaskLog` de `job_id` (ver `LoadCapacityDatacenterStatusView`).
+    """
+
+    facts = (
+        ("load_response_time", LoadResponseTime, ResponseTime),
+        (
+            "load_custom_poller_statistics",
+            LoadCustompollerStatistics,
+            CustomPollerStatistics,
+        ),
+        ("load_interface_traffic", LoadInterfaceTraffic, InterfaceTraffic),
+        # rollups horários (média, máximo, p95, nº de amostras)
+        ("load_response_time_hourly", LoadResponseTimeHourly, ResponseTimeHourly),
+        (
+            "load_interface_traffic_hourly",
+            LoadInterfaceTrafficHourly,
+            InterfaceTrafficHourly,
+        ),
+    )
+
+    def __init__(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        parallelism: Optional[int] = None,
+        range_parallelism: Optional[int] = None,
+        extract_mode: Optional[str] = None,
+        job_id: Optional[int] = None,
+    ):
+        super().__init__()
+        self.start_date, self.end_date = self._resolve_range(start_date, end_date)
+        self.parallelism = parallelism
+        self.range_parallelism = range_parallelism or RANGE_PARALLELISM
+        self.extract_mode = extract_mode
+        self.job_id = job_id
+        self.log["start_range_date"] = self.start_date
+        self.log["end_range_date"] = self.end_date
+
+    @classmethod
+    def create_job(cls, start_date=None, end_date=None) -> TaskLog:
+        """Cria o `TaskLog` do job com status `running` (o id é o `job_id`)."""
+        start_date, end_date = cls._resolve_range(start_date, end_date)
+        return TaskLog.objects.create(
+            task_name=JOB_TASK_NAME,
+            run_at=_tz.now(),
+            status="running",
+            log={
+                "status": "running",
+                "start_range_date": start_date.isoformat(),
+                "end_range_date": end_date.isoformat(),
+            },
+        )
+
+    def run(self) -> Dict:
+        """Método principal da classe"""
+        started = time.perf_counter()
+        self.log["status"] = "running"
+        try:
+            self.load_dimensions()
+            self.resolve_fact_dimensions()
+            datasets = self.extract_facts()
+            self.load_facts(datasets)
+            self.log["score_avaliacao_tecnica"] = ScoreAvaliacaoTecnica(
+                start_date=self.start_date, end_date=self.end_date
+            ).run()
+            self.log["status"] = "success"
+        except Exception as exc:
+            self.log["status"] = "error"
+            self.log["error"] = str(exc)
+            self.log["traceback"] = traceback.format_exc()
+            raise
+        finally:
+            self.log["finished_at"] = _tz.now()
+            self.log["duration"] = round(time.perf_counter() - started, 2)
+            print(
+                f"...RANGE {self.start_date} A {self.end_date}: {self.log['duration']}s..."
+            )
+            self._save_job_log()
+        return self.log
+
+    def load_dimensions(self) -> None:
+        """Carrega Nodes, Interfaces e Custom Poller Assignments (uma vez por intervalo)."""
+        for name, loader_cls in (
+            ("load_node", LoadNode),
+            ("load_interface", LoadInterface),
+            ("load_custom_poller_assignment", LoadCustomPollerAssignment),
+        ):
+            print(f"...CARREGANDO A DIMENSÃO [{name}]...")
+            self.log[name] = loader_cls().run()
+
+    def resolve_fact_dimensions(self) -> None:
+        """Aquece o cache de nodes/assignments BRADESCO antes das threads de extração."""
+        self.log["n_nodes"] = len(bradesco_dimension.node_id_list)
+        self.log["n_assignments"] = len(bradesco_dimension.assignment_id_list)
+
+    def extract_facts(self) -> Dict[str, pl.DataFrame]:
+        """Extrai todos os fatos para cada dia do intervalo, em paralelo."""
+        jobs = [(fact, day) for fact in self.facts for day in self.days]
+        print(
+            f"...EXTRAINDO {len(jobs)} FATOS/DIA ({len(self.days)} DIAS) "
+            f"COM {self.range_parallelism} EM PARALELO..."
+        )
+        with ThreadPoolExecutor(max_workers=self.range_parallelism) as executor:
+            results = list(executor.map(self._extract_day, jobs))
+
+        datasets: Dict[str, List[pl.DataFrame]] = {name: [] for name, *_ in self.facts}
+        for name, day, dataset, log in results:
+            self.log.setdefault(name, {})[str(day)] = self._serializable(log)
+            if dataset.width:
+                datasets[name].append(dataset)
+        return {
+            name: pl.concat(frames, how="vertical_relaxed") if frames else pl.DataFrame()
+            for name, frames in datasets.items()
+        }
+
+    def load_facts(self, datasets: Dict[str, pl.DataFrame]) -> None:
+        """Uma carga (DELETE do intervalo + INSERT) por tabela de fato."""
+        for name, loader_cls, model in self.facts:
+            loader = loader_cls(start_date=self.start_date, end_date=self.end_date)
+            loader.load(
+                dataset=datasets[name],
+                model=model,
+                filtro={"date__gte": self.start_date, "date__lte": self.end_date},
+            )
+            self.log[name]["load"] = self._serializable(loader.log)
+
+    @property
+    def days(self) -> List[date]:
+        n_days = (self.end_date - self.start_date).days + 1
+        return [self.start_date + timedelta(days=i) for i in range(n_days)]
+
+    def _extract_day(self, job):
+        (name, loader_cls, _model), day = job
+        loader = loader_cls(
+            start_date=day,
+            end_date=day,
+            parallelism=self.parallelism,
+            extract_mode=self.extract_mode,
+        )
+        loader.extract_and_transform_dataset()
+        print(f"...[{name}] {day}: {len(loader.dataset):,} LINHAS...".replace(",", "."))
+        return name, day, loader.dataset, loader.log
+
+    @staticmethod
+    def _resolve_range(start_date, end_date):
+        """Intervalo padrão igual ao dos loaders: o dia de 3 dias atrás e o seguinte."""
+        if start_date is not None and end_date is not None:
+            return start_date, end_date
+        target_day = datetime.now().date() - timedelta(days=3)
+        return target_day, target_day + timedelta(days=1)
+
+    @staticmethod
+    def _serializable(log: Dict) -> Dict:
+        serializable_log = {}
+        for k, v in log.items():
+            if isinstance(v, dict):
+                serializable_log[k] = LoadCapacityDatacenterRange._serializable(v)
+            elif hasattr(v, "isoformat"):
+                serializable_log[k] = v.isoformat()
+            elif v is None or isinstance(v, (str, int, float, bool, list)):
+                serializable_log[k] = v
+            else:
+                serializable_log[k] = str(v)
+        return serializable_log
+
+    def _save_job_log(self) -> None:
+        log = self._serializable(self.log)
+        metrics = self._job_metrics()
+        if self.job_id is None:
+            job = TaskLog.objects.create(
+                task_name=JOB_TASK_NAME,
+                run_at=self.log.get("started_at"),
+                log=log,
+                **metrics,
+            )
+            self.job_id = job.pk
+        else:
+            TaskLog.objects.filter(pk=self.job_id).update(log=log, **metrics)
+        self.log["job_id"] = self.job_id
+
+    def _job_metrics(self) -> Dict:
+        """Colunas estruturadas do `TaskLog` do job (ver `MixinTaskLog`).
+
+        Linhas lidas/gravadas somam as extrações diárias e as cargas de cada fato.
+        """
+        rows_read = rows_written = 0
+        for name, _loader_cls, _model in self.facts:
+            for key, fact_log in self.log.get(name, {}).items():
+                if key == "load":
+                    rows_written += fact_log.get("n_inserted") or 0
+                else:
+                    rows_read += fact_log.get("rows_fetched") or 0
+        duration = self.log.get("duration")
+        return {
+            "status": self.log.get("status"),
+            "finished_at": self.log.get("finished_at"),
+            "duration_seconds": duration,
+            "rows_read": rows_read,
+            "rows_written": rows_written,
+            "rows_per_second": (
+                round(rows_written / duration, 2) if duration else None
+            ),
+        }
+
+
+@shared_task(
+    name="capacity_datacenter.load_capacity_datacenter_range_async",
+    bind=True,
+)
+def load_capacity_datacenter_range_async(
+    _task, start_date=None, end_date=None, parallelism=None, job_id=None
+) -> Dict:
+    if isinstance(start_date, str):
+        start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
+    if isinstance(end_date, str):
+        end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
+    sync_task = LoadCapacityDatacenterRange(
+        start_date=start_date,
+        end_date=end_date,
+        parallelism=parallelism,
+        job_id=job_id,
+    )
+    return LoadCapacityDatacenterRange._serializable(sync_task.run())
@@ -12,6 +12,7 @@ from django.db import connection
 from app.utils import MixinGetDataset, Pipeline
 
 from ..models import CustomPollerAssignment
+from ..utils import bradesco_dimension
 
 
 class LoadCustomPollerAssignment(MixinGetDataset, Pipeline):
@@ -26,6 +27,8 @@ class LoadCustomPollerAssignment(MixinGetDataset, Pipeline):
         self.load(
             dataset=self.dataset, model=CustomPollerAssignment, filtro={}
         )
+        # o mapa assignment -> node dos loaders de fato depende desta tabela
+        bradesco_dimension.invalidate()
         return self.log
 
     def extract_and_transform_dataset(self) -> pl.DataFrame:
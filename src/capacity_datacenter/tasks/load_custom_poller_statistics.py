@@ -4,26 +4,49 @@ from typing import Dict
 
 import polars as pl
 from celery import shared_task
-from django.db import connection
 from django.utils import timezone
 
 from app.utils import MixinGetDataset, Pipeline
 
-from ..models import (
-    CustomPollerAssignment,
-    CustomPollerStatistics,
-    Node,
-    TaskLog,
+from ..models import CustomPollerStatistics
+from ..utils import (
+    MixinIncrementalLoad,
+    WindowedOpenQuery,
+    bradesco_dimension,
+    merge_partial_means,
+    node_set_filter,
+    partial_schema,
+    restrict_to,
 )
 
 
-class LoadCustompollerStatistics(MixinGetDataset, Pipeline):
+class LoadCustompollerStatistics(MixinIncrementalLoad, MixinGetDataset, Pipeline):
     """Classe que busca os dados do custom poller statistics"""
 
-    def __init__(self, start_date=None, end_date=None):
+    # "aggregate": SUM/COUNT por assignment/dia calculados na OPENQUERY; "raw": amostras brutas
+    extract_mode = "aggregate"
+    # conjunto de ids resolvido no servidor remoto (ver `capacity_datacenter.utils.node_set`)
+    node_set = "bradesco_assignments"
+    # "replace": DELETE do intervalo + INSERT; "incremental": upsert só dos dias com
+    # amostras novas (ver `capacity_datacenter.utils.incremental_load`)
+    load_mode = "replace"
+    remote_table = "[BR_TD_VITAIT].dbo.[CustomPollerStatistics_CS]"
+    remote_id_column = "CustomPollerAssignmentID"
+
+    def __init__(
+        self,
+        start_date=None,
+        end_date=None,
+        parallelism=None,
+        extract_mode=None,
+        load_mode=None,
+    ):
         super().__init__()
         self.start_date = start_date
         self.end_date = end_date
+        self.parallelism = parallelism
+        self.extract_mode = extract_mode or self.extract_mode
+        self.load_mode = load_mode or self.load_mode
         self.log["start_time"] = timezone.now()
         self.log["started_at"] = self.log.get(
             "start_time", self.log.get("started_at")
@@ -31,53 +54,29 @@ class LoadCustompollerStatistics(MixinGetDataset, Pipeline):
 
     def run(self) -> Dict:
         """Método principal da classe"""
-        try:
-            self.extract_and_transform_dataset()
-            self.load(
-                dataset=self.dataset,
-                model=CustomPollerStatistics,
-                filtro=self._filter,
-            )
-        finally:
-            self.log["end_time"] = timezone.now()
-            self.log["finished_at"] = self.log.get(
-                "end_time", self.log.get("finished_at")
-            )
-            start = self.log.get("start_time") or self.log.get("started_at")
-            end = self.log.get("end_time") or self.log.get("finished_at")
-            if start and end:
-                self.log["duration_seconds"] = round(
-                    (end - start).total_seconds(), 2
-                )
-                self.log["duration"] = self.log["duration_seconds"]
+        with self.task_log():
+            if self.load_mode == "incremental":
+                self.load_incremental(model=CustomPollerStatistics)
             else:
-                self.log["duration_seconds"] = None
-
-        serializable_log = {}
-        for k, v in self.log.items():
-            try:
-                if hasattr(v, "isoformat"):
-                    serializable_log[k] = v.isoformat()
-                else:
-                    serializable_log[k] = v
-            except (AttributeError, TypeError, ValueError):
-                serializable_log[k] = str(v)
-        self.log["transformed_rows_count"] = len(self.dataset)
-        TaskLog.objects.create(
-            task_name=self.__class__.__name__,
-            run_at=self.log.get("start_time"),
-            log=serializable_log,
-        )
-
+                with self.phase("extract_transform"):
+                    self.extract_and_transform_dataset()
+                self.load(dataset=self.dataset, model=CustomPollerStatistics, filtro=self._filter)
         return self.log
 
     def extract_and_transform_dataset(self) -> pl.DataFrame:
         """Extrai e transforma o dataset principal."""
+        self.log["extract_mode"] = self.extract_mode
+        if self.extract_mode == "aggregate":
+            # RawStatus > 2000 já vem NULL da OPENQUERY (o limite de 300000 não se aplica)
+            self.dataset = merge_partial_means(
+                self._custom_poller_statistics_partials,
+                keys=["node_id", "date"],
+                columns=["weight", "raw_status"],
+            ).with_columns(pl.col("date").cast(pl.Date))
+            return
         self.dataset = (
             self._custom_poller_statistics_dataset.with_columns(
-                pl.col("weight").cast(pl.Float64),
                 pl.col("date").cast(pl.Date),
-                pl.col("raw_status").cast(pl.Float64),
             )
             .with_columns(
                 pl.when(pl.col("raw_status") > 300000)
@@ -96,23 +95,49 @@ class LoadCustompollerStatistics(MixinGetDataset, Pipeline):
             .sort(["node_id", "date"])
         )
 
+    @property
+    def _custom_poller_statistics_partials(self) -> pl.DataFrame:
+        """SUM/COUNT por assignment, dia e janela (agregados no servidor remoto), já com `node_id`."""
+        schema = partial_schema(
+            keys=["custom_poller_assignment_id", "date"],
+            columns=["weight", "raw_status"],
+        )
+        if not self._assignment_id_list:
+            partials = pl.DataFrame(schema=schema)
+        else:
+            window_start, end_dt = self._get_window_range()
+            partials = WindowedOpenQuery(
+                build_query=self._openquery_aggregate,
+                ids=None,
+                start=window_start,
+                end=end_dt,
+                parallelism=self.parallelism,
+                log=self.log,
+                schema=schema,
+            ).fetch_frame()
+        return (
+            partials.pipe(
+                restrict_to,
+                column="custom_poller_assignment_id",
+                ids=self._assignment_id_list,
+            )
+            .with_columns(
+                pl.col("custom_poller_assignment_id")
+                .replace(self._assignment_id_map)
+                .alias("node_id")
+            )
+            .drop("custom_poller_assignment_id")
+        )
+
     @property
     def _custom_poller_statistics_dataset(self) -> pl.DataFrame:
         """Retorna o dataset de Custom Poller Statistics."""
 
-        schema = {
-            "CustomPollerAssignmentID": pl.String,
-            "RowID": pl.String,
-            "DateTime": pl.String,
-            "RawStatus": pl.String,
-            "Weight": pl.String,
-        }
-
         return (
-            pl.DataFrame(
-                data=self._custom_poller_statistics_list,
-                schema=schema,
-                orient="row",
+            self._custom_poller_statistics_frame.pipe(
+                restrict_to,
+                column="CustomPollerAssignmentID",
+                ids=self._assignment_id_list,
             )
             .with_columns(
                 pl.col("CustomPollerAssignmentID")
@@ -131,71 +156,87 @@ class LoadCustompollerStatistics(MixinGetDataset, Pipeline):
         )
 
     @property
-    def _custom_poller_statistics_list(self) -> list:
-        """Retorna uma lista com os dados de [CustomPollerStatistics_CS]"""
+    def _custom_poller_statistics_frame(self) -> pl.DataFrame:
+        """Retorna os dados de [CustomPollerStatistics_CS] já tipados (métricas em Float64)."""
+        schema = {
+            "CustomPollerAssignmentID": pl.String,
+            "RowID": pl.String,
+            "DateTime": pl.String,
+            "RawStatus": pl.Float64,
+            "Weight": pl.Float64,
+        }
         if not self._assignment_id_list:
-            return []
-
-        batch_size = 180
-        batches = [
-            self._assignment_id_list[i : i + batch_size]
-            for i in range(0, len(self._assignment_id_list), batch_size)
-        ]
+            return pl.DataFrame(schema=schema)
 
         window_start, end_dt = self._get_window_range()
         if window_start is None or end_dt is None:
-            return pl.DataFrame()
-        collected_rows = []
-
-        while window_start < end_dt:
-            window_end = min(window_start + timedelta(hours=2), end_dt)
-            for batch in batches:
-                in_list = ",".join(f"'{self._esc(a)}'" for a in batch)
-
-                inner_query = (
-                    "SELECT\n"
-                    "    poller.CustomPollerAssignmentID,\n"
-                    "    poller.RowID,\n"
-                    "    CONVERT(VARCHAR(10), poller.DateTime, 23) AS DateTime,\n"
-                    "    CASE WHEN poller.RawStatus > 2000 THEN NULL ELSE poller.RawStatus END AS RawStatus,\n"
-                    "    poller.Weight\n"
-                    "FROM [BR_TD_VITAIT].dbo.[CustomPollerStatistics_CS] poller\n"
-                    f"WHERE poller.CustomPollerAssignmentID IN ({in_list})\n"
-                    f"AND poller.DateTime >= '{window_start.strftime('%Y-%m-%d %H:%M:%S')}'\n"
-                    f"AND poller.DateTime < '{window_end.strftime('%Y-%m-%d %H:%M:%S')}'"
-                )
-
-                inner_for_openquery = inner_query.replace("'", "''")
-                full_query = (
-                    "SELECT CustomPollerAssignmentID,  RowID, DateTime, RawStatus, Weight FROM OPENQUERY([172.21.3.221], '"
-                    + inner_for_openquery
-                    + "') AS poller"
-                )
-
-                with connection.cursor() as cursor:
-                    cursor.execute(full_query)
-                    result = cursor.fetchall()
-
-                if not result:
-                    continue
-
-                collected_rows.extend(result)
-
-            print(
-                f"Linhas coletadas... {len(collected_rows):,}".replace(
-                    ",", "."
-                )
-            )
-
-            window_start = window_end
+            return pl.DataFrame(schema=schema)
+
+        collected = WindowedOpenQuery(
+            build_query=self._openquery,
+            ids=None,
+            start=window_start,
+            end=end_dt,
+            parallelism=self.parallelism,
+            log=self.log,
+            schema=schema,
+        ).fetch_frame()
 
         print(
-            f"Tamanho final do dataset antes de agrupar:{len(collected_rows):,}".replace(
+            f"Tamanho final do dataset antes de agrupar:{len(collected):,}".replace(
                 ",", "."
             )
         )
-        self.log["collected_rows_count"] = len(collected_rows)
-        return collected_rows
+        return collected
+
+    def _openquery(self, window_start, window_end, batch) -> str:
+        """Monta a consulta OPENQUERY de uma janela (todos os CustomPollerAssignmentIDs do `node_set`)."""
+        inner_query = (
+            "SELECT\n"
+            "    poller.CustomPollerAssignmentID,\n"
+            "    poller.RowID,\n"
+            "    CONVERT(VARCHAR(10), poller.DateTime, 23) AS DateTime,\n"
+            "    CASE WHEN poller.RawStatus > 2000 THEN NULL ELSE poller.RawStatus END AS RawStatus,\n"
+            "    poller.Weight\n"
+            "FROM [BR_TD_VITAIT].dbo.[CustomPollerStatistics_CS] poller\n"
+            f"WHERE {node_set_filter('poller.CustomPollerAssignmentID', self.node_set)}\n"
+            f"AND poller.DateTime >= '{window_start.strftime('%Y-%m-%d %H:%M:%S')}'\n"
+            f"AND poller.DateTime < '{window_end.strftime('%Y-%m-%d %H:%M:%S')}'"
+        )
+
+        inner_for_openquery = inner_query.replace("'", "''")
+        return (
+            "SELECT CustomPollerAssignmentID,  RowID, DateTime, RawStatus, Weight FROM OPENQUERY([172.21.3.221], '"
+            + inner_for_openquery
+            + "') AS poller"
+        )
+
+    def _openquery_aggregate(self, window_start, window_end, batch) -> str:
+        """Consulta OPENQUERY que já devolve SUM/COUNT por CustomPollerAssignmentID e dia da janela."""
+        raw_status = (
+            "CASE WHEN poller.RawStatus > 2000 THEN NULL ELSE poller.RawStatus END"
+        )
+        inner_query = (
+            "SELECT\n"
+            "    poller.CustomPollerAssignmentID,\n"
+            "    CONVERT(VARCHAR(10), poller.DateTime, 23) AS DateTime,\n"
+            "    SUM(CAST(poller.Weight AS FLOAT)) AS WeightSum,\n"
+            "    COUNT(poller.Weight) AS WeightCount,\n"
+            f"    SUM(CAST({raw_status} AS FLOAT)) AS RawStatusSum,\n"
+            f"    COUNT({raw_status}) AS RawStatusCount\n"
+            "FROM [BR_TD_VITAIT].dbo.[CustomPollerStatistics_CS] poller\n"
+            f"WHERE {node_set_filter('poller.CustomPollerAssignmentID', self.node_set)}\n"
+            f"AND poller.DateTime >= '{window_start.strftime('%Y-%m-%d %H:%M:%S')}'\n"
+            f"AND poller.DateTime < '{window_end.strftime('%Y-%m-%d %H:%M:%S')}'\n"
+            "GROUP BY poller.CustomPollerAssignmentID, CONVERT(VARCHAR(10), poller.DateTime, 23)"
+        )
+        inner_for_openquery = inner_query.replace("'", "''")
+        return (
+            "SELECT CustomPollerAssignmentID, DateTime, WeightSum, WeightCount, "
+            "RawStatusSum, RawStatusCount FROM OPENQUERY([172.21.3.221], '"
+            + inner_for_openquery
+            + "') AS poller"
+        )
 
     def _get_window_range(self):
         """Retorna (start_dt, end_dt) como datetimes para iteração em janelas de 2h.
@@ -241,47 +282,17 @@ class LoadCustompollerStatistics(MixinGetDataset, Pipeline):
     @cached_property
     def _assignment_id_map(self) -> dict:
         """Retorna um dicionário {assignment_id: node_id} filtrado por cliente (BRADESCO)."""
-        if not self._node_id_list:
-            return {}
-        batch_size = 500
-        mapping = {}
-        for i in range(0, len(self._node_id_list), batch_size):
-            batch = self._node_id_list[i : i + batch_size]
-            qs = CustomPollerAssignment.objects.filter(
-                node_id__in=batch
-            ).values_list("custom_poller_assignment_id", "node_id")
-            for aid, node in qs:
-                if aid is not None:
-                    mapping[str(aid)] = node
-        return mapping
+        return bradesco_dimension.assignment_id_map
 
     @cached_property
     def _assignment_id_list(self) -> list:
         """Retorna a lista de CustomPollerAssignmentIDs filtrados por cliente (BRADESCO)."""
-        if not self._node_id_list:
-            return []
-        batch_size = 500
-        assignment_ids = []
-        for i in range(0, len(self._node_id_list), batch_size):
-            batch = self._node_id_list[i : i + batch_size]
-            qs = CustomPollerAssignment.objects.filter(
-                node_id__in=batch
-            ).values_list("custom_poller_assignment_id", flat=True)
-            assignment_ids.extend(list(qs))
-        return list(dict.fromkeys(assignment_ids))
+        return bradesco_dimension.assignment_id_list
 
     @cached_property
     def _node_id_list(self) -> list:
-        """Lista de node_id's do cliente BRADESCO (cached)."""
-        return list(
-            Node.objects.filter(
-                nome_do_cliente__icontains="BRADESCO"
-            ).values_list("node_id", flat=True)
-        )
-
-    def _esc(self, s: str) -> str:
-        """Escapa aspas simples para uso em OPENQUERY."""
-        return s.replace("'", "''")
+        """Lista de node_id's do cliente BRADESCO (cache do processo)."""
+        return bradesco_dimension.node_id_list
 
 
 @shared_task(
@@ -292,9 +303,18 @@ class LoadCustompollerStatistics(MixinGetDataset, Pipeline):
     retry_kwargs={"max_retries": 3},
 )
 def load_custom_poller_statistics_async(
-    _task, start_date=None, end_date=None
+    _task,
+    start_date=None,
+    end_date=None,
+    parallelism=None,
+    extract_mode=None,
+    load_mode=None,
 ) -> Dict:
     sync_task = LoadCustompollerStatistics(
-        start_date=start_date, end_date=end_date
+        start_date=start_date,
+        end_date=end_date,
+        parallelism=parallelism,
+        extract_mode=extract_mode,
+        load_mode=load_mode,
     )
     return sync_task.run()
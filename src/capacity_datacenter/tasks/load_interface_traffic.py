@@ -4,65 +4,77 @@ from typing import Dict
 
 import polars as pl
 from celery import shared_task
-from django.db import connection
 from django.utils import timezone as _tz
 
 from app.utils import MixinGetDataset, Pipeline
 
-from ..models import Node, InterfaceTraffic, TaskLog
+from ..models import InterfaceTraffic
+from ..utils import (
+    MixinIncrementalLoad,
+    WindowedOpenQuery,
+    bradesco_dimension,
+    merge_partial_means,
+    node_set_filter,
+    partial_schema,
+    restrict_to,
+)
 
 
-class LoadInterfaceTraffic(MixinGetDataset, Pipeline):
+class LoadInterfaceTraffic(MixinIncrementalLoad, MixinGetDataset, Pipeline):
     """Carrega dados de tráfego das interfaces a partir da base remota."""
 
-    def __init__(self, start_date=None, end_date=None):
+    load_backend = "fast"
+    # "aggregate": SUM/COUNT por node/dia calculados na OPENQUERY; "raw": amostras brutas
+    extract_mode = "aggregate"
+    # conjunto de ids resolvido no servidor remoto (ver `capacity_datacenter.utils.node_set`)
+    node_set = "bradesco_nodes"
+    # "replace": DELETE do intervalo + INSERT; "incremental": upsert só dos dias com
+    # amostras novas (ver `capacity_datacenter.utils.incremental_load`)
+    load_mode = "replace"
+    # tabela de destino (as subclasses de rollup horário trocam a model)
+    model = InterfaceTraffic
+    remote_table = "[BR_TD_VITAIT].dbo.[InterfaceTraffic]"
+    remote_id_column = "NodeID"
+
+    def __init__(
+        self,
+        start_date=None,
+        end_date=None,
+        parallelism=None,
+        extract_mode=None,
+        load_mode=None,
+    ):
         super().__init__()
         self.start_date = start_date
         self.end_date = end_date
+        self.parallelism = parallelism
+        self.extract_mode = extract_mode or self.extract_mode
+        self.load_mode = load_mode or self.load_mode
         self.log["start_time"] = _tz.now()
         self.log["started_at"] = self.log.get(
             "start_time", self.log.get("started_at")
         )
 
-    def run(self) -> None:
-        try:
-            self.extract_and_transform_dataset()
-            self.load(dataset=self.dataset, model=InterfaceTraffic, filtro=self.date_filter)
-
-        finally:
-            self.log["end_time"] = _tz.now()
-            self.log["finished_at"] = self.log.get(
-                "end_time", self.log.get("finished_at")
-            )
-            start = self.log.get("start_time") or self.log.get("started_at")
-            end = self.log.get("end_time") or self.log.get("finished_at")
-            if start and end:
-                self.log["duration_seconds"] = round(
-                    (end - start).total_seconds(), 2
-                )
-                self.log["duration"] = self.log["duration_seconds"]
+    def run(self) -> Dict:
+        """Método principal da classe"""
+        with self.task_log():
+            if self.load_mode == "incremental":
+                self.load_incremental(model=self.model)
             else:
-                self.log["duration_seconds"] = None
-
-        serializable_log = {}
-        for k, v in self.log.items():
-            try:
-                if hasattr(v, "isoformat"):
-                    serializable_log[k] = v.isoformat()
-                else:
-                    serializable_log[k] = v
-            except (AttributeError, TypeError, ValueError):
-                serializable_log[k] = str(v)
-        self.log["transformed_rows_count"] = len(self.dataset)
-        TaskLog.objects.create(
-            task_name=self.__class__.__name__,
-            run_at=self.log.get("start_time"),
-            log=serializable_log,
-        )
-
+                with self.phase("extract_transform"):
+                    self.extract_and_transform_dataset()
+                self.load(dataset=self.dataset, model=self.model, filtro=self.date_filter)
         return self.log
 
     def extract_and_transform_dataset(self) -> pl.DataFrame:
+        self.log["extract_mode"] = self.extract_mode
+        if self.extract_mode == "aggregate":
+            self.dataset = merge_partial_means(
+                self.interface_traffic_partials,
+                keys=["node_id", "date"],
+                columns=["in_average_bps", "out_average_bps"],
+            )
+            return
         self.dataset = (
             self.interface_traffic_dataset.group_by(["node_id", "date"]) 
             .agg([
@@ -73,70 +85,62 @@ class LoadInterfaceTraffic(MixinGetDataset, Pipeline):
         )
 
     @property
-    def interface_traffic_dataset(self) -> pl.DataFrame:
+    def interface_traffic_partials(self) -> pl.DataFrame:
+        """SUM/COUNT de tráfego por node, dia e janela, agregados no servidor remoto."""
+        schema = partial_schema(
+            keys=["node_id", "date"],
+            columns=["in_average_bps", "out_average_bps"],
+        )
         if not self._node_id_list:
-            return pl.DataFrame()
-
-        batch_size = 500
-        node_batches = [
-            self._node_id_list[i : i + batch_size]
-            for i in range(0, len(self._node_id_list), batch_size)
-        ]
+            return pl.DataFrame(schema=schema)
 
         window_start, end_dt = self._get_window_range()
         if window_start is None or end_dt is None:
-            return pl.DataFrame()
-
-        collected_rows = []
-
-        while window_start < end_dt:
-            window_end = min(window_start + timedelta(hours=2), end_dt)
-
-            for batch in node_batches:
-                in_list = ",".join(f"'{self._esc(n)}'" for n in batch)
-
-                inner_query = (
-                    "SELECT\n                        traffic.NodeID,\n                        CONVERT(VARCHAR(10), traffic.DateTime, 23) AS DateTime,\n                        traffic.In_Averagebps,\n                        traffic.Out_Averagebps\n                    FROM [BR_TD_VITAIT].dbo.[InterfaceTraffic] traffic\n                    WHERE traffic.NodeID IN ("
-                    + in_list
-                    + ") AND traffic.DateTime >= '"
-                    + window_start.strftime("%Y-%m-%d %H:%M:%S")
-                    + "' AND traffic.DateTime < '"
-                    + window_end.strftime("%Y-%m-%d %H:%M:%S")
-                    + "'"
-                )
-                inner_for_openquery = inner_query.replace("'", "''")
-                full_query = (
-                    "SELECT NodeID, DateTime, In_Averagebps, Out_Averagebps FROM OPENQUERY([172.21.3.221], '"
-                    + inner_for_openquery
-                    + "') AS traffic"
-                )
-
-                with connection.cursor() as cursor:
-                    cursor.execute(full_query)
-                    result = cursor.fetchall()
-
-                if not result:
-                    continue
-
-                collected_rows.extend(result)
-
-            window_start = window_end
+            return pl.DataFrame(schema=schema)
+
+        partials = WindowedOpenQuery(
+            build_query=self._openquery_aggregate,
+            ids=None,
+            start=window_start,
+            end=end_dt,
+            parallelism=self.parallelism,
+            log=self.log,
+            schema=schema,
+        ).fetch_frame()
+        # o conjunto remoto pode conter nós que ainda não estão na tabela Node local
+        return partials.pipe(restrict_to, column="node_id", ids=self._node_id_list)
 
-        self.log["collected_rows_count"] = len(collected_rows)
+    @property
+    def interface_traffic_dataset(self) -> pl.DataFrame:
+        if not self._node_id_list:
+            return pl.DataFrame()
 
-        if not collected_rows:
+        window_start, end_dt = self._get_window_range()
+        if window_start is None or end_dt is None:
             return pl.DataFrame()
 
         schema = {
             "NodeID": pl.String,
             "DateTime": pl.String,
-            "In_Averagebps": pl.String,
-            "Out_Averagebps": pl.String,
+            "In_Averagebps": pl.Float64,
+            "Out_Averagebps": pl.Float64,
         }
 
+        collected = WindowedOpenQuery(
+            build_query=self._openquery,
+            ids=None,
+            start=window_start,
+            end=end_dt,
+            parallelism=self.parallelism,
+            log=self.log,
+            schema=schema,
+        ).fetch_frame()
+
+        if collected.is_empty():
+            return pl.DataFrame()
+
         return (
-            pl.DataFrame(data=collected_rows, schema=schema, orient="row")
-            .rename(
+            collected.rename(
                 {
                     "NodeID": "node_id",
                     "DateTime": "date",
@@ -144,10 +148,48 @@ class LoadInterfaceTraffic(MixinGetDataset, Pipeline):
                     "Out_Averagebps": "out_average_bps",
                 }
             )
-            .with_columns(
-                pl.col("in_average_bps").cast(pl.Float64),
-                pl.col("out_average_bps").cast(pl.Float64),
-            )
+            .pipe(restrict_to, column="node_id", ids=self._node_id_list)
+        )
+
+    def _openquery(self, window_start, window_end, batch) -> str:
+        """Monta a consulta OPENQUERY de uma janela (todos os NodeIDs do `node_set`)."""
+        inner_query = (
+            "SELECT\n                        traffic.NodeID,\n                        CONVERT(VARCHAR(10), traffic.DateTime, 23) AS DateTime,\n                        traffic.In_Averagebps,\n                        traffic.Out_Averagebps\n                    FROM [BR_TD_VITAIT].dbo.[InterfaceTraffic] traffic\n                    WHERE "
+            + node_set_filter("traffic.NodeID", self.node_set)
+            + " AND traffic.DateTime >= '"
+            + window_start.strftime("%Y-%m-%d %H:%M:%S")
+            + "' AND traffic.DateTime < '"
+            + window_end.strftime("%Y-%m-%d %H:%M:%S")
+            + "'"
+        )
+        inner_for_openquery = inner_query.replace("'", "''")
+        return (
+            "SELECT NodeID, DateTime, In_Averagebps, Out_Averagebps FROM OPENQUERY([172.21.3.221], '"
+            + inner_for_openquery
+            + "') AS traffic"
+        )
+
+    def _openquery_aggregate(self, window_start, window_end, batch) -> str:
+        """Consulta OPENQUERY que já devolve SUM/COUNT por NodeID e dia da janela."""
+        inner_query = (
+            "SELECT\n"
+            "    traffic.NodeID,\n"
+            "    CONVERT(VARCHAR(10), traffic.DateTime, 23) AS DateTime,\n"
+            "    SUM(CAST(traffic.In_Averagebps AS FLOAT)) AS InSum,\n"
+            "    COUNT(traffic.In_Averagebps) AS InCount,\n"
+            "    SUM(CAST(traffic.Out_Averagebps AS FLOAT)) AS OutSum,\n"
+            "    COUNT(traffic.Out_Averagebps) AS OutCount\n"
+            "FROM [BR_TD_VITAIT].dbo.[InterfaceTraffic] traffic\n"
+            f"WHERE {node_set_filter('traffic.NodeID', self.node_set)}\n"
+            f"AND traffic.DateTime >= '{window_start.strftime('%Y-%m-%d %H:%M:%S')}'\n"
+            f"AND traffic.DateTime < '{window_end.strftime('%Y-%m-%d %H:%M:%S')}'\n"
+            "GROUP BY traffic.NodeID, CONVERT(VARCHAR(10), traffic.DateTime, 23)"
+        )
+        inner_for_openquery = inner_query.replace("'", "''")
+        return (
+            "SELECT NodeID, DateTime, InSum, InCount, OutSum, OutCount FROM OPENQUERY([172.21.3.221], '"
+            + inner_for_openquery
+            + "') AS traffic"
         )
 
     def _get_window_range(self):
@@ -183,14 +225,7 @@ class LoadInterfaceTraffic(MixinGetDataset, Pipeline):
 
     @cached_property
     def _node_id_list(self) -> list:
-        return list(
-            Node.objects.filter(
-                nome_do_cliente__icontains="BRADESCO"
-            ).values_list("node_id", flat=True)
-        )
-
-    def _esc(self, s: str) -> str:
-        return s.replace("'", "''")
+        return bradesco_dimension.node_id_list
 
 
 @shared_task(
@@ -200,6 +235,19 @@ class LoadInterfaceTraffic(MixinGetDataset, Pipeline):
     retry_backoff=5,
     retry_kwargs={"max_retries": 3},
 )
-def load_interface_traffic_async(_task, start_date=None, end_date=None) -> Dict:
-    sync_task = LoadInterfaceTraffic(start_date=start_date, end_date=end_date)
+def load_interface_traffic_async(
+    _task,
+    start_date=None,
+    end_date=None,
+    parallelism=None,
+    extract_mode=None,
+    load_mode=None,
+) -> Dict:
+    sync_task = LoadInterfaceTraffic(
+        start_date=start_date,
+        end_date=end_date,
+        parallelism=parallelism,
+        extract_mode=extract_mode,
+        load_mode=load_mode,
+    )
     return sync_task.run()
@@ -0,0 +1,87 @@
+from typing import Dict
+
+import polars as pl
+from celery import shared_task
+
+from ..models import InterfaceTrafficHourly
+from ..utils import WindowedOpenQuery, hourly_rollup, node_set_filter, restrict_to
+from .load_interface_traffic import LoadInterfaceTraffic
+
+
+class LoadInterfaceTrafficHourly(LoadInterfaceTraffic):
+    """Rollup horário do tráfego das interfaces (média, máximo, p95 e nº de amostras).
+
+    Usa a mesma janela, `node_set`, modos de carga e log de `LoadInterfaceTraffic`, mas
+    extrai as amostras com a hora (`YYYY-MM-DD HH`) e agrega por (node_id, date, hour)
+    com `hourly_rollup`, gravando em `f_interface_traffic_hourly`.
+    """
+
+    model = InterfaceTrafficHourly
+    incremental_key = ("node_id", "date", "hour")
+    rollup_columns = {
+        "in_average_bps": "in_{stat}_bps",
+        "out_average_bps": "out_{stat}_bps",
+    }
+
+    def extract_and_transform_dataset(self) -> pl.DataFrame:
+        """Extrai as amostras por janela e agrega cada janela por hora assim que chega."""
+        self.log["extract_mode"] = "hourly"
+        window_start, end_dt = self._get_window_range()
+        query = WindowedOpenQuery(
+            build_query=self._openquery_hourly,
+            ids=None,
+            start=window_start,
+            end=end_dt,
+            parallelism=self.parallelism,
+            log=self.log,
+            schema={
+                "node_id": pl.String,
+                "hour_start": pl.String,
+                "in_average_bps": pl.Float64,
+                "out_average_bps": pl.Float64,
+            },
+        )
+        frames = (
+            frame.pipe(restrict_to, column="node_id", ids=self._node_id_list)
+            for frame in (query.iter_results() if self._node_id_list else [])
+        )
+        self.dataset = hourly_rollup(frames, columns=self.rollup_columns)
+
+    def _openquery_hourly(self, window_start, window_end, batch) -> str:
+        """Consulta OPENQUERY de uma janela com a hora de cada amostra."""
+        inner_query = (
+            "SELECT\n"
+            "    traffic.NodeID,\n"
+            "    CONVERT(VARCHAR(13), traffic.DateTime, 120) AS HourStart,\n"
+            "    traffic.In_Averagebps,\n"
+            "    traffic.Out_Averagebps\n"
+            "FROM [BR_TD_VITAIT].dbo.[InterfaceTraffic] traffic\n"
+            f"WHERE {node_set_filter('traffic.NodeID', self.node_set)}\n"
+            f"AND traffic.DateTime >= '{window_start.strftime('%Y-%m-%d %H:%M:%S')}'\n"
+            f"AND traffic.DateTime < '{window_end.strftime('%Y-%m-%d %H:%M:%S')}'"
+        )
+        inner_for_openquery = inner_query.replace("'", "''")
+        return (
+            "SELECT NodeID, HourStart, In_Averagebps, Out_Averagebps FROM OPENQUERY([172.21.3.221], '"
+            + inner_for_openquery
+            + "') AS traffic"
+        )
+
+
+@shared_task(
+    name="capacity_datacenter.load_interface_traffic_hourly_async",
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_backoff=5,
+    retry_kwargs={"max_retries": 3},
+)
+def load_interface_traffic_hourly_async(
+    _task, start_date=None, end_date=None, parallelism=None, load_mode=None
+) -> Dict:
+    sync_task = LoadInterfaceTrafficHourly(
+        start_date=start_date,
+        end_date=end_date,
+        parallelism=parallelism,
+        load_mode=load_mode,
+    )
+    return sync_task.run()
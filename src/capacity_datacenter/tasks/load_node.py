@@ -7,11 +7,11 @@ from typing import Dict
 import polars as pl
 import requests
 from celery import shared_task
-from django.db import connection
 
-from app.utils import MixinGetDataset, Pipeline
+from app.utils import MixinGetDataset, Pipeline, read_frame
 
 from ..models import Node
+from ..utils import bradesco_dimension
 
 
 class LoadNode(MixinGetDataset, Pipeline):
@@ -25,6 +25,8 @@ class LoadNode(MixinGetDataset, Pipeline):
         self.extract_and_transform_dataset()
 
         self.load(dataset=self.dataset, model=Node, filtro={})
+        # a lista de nodes BRADESCO dos loaders de fato depende desta tabela
+        bradesco_dimension.invalidate()
         return self.log
 
     def extract_and_transform_dataset(self) -> pl.DataFrame:
@@ -75,15 +77,6 @@ class LoadNode(MixinGetDataset, Pipeline):
         ) AS nodes
         """
 
-        with connection.cursor() as cursor:
-            cursor.execute(query)
-            result = cursor.fetchall()
-
-        # Prepare polars dataframe from rows
-        if not result:
-            return pl.DataFrame()
-
-        # Build DataFrame using row-orient construction; ensure values are strings where sensible
         schema = {
             "Nome_do_Cliente": pl.String,
             "NodeID": pl.String,
@@ -96,10 +89,13 @@ class LoadNode(MixinGetDataset, Pipeline):
             "Tecnologia": pl.String,
             "Servico": pl.String,
         }
+        # leitura em blocos de fetchmany direto para o DataFrame (ver `app.utils.cursor_frame`)
+        result = read_frame(query, schema=schema)
+        if result.is_empty():
+            return pl.DataFrame()
 
         return (
-            pl.DataFrame(data=list(result), schema=schema, orient="row")
-            .rename(
+            result.rename(
                 {
                     "Nome_do_Cliente": "nome_do_cliente",
                     "NodeID": "node_id",
@@ -4,72 +4,78 @@ from typing import Dict
 
 import polars as pl
 from celery import shared_task
-from django.db import connection
 from django.utils import timezone as _tz
 
 from app.utils import MixinGetDataset, Pipeline
 
-from ..models import Node, ResponseTime, TaskLog
+from ..models import ResponseTime
+from ..utils import (
+    MixinIncrementalLoad,
+    WindowedOpenQuery,
+    bradesco_dimension,
+    merge_partial_means,
+    node_set_filter,
+    partial_schema,
+    restrict_to,
+)
 
 
-class LoadResponseTime(MixinGetDataset, Pipeline):
+class LoadResponseTime(MixinIncrementalLoad, MixinGetDataset, Pipeline):
     """Classe que busca os dados do meraki"""
 
-    def __init__(self, start_date=None, end_date=None):
+    # "aggregate": SUM/COUNT por node/dia calculados na OPENQUERY; "raw": amostras brutas
+    extract_mode = "aggregate"
+    # conjunto de ids resolvido no servidor remoto (ver `capacity_datacenter.utils.node_set`)
+    node_set = "bradesco_nodes"
+    # "replace": DELETE do intervalo + INSERT; "incremental": upsert só dos dias com
+    # amostras novas (ver `capacity_datacenter.utils.incremental_load`)
+    load_mode = "replace"
+    # tabela de destino (as subclasses de rollup horário trocam a model)
+    model = ResponseTime
+    remote_table = "[BR_TD_VITAIT].dbo.[ResponseTime]"
+    remote_id_column = "NodeID"
+
+    def __init__(
+        self,
+        start_date=None,
+        end_date=None,
+        parallelism=None,
+        extract_mode=None,
+        load_mode=None,
+    ):
         super().__init__()
         self.start_date = start_date
         self.end_date = end_date
+        self.parallelism = parallelism
+        self.extract_mode = extract_mode or self.extract_mode
+        self.load_mode = load_mode or self.load_mode
         self.log["start_time"] = _tz.now()
         self.log["started_at"] = self.log.get(
             "start_time", self.log.get("started_at")
         )
 
-    def run(self) -> None:
+    def run(self) -> Dict:
         """Método principal da classe"""
-
-        try:
-            self.extract_and_transform_dataset()
-            self.load(
-                dataset=self.dataset,
-                model=ResponseTime,
-                filtro=self.date_filter,
-            )
-
-        finally:
-            self.log["end_time"] = _tz.now()
-            self.log["finished_at"] = self.log.get(
-                "end_time", self.log.get("finished_at")
-            )
-            start = self.log.get("start_time") or self.log.get("started_at")
-            end = self.log.get("end_time") or self.log.get("finished_at")
-            if start and end:
-                self.log["duration_seconds"] = round(
-                    (end - start).total_seconds(), 2
-                )
-                self.log["duration"] = self.log["duration_seconds"]
+        with self.task_log():
+            if self.load_mode == "incremental":
+                self.load_incremental(model=self.model)
             else:
-                self.log["duration_seconds"] = None
-
-        serializable_log = {}
-        for k, v in self.log.items():
-            try:
-                if hasattr(v, "isoformat"):
-                    serializable_log[k] = v.isoformat()
-                else:
-                    serializable_log[k] = v
-            except (AttributeError, TypeError, ValueError):
-                serializable_log[k] = str(v)
-        self.log["transformed_rows_count"] = len(self.dataset)
-        TaskLog.objects.create(
-            task_name=self.__class__.__name__,
-            run_at=self.log.get("start_time"),
-            log=serializable_log,
-        )
-
+                with self.phase("extract_transform"):
+                    self.extract_and_transform_dataset()
+                self.load(dataset=self.dataset, model=self.model, filtro=self.date_filter)
         return self.log
 
     def extract_and_transform_dataset(self) -> pl.DataFrame:
         """Extrai e transforma o dataset principal."""
+        self.log["extract_mode"] = self.extract_mode
+        if self.extract_mode == "aggregate":
+            # o limite de 300000 já é aplicado dentro da OPENQUERY
+            self.dataset = merge_partial_means(
+                self._response_time_partials,
+                keys=["node_id", "date"],
+                columns=["avg_response_time", "percent_loss"],
+            )
+            return
         self.dataset = (
             self._response_time_dataset
             .with_columns(
@@ -94,6 +100,32 @@ class LoadResponseTime(MixinGetDataset, Pipeline):
             .sort(["node_id", "date"])
         )
 
+    @property
+    def _response_time_partials(self) -> pl.DataFrame:
+        """SUM/COUNT de response time por node, dia e janela, agregados no servidor remoto."""
+        schema = partial_schema(
+            keys=["node_id", "date"],
+            columns=["avg_response_time", "percent_loss"],
+        )
+        if not self._node_id_list:
+            return pl.DataFrame(schema=schema)
+
+        window_start, end_dt = self._get_window_range()
+        if window_start is None or end_dt is None:
+            return pl.DataFrame(schema=schema)
+
+        partials = WindowedOpenQuery(
+            build_query=self._openquery_aggregate,
+            ids=None,
+            start=window_start,
+            end=end_dt,
+            parallelism=self.parallelism,
+            log=self.log,
+            schema=schema,
+        ).fetch_frame()
+        # o conjunto remoto pode conter nós que ainda não estão na tabela Node local
+        return partials.pipe(restrict_to, column="node_id", ids=self._node_id_list)
+
     @property
     def _response_time_dataset(self) -> pl.DataFrame:
         """Retorna o dataset de dispositivos Meraki."""
@@ -101,63 +133,29 @@ class LoadResponseTime(MixinGetDataset, Pipeline):
         if not self._node_id_list:
             return pl.DataFrame()
 
-        batch_size = 500
-        node_batches = [
-            self._node_id_list[i : i + batch_size]
-            for i in range(0, len(self._node_id_list), batch_size)
-        ]
-
         window_start, end_dt = self._get_window_range()
         if window_start is None or end_dt is None:
             return pl.DataFrame()
 
-        collected_rows = []
-
-        while window_start < end_dt:
-            window_end = min(window_start + timedelta(hours=2), end_dt)
-
-            for batch in node_batches:
-                in_list = ",".join(f"'{self._esc(n)}'" for n in batch)
-
-                inner_query = (
-                    "SELECT\n                        resp.NodeID,\n                        CONVERT(VARCHAR(10), resp.DateTime, 23) AS DateTime,\n                        resp.AvgResponseTime,\n                        resp.PercentLoss\n                    FROM [BR_TD_VITAIT].dbo.[ResponseTime] resp\n                    WHERE resp.NodeID IN ("
-                    + in_list
-                    + ") AND resp.DateTime >= '"
-                    + window_start.strftime("%Y-%m-%d %H:%M:%S")
-                    + "' AND resp.DateTime < '"
-                    + window_end.strftime("%Y-%m-%d %H:%M:%S")
-                    + "'"
-                )
-                inner_for_openquery = inner_query.replace("'", "''")
-                full_query = (
-                    "SELECT NodeID, DateTime, AvgResponseTime, PercentLoss FROM OPENQUERY([172.21.3.221], '"
-                    + inner_for_openquery
-                    + "') AS resp"
-                )
-
-                with connection.cursor() as cursor:
-                    cursor.execute(full_query)
-                    result = cursor.fetchall()
-
-                if not result:
-                    continue
-
-                collected_rows.extend(result)
-
-            window_start = window_end
-
-        self.log["collected_rows_count"] = len(collected_rows)
-
         schema = {
             "NodeID": pl.String,
             "DateTime": pl.String,
-            "AvgResponseTime": pl.String,
-            "PercentLoss": pl.String,
+            "AvgResponseTime": pl.Float64,
+            "PercentLoss": pl.Float64,
         }
 
+        collected = WindowedOpenQuery(
+            build_query=self._openquery,
+            ids=None,
+            start=window_start,
+            end=end_dt,
+            parallelism=self.parallelism,
+            log=self.log,
+            schema=schema,
+        ).fetch_frame()
+
         return (
-            pl.DataFrame(data=collected_rows, schema=schema, orient="row")
-            .rename(
+            collected.rename(
                 {
                     "NodeID": "node_id",
                     "DateTime": "date",
@@ -165,10 +163,50 @@ class LoadResponseTime(MixinGetDataset, Pipeline):
                     "PercentLoss": "percent_loss",
                 }
             )
-            .with_columns(
-                pl.col("avg_response_time").cast(pl.Float64),
-                pl.col("percent_loss").cast(pl.Float64),
-            )
+            .pipe(restrict_to, column="node_id", ids=self._node_id_list)
+        )
+
+    def _openquery(self, window_start, window_end, batch) -> str:
+        """Monta a consulta OPENQUERY de uma janela (todos os NodeIDs do `node_set`)."""
+        inner_query = (
+            "SELECT\n                        resp.NodeID,\n                        CONVERT(VARCHAR(10), resp.DateTime, 23) AS DateTime,\n                        resp.AvgResponseTime,\n                        resp.PercentLoss\n                    FROM [BR_TD_VITAIT].dbo.[ResponseTime] resp\n                    WHERE "
+            + node_set_filter("resp.NodeID", self.node_set)
+            + " AND resp.DateTime >= '"
+            + window_start.strftime("%Y-%m-%d %H:%M:%S")
+            + "' AND resp.DateTime < '"
+            + window_end.strftime("%Y-%m-%d %H:%M:%S")
+            + "'"
+        )
+        inner_for_openquery = inner_query.replace("'", "''")
+        return (
+            "SELECT NodeID, DateTime, AvgResponseTime, PercentLoss FROM OPENQUERY([172.21.3.221], '"
+            + inner_for_openquery
+            + "') AS resp"
+        )
+
+    def _openquery_aggregate(self, window_start, window_end, batch) -> str:
+        """Consulta OPENQUERY que já devolve SUM/COUNT por NodeID e dia da janela."""
+        inner_query = (
+            "SELECT\n"
+            "    resp.NodeID,\n"
+            "    CONVERT(VARCHAR(10), resp.DateTime, 23) AS DateTime,\n"
+            "    SUM(CAST(CASE WHEN resp.AvgResponseTime > 300000 THEN 300000 "
+            "ELSE resp.AvgResponseTime END AS FLOAT)) AS AvgResponseTimeSum,\n"
+            "    COUNT(resp.AvgResponseTime) AS AvgResponseTimeCount,\n"
+            "    SUM(CAST(resp.PercentLoss AS FLOAT)) AS PercentLossSum,\n"
+            "    COUNT(resp.PercentLoss) AS PercentLossCount\n"
+            "FROM [BR_TD_VITAIT].dbo.[ResponseTime] resp\n"
+            f"WHERE {node_set_filter('resp.NodeID', self.node_set)}\n"
+            f"AND resp.DateTime >= '{window_start.strftime('%Y-%m-%d %H:%M:%S')}'\n"
+            f"AND resp.DateTime < '{window_end.strftime('%Y-%m-%d %H:%M:%S')}'\n"
+            "GROUP BY resp.NodeID, CONVERT(VARCHAR(10), resp.DateTime, 23)"
+        )
+        inner_for_openquery = inner_query.replace("'", "''")
+        return (
+            "SELECT NodeID, DateTime, AvgResponseTimeSum, AvgResponseTimeCount, "
+            "PercentLossSum, PercentLossCount FROM OPENQUERY([172.21.3.221], '"
+            + inner_for_openquery
+            + "') AS resp"
         )
 
     def _get_window_range(self):
@@ -217,16 +255,8 @@ class LoadResponseTime(MixinGetDataset, Pipeline):
 
     @cached_property
     def _node_id_list(self) -> list:
-        """Retorna a lista de NodeIDs filtrados por cliente."""
-        return list(
-            Node.objects.filter(
-                nome_do_cliente__icontains="BRADESCO"
-            ).values_list("node_id", flat=True)
-        )
-
-    def _esc(self, s: str) -> str:
-        """Escapa aspas simples para uso em OPENQUERY."""
-        return s.replace("'", "''")
+        """Retorna a lista de NodeIDs filtrados por cliente (cache do processo)."""
+        return bradesco_dimension.node_id_list
 
 
 @shared_task(
@@ -236,6 +266,19 @@ class LoadResponseTime(MixinGetDataset, Pipeline):
     retry_backoff=5,
     retry_kwargs={"max_retries": 3},
 )
-def load_response_time_async(_task, start_date=None, end_date=None) -> Dict:
-    sync_task = LoadResponseTime(start_date=start_date, end_date=end_date)
+def load_response_time_async(
+    _task,
+    start_date=None,
+    end_date=None,
+    parallelism=None,
+    extract_mode=None,
+    load_mode=None,
+) -> Dict:
+    sync_task = LoadResponseTime(
+        start_date=start_date,
+        end_date=end_date,
+        parallelism=parallelism,
+        extract_mode=extract_mode,
+        load_mode=load_mode,
+    )
     return sync_task.run()
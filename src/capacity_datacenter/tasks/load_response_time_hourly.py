@@ -0,0 +1,88 @@
+from typing import Dict
+
+import polars as pl
+from celery import shared_task
+
+from ..models import ResponseTimeHourly
+from ..utils import WindowedOpenQuery, hourly_rollup, node_set_filter, restrict_to
+from .load_response_time import LoadResponseTime
+
+
+class LoadResponseTimeHourly(LoadResponseTime):
+    """Rollup horário do response time (média, máximo, p95 e nº de amostras).
+
+    Usa a mesma janela, `node_set`, modos de carga e log de `LoadResponseTime`, mas
+    agrega por (node_id, date, hour) com `hourly_rollup`, gravando em
+    `f_response_time_hourly`. O limite de 300000 é aplicado na OPENQUERY.
+    """
+
+    model = ResponseTimeHourly
+    incremental_key = ("node_id", "date", "hour")
+    rollup_columns = {
+        "avg_response_time": "avg_response_time_{stat}",
+        "percent_loss": "percent_loss_{stat}",
+    }
+
+    def extract_and_transform_dataset(self) -> pl.DataFrame:
+        """Extrai as amostras por janela e agrega cada janela por hora assim que chega."""
+        self.log["extract_mode"] = "hourly"
+        window_start, end_dt = self._get_window_range()
+        query = WindowedOpenQuery(
+            build_query=self._openquery_hourly,
+            ids=None,
+            start=window_start,
+            end=end_dt,
+            parallelism=self.parallelism,
+            log=self.log,
+            schema={
+                "node_id": pl.String,
+                "hour_start": pl.String,
+                "avg_response_time": pl.Float64,
+                "percent_loss": pl.Float64,
+            },
+        )
+        frames = (
+            frame.pipe(restrict_to, column="node_id", ids=self._node_id_list)
+            for frame in (query.iter_results() if self._node_id_list else [])
+        )
+        self.dataset = hourly_rollup(frames, columns=self.rollup_columns)
+
+    def _openquery_hourly(self, window_start, window_end, batch) -> str:
+        """Consulta OPENQUERY de uma janela com a hora de cada amostra."""
+        inner_query = (
+            "SELECT\n"
+            "    resp.NodeID,\n"
+            "    CONVERT(VARCHAR(13), resp.DateTime, 120) AS HourStart,\n"
+            "    CASE WHEN resp.AvgResponseTime > 300000 THEN 300000 "
+            "ELSE resp.AvgResponseTime END AS AvgResponseTime,\n"
+            "    resp.PercentLoss\n"
+            "FROM [BR_TD_VITAIT].dbo.[ResponseTime] resp\n"
+            f"WHERE {node_set_filter('resp.NodeID', self.node_set)}\n"
+            f"AND resp.DateTime >= '{window_start.strftime('%Y-%m-%d %H:%M:%S')}'\n"
+            f"AND resp.DateTime < '{window_end.strftime('%Y-%m-%d %H:%M:%S')}'"
+        )
+        inner_for_openquery = inner_query.replace("'", "''")
+        return (
+            "SELECT NodeID, HourStart, AvgResponseTime, PercentLoss FROM OPENQUERY([172.21.3.221], '"
+            + inner_for_openquery
+            + "') AS resp"
+        )
+
+
+@shared_task(
+    name="capacity_datacenter.load_response_time_hourly_async",
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_backoff=5,
+    retry_kwargs={"max_retries": 3},
+)
+def load_response_time_hourly_async(
+    _task, start_date=None, end_date=None, parallelism=None, load_mode=None
+) -> Dict:
+    sync_task = LoadResponseTimeHourly(
+        start_date=start_date,
+        end_date=end_date,
+        parallelism=parallelism,
+        load_mode=load_mode,
+    )
+    return sync_task.run()
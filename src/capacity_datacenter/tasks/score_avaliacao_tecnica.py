@@ -0,0 +1,173 @@
+from datetime import datetime, timedelta
+from typing import Dict
+
+import polars as pl
+from celery import shared_task
+from django.utils import timezone as _tz
+
+from app.utils import MixinGetDataset, Pipeline
+
+from ..models import (
+    AvaliacaoTecnica,
+    AvaliacaoTecnicaNode,
+    CustomPollerStatistics,
+    Node,
+    ResponseTime,
+)
+from ..utils import MixinTaskLog, regiao_expr, score_node_days, tecnologia_expr
+
+
+class ScoreAvaliacaoTecnica(MixinTaskLog, MixinGetDataset, Pipeline):
+    """Aplica as faixas de `AvaliacaoTecnica` às medidas diárias de cada node.
+
+    - latência: `ResponseTime.avg_response_time`
+    - perda de pacote: `ResponseTime.percent_loss`
+    - jitter: `CustomPollerStatistics.raw_status`
+
+    Faixas, nodes e medidas do intervalo são lidos uma vez cada; a classificação de
+    todos os node/dia é feita em um único `join_asof` (`score_node_days`) e gravada em
+    `f_avaliacao_tecnica_node` (DELETE do intervalo + INSERT).
+    """
+
+    load_backend = "fast"
+
+    def __init__(self, start_date=None, end_date=None):
+        super().__init__()
+        if start_date is None or end_date is None:
+            # mesmo intervalo padrão dos loaders de fato
+            start_date = datetime.now().date() - timedelta(days=3)
+            end_date = start_date + timedelta(days=1)
+        self.start_date = start_date
+        self.end_date = end_date
+
+    def run(self) -> Dict:
+        """Método principal da classe"""
+        with self.task_log():
+            with self.phase("extract_transform"):
+                self.extract_and_transform_dataset()
+            self.load(
+                dataset=self.dataset,
+                model=AvaliacaoTecnicaNode,
+                filtro={"date__gte": self.start_date, "date__lte": self.end_date},
+            )
+        return self.log
+
+    def extract_and_transform_dataset(self) -> pl.DataFrame:
+        """Extrai e transforma o dataset principal."""
+        started = _tz.now()
+        measures = (
+            self._response_time.join(
+                self._jitter, on=["node_id", "date"], how="full", coalesce=True
+            )
+            .join(self._nodes, on="node_id", how="left")
+        )
+        self.dataset = score_node_days(measures=measures, bands=self._bands)
+        self.log["n_node_days"] = len(self.dataset)
+        self.log["n_scored"] = self.dataset.filter(
+            pl.col("nota_total").is_not_null()
+        ).height
+        self.log["score_duration"] = round((_tz.now() - started).total_seconds(), 2)
+        print(
+            f"...{self.log['n_scored']} DE {self.log['n_node_days']} NODE/DIA "
+            f"AVALIADOS EM {self.log['score_duration']}s..."
+        )
+
+    @property
+    def _bands(self) -> pl.DataFrame:
+        """Todas as faixas de `AvaliacaoTecnica` (uma consulta)."""
+        return pl.DataFrame(
+            list(
+                AvaliacaoTecnica.objects.values_list(
+                    "tecnologia",
+                    "regiao",
+                    "criterio",
+                    "faixa_min",
+                    "classificacao",
+                    "nota",
+                )
+            ),
+            schema={
+                "tecnologia": pl.String,
+                "regiao": pl.String,
+                "criterio": pl.String,
+                "faixa_min": pl.Float64,
+                "classificacao": pl.String,
+                "nota": pl.Int64,
+            },
+            orient="row",
+        )
+
+    @property
+    def _nodes(self) -> pl.DataFrame:
+        """Tecnologia e região (Capital/Interior) de cada node."""
+        return (
+            pl.DataFrame(
+                list(Node.objects.values_list("node_id", "tecnologia", "cidade")),
+                schema={
+                    "node_id": pl.String,
+                    "tecnologia": pl.String,
+                    "cidade": pl.String,
+                },
+                orient="row",
+            )
+            .unique(subset=["node_id"], keep="first")
+            .select(
+                "node_id",
+                tecnologia_expr("tecnologia").alias("tecnologia"),
+                regiao_expr("cidade").alias("regiao"),
+            )
+        )
+
+    @property
+    def _response_time(self) -> pl.DataFrame:
+        """Latência e perda de pacote por node/dia no intervalo."""
+        return pl.DataFrame(
+            list(
+                ResponseTime.objects.filter(**self._date_filter).values_list(
+                    "node_id", "date", "avg_response_time", "percent_loss"
+                )
+            ),
+            schema={
+                "node_id": pl.String,
+                "date": pl.Date,
+                "latencia": pl.String,
+                "perda_pacote": pl.String,
+            },
+            orient="row",
+        ).with_columns(
+            pl.col("latencia").cast(pl.Float64, strict=False),
+            pl.col("perda_pacote").cast(pl.Float64, strict=False),
+        )
+
+    @property
+    def _jitter(self) -> pl.DataFrame:
+        """Jitter (`raw_status` do custom poller) por node/dia no intervalo."""
+        return (
+            pl.DataFrame(
+                list(
+                    CustomPollerStatistics.objects.filter(
+                        **self._date_filter
+                    ).values_list("node_id", "date", "raw_status")
+                ),
+                schema={"node_id": pl.String, "date": pl.Date, "jitter": pl.Float64},
+                orient="row",
+            )
+            .group_by(["node_id", "date"])
+            .agg(pl.col("jitter").mean().round(2))
+        )
+
+    @property
+    def _date_filter(self) -> Dict:
+        return {"date__gte": self.start_date, "date__lte": self.end_date}
+
+
+@shared_task(
+    name="capacity_datacenter.score_avaliacao_tecnica_async",
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_backoff=5,
+    retry_kwargs={"max_retries": 3},
+)
+def score_avaliacao_tecnica_async(_task, start_date=None, end_date=None) -> Dict:
+    sync_task = ScoreAvaliacaoTecnica(start_date=start_date, end_date=end_date)
+    return sync_task.run()
@@ -0,0 +1,13 @@
+from .avaliacao_tecnica import (
+    CRITERIOS,
+    regiao_expr,
+    score_node_days,
+    tecnologia_expr,
+)
+from .dimension_cache import BradescoDimension, bradesco_dimension
+from .hourly_rollup import hourly_rollup
+from .incremental_load import MixinIncrementalLoad
+from .node_set import NODE_SETS, node_set_filter, restrict_to
+from .partial_aggregates import merge_partial_means, partial_schema
+from .task_log import MixinTaskLog
+from .windowed_openquery import ConnectionPool, WindowedOpenQuery
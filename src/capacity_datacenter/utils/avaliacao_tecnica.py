@@ -0,0 +1,159 @@
+from typing import Dict
+
+import polars as pl
+
+# medida do node/dia -> `AvaliacaoTecnica.Criterio` (valor gravado na tabela de faixas)
+CRITERIOS: Dict[str, str] = {
+    "latencia": "Latência",
+    "jitter": "Jitter",
+    "perda_pacote": "Perda de Pacote",
+}
+
+# palavra-chave (texto normalizado de `Node.tecnologia`) -> `AvaliacaoTecnica.Tecnologia`
+TECNOLOGIAS = (
+    ("SATELITE", "Banda Larga Satélite"),
+    ("MOVEL", "Banda Larga Móvel"),
+    ("FIXA", "Banda Larga Fixa"),
+    ("DEDICADO", "IP Dedicado"),
+    ("MPLS", "MPLS"),
+)
+
+# capitais (texto normalizado de `Node.cidade`); as demais cidades são "Interior"
+CAPITAIS = frozenset(
+    [
+        "ARACAJU",
+        "BELEM",
+        "BELO HORIZONTE",
+        "BOA VISTA",
+        "BRASILIA",
+        "CAMPO GRANDE",
+        "CUIABA",
+        "CURITIBA",
+        "FLORIANOPOLIS",
+        "FORTALEZA",
+        "GOIANIA",
+        "JOAO PESSOA",
+        "MACAPA",
+        "MACEIO",
+        "MANAUS",
+        "NATAL",
+        "PALMAS",
+        "PORTO ALEGRE",
+        "PORTO VELHO",
+        "RECIFE",
+        "RIO BRANCO",
+        "RIO DE JANEIRO",
+        "SALVADOR",
+        "SAO LUIS",
+        "SAO PAULO",
+        "TERESINA",
+        "VITORIA",
+    ]
+)
+
+# letras acentuadas (maiúsculas) e as respectivas sem acento
+_ACENTUADAS = "ÁÀÂÃÉÊÍÓÔÕÚÜÇ"
+_SEM_ACENTO = "AAAAEEIOOOUUC"
+
+
+def normalize_text(column: str) -> pl.Expr:
+    """Maiúsculas, sem acentos e sem espaços nas pontas."""
+    return (
+        pl.col(column)
+        .str.to_uppercase()
+        .str.strip_chars()
+        .str.replace_many(list(_ACENTUADAS), list(_SEM_ACENTO))
+    )
+
+
+def tecnologia_expr(column: str = "tecnologia") -> pl.Expr:
+    """Mapeia o texto livre de `Node.tecnologia` para a tecnologia das faixas (ou null)."""
+    normalized = normalize_text(column)
+    expr = pl.lit(None, dtype=pl.String)
+    for keyword, label in reversed(TECNOLOGIAS):
+        expr = pl.when(normalized.str.contains(keyword, literal=True)).then(
+            pl.lit(label)
+        ).otherwise(expr)
+    return expr
+
+
+def regiao_expr(column: str = "cidade") -> pl.Expr:
+    """Capital/Interior a partir de `Node.cidade` (null quando a cidade não é informada)."""
+    normalized = normalize_text(column)
+    return (
+        pl.when(normalized.is_null() | (normalized == ""))
+        .then(pl.lit(None, dtype=pl.String))
+        .when(normalized.is_in(list(CAPITAIS)))
+        .then(pl.lit("Capital"))
+        .otherwise(pl.lit("Interior"))
+    )
+
+
+def score_node_days(measures: pl.DataFrame, bands: pl.DataFrame) -> pl.DataFrame:
+    """Classifica todas as medidas de uma vez com um `join_asof` nas faixas.
+
+    - `measures`: `node_id`, `date`, `tecnologia`, `regiao` e uma coluna por medida de
+      `CRITERIOS` (`latencia`, `jitter`, `perda_pacote`).
+    - `bands`: linhas de `AvaliacaoTecnica` (`tecnologia`, `regiao`, `criterio`,
+      `faixa_min`, `classificacao`, `nota`).
+
+    Cada valor recebe a faixa de maior `faixa_min` <= valor dentro do mesmo
+    (tecnologia, região, critério); valores entre o fim de uma faixa e o início da
+    seguinte (ex.: 30.5 entre 0-30 e 31-60) ficam na faixa de baixo. Devolve uma linha
+    por node/dia com `classificacao_<medida>`, `nota_<medida>` e `nota_total`.
+    """
+    keys = ["node_id", "date", "tecnologia", "regiao"]
+    medidas = list(CRITERIOS)
+    long = (
+        measures.unpivot(
+            index=keys, on=medidas, variable_name="medida", value_name="valor"
+        )
+        .with_columns(pl.col("medida").replace_strict(CRITERIOS).alias("criterio"))
+        .filter(pl.col("valor").is_not_null() & pl.col("tecnologia").is_not_null())
+        .sort("valor")
+    )
+    bands = (
+        bands.select(
+            pl.col("tecnologia").cast(pl.String),
+            pl.col("regiao").cast(pl.String),
+            pl.col("criterio").cast(pl.String),
+            pl.col("faixa_min").cast(pl.Float64),
+            pl.col("classificacao").cast(pl.String),
+            pl.col("nota").cast(pl.Int64),
+        )
+        .sort("faixa_min")
+    )
+    scored = long.join_asof(
+        bands,
+        left_on="valor",
+        right_on="faixa_min",
+        by=["tecnologia", "regiao", "criterio"],
+        strategy="backward",
+    )
+
+    result = measures.select(keys + medidas)
+    if not scored.is_empty():
+        wide = scored.pivot(
+            on="medida", index=["node_id", "date"], values=["classificacao", "nota"]
+        )
+        result = result.join(wide, on=["node_id", "date"], how="left")
+    for medida in medidas:
+        for prefix, dtype in (("classificacao", pl.String), ("nota", pl.Int64)):
+            name = f"{prefix}_{medida}"
+            if name not in result.columns:
+                result = result.with_columns(pl.lit(None, dtype=dtype).alias(name))
+    notas = [pl.col(f"nota_{m}") for m in medidas]
+    return result.with_columns(
+        pl.when(pl.any_horizontal([n.is_not_null() for n in notas]))
+        .then(pl.sum_horizontal(notas))
+        .otherwise(None)
+        .alias("nota_total")
+    ).select(
+        keys
+        + [
+            c
+            for m in medidas
+            for c in (m, f"classificacao_{m}", f"nota_{m}")
+        ]
+        + ["nota_total"]
+    )
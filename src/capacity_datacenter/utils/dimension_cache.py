@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+# validade (s) do cache no processo; 0 = só expira via `invalidate()`.
+# Outros processos (workers Celery) que rodem LoadNode não invalidam este cache.
+DIMENSION_TTL_SECONDS = int(os.getenv("CAPACITY_DIMENSION_TTL_SECONDS", "3600"))
+
+# quantos node_id's por consulta `node_id__in` no CustomPollerAssignment
+DIMENSION_BATCH_SIZE = 500
+
+
+class BradescoDimension:
+    """Cache em memória (por processo) dos nodes BRADESCO e dos seus CustomPollerAssignments.
+
+    Os três valores usados pelos loaders de fato são calculados juntos, uma vez só:
+    - `node_id_list`: node_id's com `nome_do_cliente` contendo BRADESCO;
+    - `assignment_id_list`: CustomPollerAssignmentIDs desses nodes (sem repetição);
+    - `assignment_id_map`: {assignment_id (str): node_id}.
+
+    A lista e o mapa saem da mesma passada em lotes sobre `CustomPollerAssignment`.
+    `invalidate()` é chamado ao final de `LoadNode` e `LoadCustomPollerAssignment`;
+    a leitura seguinte recalcula tudo. O acesso é protegido por lock (threads dos
+    loaders em paralelo).
+    """
+
+    def __init__(self, ttl_seconds: int = DIMENSION_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._values: Optional[Dict] = None
+        self._loaded_at = 0.0
+
+    @property
+    def node_id_list(self) -> List[str]:
+        return self._get()["node_id_list"]
+
+    @property
+    def assignment_id_list(self) -> list:
+        return self._get()["assignment_id_list"]
+
+    @property
+    def assignment_id_map(self) -> Dict[str, str]:
+        return self._get()["assignment_id_map"]
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._values = None
+        print("...CACHE DE DIMENSÕES BRADESCO INVALIDADO...")
+
+    def _get(self) -> Dict:
+        with self._lock:
+            expired = (
+                self.ttl_seconds
+                and time.monotonic() - self._loaded_at > self.ttl_seconds
+            )
+            if self._values is None or expired:
+                self._values = self._load()
+                self._loaded_at = time.monotonic()
+            return self._values
+
+    def _load(self) -> Dict:
+        from ..models import CustomPollerAssignment, Node
+
+        started = time.perf_counter()
+        node_id_list = list(
+            Node.objects.filter(nome_do_cliente__icontains="BRADESCO").values_list(
+                "node_id", flat=True
+            )
+        )
+        assignment_ids = []
+        assignment_id_map = {}
+        for i in range(0, len(node_id_list), DIMENSION_BATCH_SIZE):
+            batch = node_id_list[i : i + DIMENSION_BATCH_SIZE]
+            qs = CustomPollerAssignment.objects.filter(node_id__in=batch).values_list(
+                "custom_poller_assignment_id", "node_id"
+            )
+            for aid, node in qs:
+                assignment_ids.append(aid)
+                if aid is not None:
+                    assignment_id_map[str(aid)] = node
+        print(
+            f"...CACHE DE DIMENSÕES BRADESCO: {len(node_id_list)} NODES, "
+            f"{len(assignment_id_map)} ASSIGNMENTS EM "
+            f"{round(time.perf_counter() - started, 2)}s..."
+        )
+        return {
+            "node_id_list": node_id_list,
+            "assignment_id_list": list(dict.fromkeys(assignment_ids)),
+            "assignment_id_map": assignment_id_map,
+        }
+
+
+# instância compartilhada por todos os loaders do processo
+bradesco_dimension = BradescoDimension()
@@ -0,0 +1,65 @@
+from typing import Dict, Iterable
+
+import polars as pl
+
+# quantil usado nos rollups horários
+ROLLUP_QUANTILE = 0.95
+
+
+def hourly_rollup(
+    frames: Iterable[pl.DataFrame],
+    columns: Dict[str, str],
+    hour_column: str = "hour_start",
+) -> pl.DataFrame:
+    """Agrega amostras por (`node_id`, `date`, `hour`): média, máximo, p95 e nº de amostras.
+
+    - `frames`: resultados da extração por janela (`WindowedOpenQuery.iter_results`), com
+      `node_id`, `hour_start` (`YYYY-MM-DD HH`) e as colunas de métrica.
+    - `columns`: {coluna de origem: modelo do nome de saída com `{stat}`}, ex.:
+      `{"in_average_bps": "in_{stat}_bps"}` -> `in_mean_bps`, `in_max_bps`, `in_p95_bps`.
+
+    Como as janelas começam em hora cheia, cada hora cai inteira em uma única janela: cada
+    frame é agregado (lazy, em streaming) assim que chega e o p95 é exato, sem manter
+    todas as amostras do intervalo em memória.
+    """
+    aggregations = [pl.len().cast(pl.Int64).alias("n_samples")]
+    for column, template in columns.items():
+        aggregations += [
+            pl.col(column).mean().round(2).alias(template.format(stat="mean")),
+            pl.col(column).max().round(2).alias(template.format(stat="max")),
+            pl.col(column)
+            .quantile(ROLLUP_QUANTILE, interpolation="linear")
+            .round(2)
+            .alias(template.format(stat="p95")),
+        ]
+    keys = ["node_id", "date", "hour"]
+
+    rollups = []
+    for frame in frames:
+        if frame.is_empty():
+            continue
+        rollups.append(
+            frame.lazy()
+            .with_columns(
+                pl.col(hour_column).str.slice(0, 10).str.to_date("%Y-%m-%d").alias("date"),
+                pl.col(hour_column).str.slice(11, 2).cast(pl.Int16).alias("hour"),
+            )
+            .group_by(keys)
+            .agg(aggregations)
+            .collect(streaming=True)
+        )
+    if not rollups:
+        return pl.DataFrame(
+            schema={
+                "node_id": pl.String,
+                "date": pl.Date,
+                "hour": pl.Int16,
+                "n_samples": pl.Int64,
+                **{
+                    template.format(stat=stat): pl.Float64
+                    for template in columns.values()
+                    for stat in ("mean", "max", "p95")
+                },
+            }
+        )
+    return pl.concat(rollups, how="vertical").sort(keys)
@@ -0,0 +1,36 @@
+from typing import Iterable
+
+import polars as pl
+
+# Conjuntos de ids definidos no próprio servidor remoto ([172.21.3.221]), com o mesmo
+# critério das cargas de dimensão (LoadNode / LoadCustomPollerAssignment). A OPENQUERY é
+# pass-through e não enxerga tabelas temporárias locais, então o conjunto entra como
+# semi-join remoto em vez de uma lista IN montada em string a cada janela × lote.
+NODE_SETS = {
+    "bradesco_nodes": (
+        "SELECT nodes.NodeID FROM [BR_TD_VITAIT].dbo.[Nodes] nodes "
+        "WHERE nodes.Nome_do_cliente LIKE '%BRADESCO%'"
+    ),
+    "bradesco_assignments": (
+        "SELECT poller.CustomPollerAssignmentID "
+        "FROM [BR_TD_VITAIT].dbo.[CustomPollerAssignment] poller "
+        "INNER JOIN [BR_TD_VITAIT].dbo.[Nodes] nodes ON poller.NodeID = nodes.NodeID "
+        "WHERE nodes.Nome_do_cliente LIKE '%BRADESCO%'"
+    ),
+}
+
+
+def node_set_filter(column: str, node_set: str) -> str:
+    """Condição `column IN (<conjunto remoto>)` para o WHERE da consulta interna da OPENQUERY."""
+    return f"{column} IN ({NODE_SETS[node_set]})"
+
+
+def restrict_to(
+    dataset: pl.DataFrame, column: str, ids: Iterable[str]
+) -> pl.DataFrame:
+    """Mantém só as linhas cujos ids estão no conjunto local (tabelas Node / CustomPollerAssignment)."""
+    if dataset.is_empty():
+        return dataset
+    return dataset.filter(
+        pl.col(column).is_in(pl.Series([str(i) for i in ids], dtype=pl.String))
+    )
@@ -0,0 +1,53 @@
+from typing import List
+
+import polars as pl
+
+
+def partial_schema(keys: List[str], columns: List[str]) -> dict:
+    """Schema das linhas parciais vindas da OPENQUERY: chaves, `<col>_sum` e `<col>_count`."""
+    schema = {k: pl.String for k in keys}
+    for c in columns:
+        schema[f"{c}_sum"] = pl.Float64
+        schema[f"{c}_count"] = pl.Int64
+    return schema
+
+
+def merge_partial_means(
+    partials: pl.DataFrame, keys: List[str], columns: List[str]
+) -> pl.DataFrame:
+    """Combina agregados parciais (SUM/COUNT por janela) na média final por `keys`.
+
+    A média de cada coluna é `sum(<col>_sum) / sum(<col>_count)`, que é exatamente a
+    média das amostras originais (valores NULL não entram no COUNT nem no SUM).
+    """
+    if partials.is_empty():
+        return pl.DataFrame(
+            schema={
+                **{k: pl.String for k in keys},
+                **{c: pl.Float64 for c in columns},
+            }
+        )
+    return (
+        partials.group_by(keys)
+        .agg(
+            [
+                pl.col(f"{c}_sum").sum().alias(f"{c}_sum")
+                for c in columns
+            ]
+            + [
+                pl.col(f"{c}_count").sum().alias(f"{c}_count")
+                for c in columns
+            ]
+        )
+        .select(
+            keys
+            + [
+                pl.when(pl.col(f"{c}_count") > 0)
+                .then(pl.col(f"{c}_sum") / pl.col(f"{c}_count"))
+                .round(2)
+                .alias(c)
+                for c in columns
+            ]
+        )
+        .sort(keys)
+    )
@@ -0,0 +1,124 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from django.utils import timezone as _tz
+
+# chave do `self.log` (preenchida pelo Pipeline / WindowedOpenQuery) -> coluna do TaskLog
+PHASE_COLUMNS = {
+    "extract_duration": "extract_seconds",
+    "transform_duration": "transform_seconds",
+    "delete_duration": "delete_seconds",
+    "insert_duration": "insert_seconds",
+}
+
+
+class MixinTaskLog:
+    """Instrumentação padrão das Pipelines do capacity_datacenter, gravada no `TaskLog`.
+
+    Substitui a contabilidade de início/fim/duração repetida em cada `run()`:
+
+        def run(self):
+            with self.task_log():
+                with self.phase("extract_transform"):
+                    self.extract_and_transform_dataset()
+                self.load(...)
+            return self.log
+
+    Ao sair do bloco (com sucesso ou erro) é criado um `TaskLog` com o `log` completo e as
+    colunas estruturadas: `status`, `finished_at`, `duration_seconds`, tempo de cada fase
+    (extract/transform/delete/insert), `rows_read`, `rows_written`, `bytes_fetched` e
+    `rows_per_second` (linhas gravadas por segundo de execução).
+    """
+
+    @contextmanager
+    def phase(self, name: str):
+        """Mede um trecho do `run()` e guarda em `self.log[f"{name}_duration"]`."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.log[f"{name}_duration"] = round(time.perf_counter() - started, 2)
+
+    @contextmanager
+    def task_log(self):
+        self.log["start_time"] = self.log.get("start_time") or _tz.now()
+        self.log["started_at"] = self.log["start_time"]
+        status = "error"
+        try:
+            yield
+            status = "success"
+        finally:
+            self.log["status"] = status
+            self.log["end_time"] = self.log["finished_at"] = _tz.now()
+            self.log["duration_seconds"] = self.log["duration"] = round(
+                (self.log["end_time"] - self.log["start_time"]).total_seconds(), 2
+            )
+            dataset = getattr(self, "dataset", None)
+            if dataset is not None:
+                self.log["transformed_rows_count"] = len(dataset)
+            self._split_extract_transform()
+            self._insert_duration()
+            self.save_task_log()
+
+    def save_task_log(self):
+        from ..models import TaskLog
+
+        log = self.log
+        rows_written = (log.get("n_inserted") or 0) + (log.get("n_updated") or 0)
+        duration = log.get("duration_seconds")
+        return TaskLog.objects.create(
+            task_name=self.__class__.__name__,
+            run_at=log["start_time"],
+            log=serializable(log),
+            status=log.get("status"),
+            finished_at=log.get("finished_at"),
+            duration_seconds=duration,
+            rows_read=log.get("rows_fetched"),
+            rows_written=rows_written,
+            bytes_fetched=log.get("bytes_fetched"),
+            rows_per_second=(
+                round(rows_written / duration, 2) if duration else None
+            ),
+            **{column: log.get(key) for key, column in PHASE_COLUMNS.items()},
+        )
+
+    def _insert_duration(self) -> None:
+        """`save_duration` (orm / merge) ou staging + troca (`load_backend = "fast"`).
+
+        No caminho "fast" o DELETE roda dentro da troca e não tem tempo próprio.
+        """
+        if "save_duration" in self.log:
+            self.log["insert_duration"] = self.log["save_duration"]
+        elif "stage_duration" in self.log or "swap_duration" in self.log:
+            self.log["insert_duration"] = round(
+                (self.log.get("stage_duration") or 0.0)
+                + (self.log.get("swap_duration") or 0.0),
+                2,
+            )
+
+    def _split_extract_transform(self) -> None:
+        """Transform = fase `extract_transform` menos o tempo das consultas remotas."""
+        total = self.log.get("extract_transform_duration")
+        if total is None:
+            return
+        extract = self.log.get("extract_duration")
+        if extract is None:
+            self.log["extract_duration"] = total
+            extract = total
+        self.log["transform_duration"] = round(max(total - extract, 0.0), 2)
+
+
+def serializable(log: Optional[Dict]) -> Dict:
+    """Cópia do log que pode ser gravada no JSONField (datas em ISO, demais em str)."""
+    serializable_log = {}
+    for k, v in (log or {}).items():
+        if isinstance(v, dict):
+            serializable_log[k] = serializable(v)
+        elif hasattr(v, "isoformat"):
+            serializable_log[k] = v.isoformat()
+        elif v is None or isinstance(v, (str, int, float, bool, list)):
+            serializable_log[k] = v
+        else:
+            serializable_log[k] = str(v)
+    return serializable_log
@@ -0,0 +1,252 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+import polars as pl
+from django.db import connections
+
+from app.utils import fetch_frame
+
+# consultas OPENQUERY simultâneas (= conexões abertas com o SQL Server local)
+OPENQUERY_PARALLELISM = int(os.getenv("CAPACITY_OPENQUERY_PARALLELISM", "4"))
+# timeout (s) de cada consulta; 0 = sem timeout
+OPENQUERY_TIMEOUT = int(os.getenv("CAPACITY_OPENQUERY_TIMEOUT", "0"))
+
+
+class ConnectionPool:
+    """Pool limitado de conexões DB-API próprias (fora do `django.db.connection`).
+
+    As conexões são abertas sob demanda, no máximo `size`, com os mesmos parâmetros do
+    alias `using`, e fechadas em `close()`. Cada thread pega uma conexão exclusiva.
+    """
+
+    def __init__(
+        self, size: int, using: str = "default", timeout: int = OPENQUERY_TIMEOUT
+    ):
+        self.size = max(1, size)
+        self.using = using
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._all = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._all) < self.size:
+                conn = self._connect()
+                self._all.append(conn)
+                return conn
+        return self._idle.get()
+
+    def release(self, conn) -> None:
+        self._idle.put(conn)
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._all:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._all = []
+        self._idle = queue.LifoQueue()
+
+    def _connect(self):
+        wrapper = connections[self.using]
+        conn = wrapper.get_new_connection(wrapper.get_connection_params())
+        if self.timeout and hasattr(conn, "timeout"):
+            conn.timeout = self.timeout  # pyodbc: timeout por consulta
+        return conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class WindowedOpenQuery:
+    """Executa as consultas OPENQUERY de janela × lote em paralelo.
+
+    O intervalo `[start, end)` é dividido em janelas de `window` e a lista `ids` em lotes
+    de `batch_size`; para cada par, `build_query(window_start, window_end, batch)` devolve
+    o SQL. Com `ids=None` (conjunto de ids resolvido na própria consulta, ver
+    `node_set_filter`) há uma única consulta por janela e `batch` é None. As consultas rodam em até `parallelism` conexões próprias (`ConnectionPool`)
+    e os resultados são devolvidos na ordem janela → lote, como no laço sequencial.
+
+    Com `schema`, cada resultado é lido com `fetch_frame` (blocos de `fetchmany` direto para
+    dtypes nativos) e `fetch_frame()` devolve um único `pl.DataFrame` tipado.
+
+    O tempo de cada consulta fica em `self.timings` e o resumo é acumulado em `log`
+    (`n_queries`, `query_seconds_total`, `query_seconds_max`, `extract_duration`,
+    `rows_fetched`, `bytes_fetched`), somando as várias extrações de uma mesma execução
+    (ex.: assinaturas + dias do modo incremental). `bytes_fetched` é o tamanho estimado
+    dos DataFrames lidos (só com `schema`).
+    """
+
+    def __init__(
+        self,
+        build_query: Callable[[datetime, datetime, Optional[List[str]]], str],
+        ids: Optional[Sequence[str]],
+        start: datetime,
+        end: datetime,
+        window: timedelta = timedelta(hours=2),
+        batch_size: int = 500,
+        parallelism: Optional[int] = None,
+        using: str = "default",
+        log: Optional[Dict] = None,
+        schema: Optional[Dict[str, pl.DataType]] = None,
+    ):
+        self.build_query = build_query
+        self.ids = None if ids is None else list(ids)
+        self.start = start
+        self.end = end
+        self.window = window
+        self.batch_size = batch_size
+        self.parallelism = parallelism or OPENQUERY_PARALLELISM
+        self.using = using
+        self.log = log if log is not None else {}
+        self.schema = schema
+        self.timings: List[Dict] = []
+
+    @property
+    def windows(self) -> List[tuple]:
+        windows = []
+        window_start = self.start
+        while window_start < self.end:
+            window_end = min(window_start + self.window, self.end)
+            windows.append((window_start, window_end))
+            window_start = window_end
+        return windows
+
+    @property
+    def batches(self) -> List[Optional[List[str]]]:
+        if self.ids is None:
+            return [None]
+        return [
+            self.ids[i : i + self.batch_size]
+            for i in range(0, len(self.ids), self.batch_size)
+        ]
+
+    @property
+    def jobs(self) -> List[tuple]:
+        batches = self.batches
+        return [
+            (window_start, window_end, n, batch)
+            for window_start, window_end in self.windows
+            for n, batch in enumerate(batches, start=1)
+        ]
+
+    def iter_results(self) -> Iterator[Union[List[tuple], pl.DataFrame]]:
+        """Gera o resultado de cada consulta (linhas ou DataFrame), na ordem das janelas e lotes."""
+        jobs = self.jobs
+        if not jobs:
+            return
+        started = time.perf_counter()
+        parallelism = max(1, min(self.parallelism, len(jobs)))
+        n_batches = len(self.batches)
+        print(
+            f"...OPENQUERY: {len(jobs)} CONSULTAS ({len(self.windows)} JANELAS x "
+            f"{n_batches} LOTES) COM {parallelism} CONEXÕES..."
+        )
+        with ConnectionPool(size=parallelism, using=self.using) as pool:
+
+            def run(job):
+                window_start, window_end, n, batch = job
+                sql = self.build_query(window_start, window_end, batch)
+                conn = pool.acquire()
+                try:
+                    t0 = time.perf_counter()
+                    cursor = conn.cursor()
+                    try:
+                        cursor.execute(sql)
+                        if self.schema is not None:
+                            rows = fetch_frame(cursor, schema=self.schema)
+                        else:
+                            rows = [tuple(r) for r in cursor.fetchall()]
+                    finally:
+                        cursor.close()
+                    seconds = round(time.perf_counter() - t0, 3)
+                finally:
+                    pool.release(conn)
+                n_bytes = rows.estimated_size() if self.schema is not None else 0
+                self._record(window_start, n, n_batches, len(rows), seconds, n_bytes)
+                return rows
+
+            with ThreadPoolExecutor(max_workers=parallelism) as executor:
+                yield from executor.map(run, jobs)
+
+        self._summarize(time.perf_counter() - started, parallelism)
+
+    def fetch_rows(self) -> List[tuple]:
+        """Todas as linhas de todas as consultas em uma única lista."""
+        rows = []
+        for result in self.iter_results():
+            rows.extend(result)
+        self.log["collected_rows_count"] = len(rows)
+        return rows
+
+    def fetch_frame(self) -> pl.DataFrame:
+        """Resultado de todas as consultas em um único `pl.DataFrame` com `self.schema`."""
+        if self.schema is None:
+            raise ValueError("WindowedOpenQuery.fetch_frame exige `schema`")
+        frames = list(self.iter_results())
+        dataset = (
+            pl.concat(frames, how="vertical", rechunk=True)
+            if frames
+            else pl.DataFrame(schema=self.schema)
+        )
+        self.log["collected_rows_count"] = len(dataset)
+        return dataset
+
+    def _record(
+        self,
+        window_start: datetime,
+        n: int,
+        n_batches: int,
+        rows: int,
+        seconds: float,
+        n_bytes: int = 0,
+    ) -> None:
+        self.timings.append(
+            {
+                "window_start": window_start,
+                "batch": n,
+                "rows": rows,
+                "seconds": seconds,
+                "bytes": n_bytes,
+            }
+        )
+        print(
+            f"...JANELA {window_start:%Y-%m-%d %H:%M} LOTE {n}/{n_batches}: "
+            f"{rows:,} LINHAS EM {seconds}s...".replace(",", ".")
+        )
+
+    def _summarize(self, elapsed: float, parallelism: int) -> None:
+        seconds = [t["seconds"] for t in self.timings]
+        log = self.log
+        log["openquery_parallelism"] = parallelism
+        log["n_queries"] = log.get("n_queries", 0) + len(seconds)
+        log["query_seconds_total"] = round(
+            log.get("query_seconds_total", 0.0) + sum(seconds), 2
+        )
+        log["query_seconds_max"] = max([log.get("query_seconds_max", 0.0)] + seconds)
+        log["extract_duration"] = round(log.get("extract_duration", 0.0) + elapsed, 2)
+        log["rows_fetched"] = log.get("rows_fetched", 0) + sum(
+            t["rows"] for t in self.timings
+        )
+        log["bytes_fetched"] = log.get("bytes_fetched", 0) + sum(
+            t["bytes"] for t in self.timings
+        )
+        print(
+            f"...EXTRAÇÃO: {len(seconds)} CONSULTAS EM {round(elapsed, 2)}s "
+            f"(SOMA DAS CONSULTAS {round(sum(seconds), 2)}s)..."
+        )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from ...utils import cep_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera o índice local de CEPs (Arrow) a partir da base dos correios, "
+        "se a origem mudou desde o último snapshot"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Refaz o snapshot mesmo sem mudança na origem",
+        )
+
+    def handle(self, *args, **options):
+        rebuilt = cep_index.refresh(force=options["force"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Índice de CEPs {'gerado' if rebuilt else 'já atualizado'}: "
+                f"{len(cep_index.frame()):,} CEPs em {cep_index.path}"
+            )
+        )
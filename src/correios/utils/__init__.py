@@ -0,0 +1 @@
+from .cep_lookup import CepIndex, cep_index
@@ -0,0 +1,275 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Optional, TypeVar
+
+import polars as pl
+from django.conf import settings
+from django.db.models import Count, Max
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+Frame = TypeVar("Frame", pl.DataFrame, pl.LazyFrame)
+
+# diretório do snapshot (arquivo Arrow + manifesto com a assinatura da origem)
+CEP_INDEX_DIR = os.getenv(
+    "CORREIOS_CEP_INDEX_DIR",
+    str(Path(settings.BASE_DIR) / "correios_cep_index"),
+)
+# intervalo mínimo (s) entre duas conferências da assinatura da origem no processo
+CEP_INDEX_CHECK_SECONDS = int(os.getenv("CORREIOS_CEP_INDEX_CHECK_SECONDS", "3600"))
+# idade máxima (dias) do snapshot, mesmo sem mudança na assinatura; 0 = sem limite
+CEP_INDEX_MAX_AGE_DAYS = int(os.getenv("CORREIOS_CEP_INDEX_MAX_AGE_DAYS", "30"))
+# linhas por lote na exportação de `tbl_cep_n_logradouro`
+CEP_INDEX_EXPORT_BATCH = 50000
+
+SCHEMA = {
+    "cep": pl.String,
+    "logradouro": pl.String,
+    "bairro": pl.String,
+    "cidade": pl.String,
+    "cidade_sem_acento": pl.String,
+    "estado": pl.String,
+}
+
+
+class CepIndex:
+    """Índice local CEP -> logradouro/bairro/cidade/UF da base dos correios.
+
+    As tabelas `tbl_cep_n_logradouro`, `tbl_cep_n_bairro` e `tbl_cep_n_cidade` são
+    exportadas (já com os joins) para um arquivo Arrow IPC com uma linha por CEP.
+    O arquivo é lido com memory map, então os processos da mesma máquina
+    compartilham as páginas, e as cargas resolvem os CEPs com um join vetorizado
+    em vez de consultas `cep__in` em lotes.
+
+    O snapshot é refeito só quando a assinatura da origem muda (quantidade de
+    linhas e maior id de cada tabela), conferida no máximo a cada
+    `check_seconds`, ou quando fica mais velho que `max_age_days` (pega
+    alterações que não mudam a assinatura). Cada snapshot é um arquivo novo,
+    apontado pelo manifesto (trocado de forma atômica): um arquivo mapeado por
+    outro processo não precisa ser sobrescrito, só é apagado quando possível.
+    A geração roda sob um lock de arquivo entre processos: quem espera relê o
+    manifesto e usa o snapshot que o outro processo acabou de gerar.
+    """
+
+    def __init__(
+        self,
+        directory: str = CEP_INDEX_DIR,
+        check_seconds: int = CEP_INDEX_CHECK_SECONDS,
+        max_age_days: int = CEP_INDEX_MAX_AGE_DAYS,
+    ):
+        self.directory = Path(directory)
+        self.check_seconds = check_seconds
+        self.max_age_days = max_age_days
+        self._lock = threading.Lock()
+        self._frame: Optional[pl.DataFrame] = None
+        self._loaded_path: Optional[Path] = None
+        self._checked_at = 0.0
+
+    @property
+    def path(self) -> Optional[Path]:
+        """Arquivo do snapshot atual (None se ainda não foi gerado)."""
+        manifest = self._read_manifest()
+        return self.directory / manifest["file"] if manifest else None
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.directory / "manifest.json"
+
+    def frame(self) -> pl.DataFrame:
+        """Snapshot atual (uma linha por CEP), refeito antes se a origem mudou."""
+        with self._lock:
+            if (
+                self._frame is None
+                or time.monotonic() - self._checked_at > self.check_seconds
+            ):
+                self._refresh()
+                # o snapshot pode ter sido refeito por outro processo
+                path = self.path
+                if self._frame is None or path != self._loaded_path:
+                    self._frame = pl.read_ipc(path, memory_map=True)
+                    self._loaded_path = path
+                self._checked_at = time.monotonic()
+            return self._frame
+
+    def join(
+        self, df: Frame, columns: Dict[str, str], on: str = "cep"
+    ) -> Frame:
+        """Left join de `df` com o índice pela coluna `on`.
+
+        `columns` = {coluna do índice: nome no resultado}. Funciona com DataFrame e
+        LazyFrame (o índice entra no mesmo tipo de `df`).
+        """
+        index = self.frame().select(
+            pl.col("cep").alias(on),
+            *[pl.col(c).alias(n) for c, n in columns.items()],
+        )
+        if isinstance(df, pl.LazyFrame):
+            index = index.lazy()
+        return df.join(index, on=on, how="left")
+
+    def lookup(self, ceps: Iterable[str]) -> pl.DataFrame:
+        """Linhas do índice dos CEPs informados (CEPs ausentes não aparecem)."""
+        ceps = pl.Series("cep", list(ceps), dtype=pl.String).unique()
+        return self.frame().join(ceps.to_frame(), on="cep", how="semi")
+
+    def refresh(self, force: bool = False) -> bool:
+        """Refaz o snapshot se a origem mudou (ou sempre, com `force`)."""
+        with self._lock:
+            return self._refresh(force=force)
+
+    def _refresh(self, force: bool = False) -> bool:
+        signature = self._source_signature()
+        if not force and self._is_current(self._read_manifest(), signature):
+            return False
+        with self._file_lock():
+            # outro processo pode ter refeito o snapshot enquanto esperávamos
+            if not force and self._is_current(self._read_manifest(), signature):
+                return False
+            self._frame = None
+            self._build(signature)
+            self._remove_old_snapshots()
+        return True
+
+    def _is_current(self, manifest: Optional[dict], signature: dict) -> bool:
+        if manifest is None or manifest["signature"] != signature:
+            return False
+        if (
+            self.max_age_days
+            and time.time() - manifest["built_at"] > self.max_age_days * 86400
+        ):
+            return False
+        return (self.directory / manifest["file"]).exists()
+
+    @contextmanager
+    def _file_lock(self):
+        """Lock entre processos (arquivo `.lock` no diretório do snapshot)."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / ".lock", "a+b") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:  # LK_LOCK desiste depois de ~10s
+                        continue
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _build(self, signature: dict) -> None:
+        from ..models import TblCepNLogradouro
+
+        print("...EXPORTANDO A BASE DE CEPS DOS CORREIOS PARA O ÍNDICE LOCAL...")
+        started = time.perf_counter()
+        rows = (
+            TblCepNLogradouro.objects.using("correios")
+            .exclude(cep__isnull=True)
+            .order_by("cep", "id")
+            .values_list(
+                "cep",
+                "logradouro",
+                "bairro__bairro",
+                "cidade__cidade",
+                "cidade__cidade_sem_acento",
+                "estado",
+            )
+            .iterator(chunk_size=CEP_INDEX_EXPORT_BATCH)
+        )
+        batches = []
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == CEP_INDEX_EXPORT_BATCH:
+                batches.append(pl.DataFrame(batch, schema=SCHEMA, orient="row"))
+                batch = []
+        batches.append(pl.DataFrame(batch, schema=SCHEMA, orient="row"))
+        # CEPs repetidos na origem duplicariam as linhas no join; fica o de menor id
+        frame = (
+            pl.concat(batches)
+            .unique(subset="cep", keep="first", maintain_order=True)
+            .rechunk()
+        )
+
+        built_at = time.time()
+        file_name = f"cep-{int(built_at * 1000)}-{os.getpid()}.arrow"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        frame.write_ipc(self.directory / file_name, compression="uncompressed")
+        tmp_manifest = self.manifest_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_manifest.write_text(
+            json.dumps(
+                {
+                    "file": file_name,
+                    "signature": signature,
+                    "built_at": built_at,
+                    "rows": len(frame),
+                }
+            )
+        )
+        os.replace(tmp_manifest, self.manifest_path)
+        print(
+            f"...ÍNDICE DE CEPS GERADO: {len(frame)} CEPS EM "
+            f"{time.perf_counter() - started:.1f}s..."
+        )
+
+    def _remove_old_snapshots(self) -> None:
+        """Apaga os snapshots gerados antes do atual (nunca um mais novo)."""
+        manifest = self._read_manifest()
+        if manifest is None:
+            return
+        for old in self.directory.glob("cep-*.arrow"):
+            if self._built_ms(old) < self._built_ms(self.directory / manifest["file"]):
+                try:
+                    old.unlink()
+                except OSError:  # ainda mapeado por outro processo (Windows)
+                    pass
+
+    @staticmethod
+    def _built_ms(path: Path) -> int:
+        """Instante de geração (ms) gravado no nome `cep-<ms>-<pid>.arrow`."""
+        try:
+            return int(path.stem.split("-")[1])
+        except (IndexError, ValueError):
+            return 0
+
+    def _read_manifest(self) -> Optional[dict]:
+        try:
+            return json.loads(self.manifest_path.read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    @staticmethod
+    def _source_signature() -> dict:
+        """Quantidade de linhas e maior id de cada tabela usada no índice."""
+        from ..models import TblCepNBairro, TblCepNCidade, TblCepNLogradouro
+
+        signature = {}
+        for model, pk in (
+            (TblCepNLogradouro, "id"),
+            (TblCepNBairro, "id_bairro"),
+            (TblCepNCidade, "id_cidade"),
+        ):
+            values = model.objects.using("correios").aggregate(
+                n=Count(pk), max_id=Max(pk)
+            )
+            signature[model._meta.db_table] = [values["n"], values["max_id"]]
+        return signature
+
+
+# instância compartilhada pelas cargas no processo
+cep_index = CepIndex()
@@ -9,7 +9,7 @@ import requests
 from celery import shared_task
 
 from app.utils import MixinGetDataset, Pipeline
-from correios.models import TblCepNLogradouro
+from correios.utils import cep_index
 from power_bi.models.solar_nome_operadora_correto import (
     SolarNomeOperadoraCorreto,
 )
@@ -27,7 +27,12 @@ class LoadMerakiDeviceInventario(MixinGetDataset, MixinQuerys, Pipeline):
     def run(self) -> None:
         """Método principal da classe"""
         self.extract_and_transform_dataset()
-        self.load(dataset=self.dataset, model=DeviceInventario, filtro={})
+        self.load(
+            dataset=self.dataset,
+            model=DeviceInventario,
+            filtro={},
+            mode="swap",
+        )
         return self.log
 
     def extract_and_transform_dataset(self) -> pl.DataFrame:
@@ -345,31 +350,15 @@ class LoadMerakiDeviceInventario(MixinGetDataset, MixinQuerys, Pipeline):
         return None
 
     def _add_endereco_columns(self, df: pl.DataFrame) -> pl.DataFrame:
-        """Adiciona coluna de endereco_dict ao DataFrame usando a tabela de correios, via list comprehension."""
-        ceps = (
-            df.drop_nulls(subset="cep")
-            .select("cep")
-            .unique()
-            .to_series()
-            .to_list()
-        )
-        enderecos = []
-        for i in range(0, len(ceps), 1000):
-            lote = [c for c in ceps[i : i + 1000] if c]
-            qs = TblCepNLogradouro.objects.filter(cep__in=lote).values(
-                "logradouro",
-                "bairro__bairro",
-                "cidade__cidade",
-                "estado",
-                "cep",
-            )
-            enderecos.extend(list(qs))
-        return df.join(pl.DataFrame(enderecos), on="cep", how="left").rename(
+        """Adiciona as colunas de endereço pelo CEP, usando o índice local da base dos correios."""
+        return cep_index.join(
+            df,
             {
-                "bairro__bairro": "bairro",
-                "cidade__cidade": "cidade",
                 "logradouro": "endereco",
-            }
+                "bairro": "bairro",
+                "cidade": "cidade",
+                "estado": "estado",
+            },
         )
 
     def _select_final_columns(self, df: pl.DataFrame) -> pl.DataFrame:
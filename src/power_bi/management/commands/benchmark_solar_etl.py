@@ -0,0 +1,284 @@
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import polars as pl
+from django.core.management.base import BaseCommand
+
+from correios.utils import CepIndex
+
+from ...tasks import LoadInterfaceVGR
+from ...utils.solar.sae_resolver import SAEIdResolver
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+OPERADORAS = ["Claro", "Vivo", "Oi", "Embratel", "TIM", "Algar", "Level 3"]
+TECNOLOGIAS = ["MPLS", "IP Dedicado", "Banda Larga", "SD-WAN", "4G"]
+STATUS = ["RFS Faturável", "RFS Técnico", "Cancelado", "Em Instalação", None]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark do ETL de interfaces do Solar (LoadInterfaceVGR.transform_dataset): "
+        "modo eager x lazy, tempo e pico de memória em um dump sintético, sem "
+        "acessar o banco nem o SAE"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=200000)
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument(
+            "--dump",
+            help="Parquet com um dump real de SolarInterfaceOriginal (ignora --rows)",
+        )
+        parser.add_argument(
+            "--mode",
+            choices=["eager", "lazy", "dump"],
+            help=(
+                "Executa só um modo e imprime o resultado em JSON, ou grava o "
+                "dump sintético em --dump (uso interno)"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if options["mode"] == "dump":
+            self._fake_dump(options["rows"]).write_parquet(options["dump"])
+            return
+        if options["mode"]:
+            result = self._run_mode(
+                options["mode"], options["dump"], options["repeat"]
+            )
+            self.stdout.write(json.dumps(result))
+            return
+
+        # tudo roda em processos filhos: o ru_maxrss de um filho começa no RSS do
+        # pai, então o pai não pode crescer (nem gerando o dump sintético)
+        dump = options["dump"]
+        if dump is None:
+            fd, dump = tempfile.mkstemp(suffix=".parquet")
+            os.close(fd)
+            self._subprocess("dump", dump, rows=options["rows"])
+        results = {}
+        try:
+            for mode in ("eager", "lazy"):
+                results[mode] = json.loads(
+                    self._subprocess(mode, dump, repeat=options["repeat"])
+                    .strip()
+                    .splitlines()[-1]
+                )
+        finally:
+            if options["dump"] is None:
+                os.remove(dump)
+
+        eager, lazy = results["eager"], results["lazy"]
+        for mode, result in results.items():
+            peak = (
+                f"{result['peak_mb']:,.0f} MB"
+                if result["peak_mb"] is not None
+                else "n/d"
+            )
+            self.stdout.write(
+                f"{mode:<5}: {result['seconds']:.3f}s, pico +{peak} "
+                f"({result['rows']:,} linhas)"
+            )
+        if eager["checksum"] != lazy["checksum"]:
+            self.stdout.write(self.style.ERROR("Resultados diferentes!"))
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Resultados idênticos. Ganho de tempo: "
+                f"{eager['seconds'] / lazy['seconds']:.1f}x"
+            )
+        )
+
+    @staticmethod
+    def _subprocess(mode: str, dump: str, **options) -> str:
+        args = [sys.executable, sys.argv[0], "benchmark_solar_etl"]
+        args += ["--mode", mode, "--dump", dump]
+        for name, value in options.items():
+            args += [f"--{name}", str(value)]
+        return subprocess.run(
+            args, capture_output=True, text=True, check=True
+        ).stdout
+
+    def _run_mode(self, mode: str, path: str, repeat: int) -> dict:
+        dump = pl.read_parquet(path)
+        loader = _OfflineLoadInterfaceVGR(
+            company_remedy_list=[], nome_cliente_list=[], frame_mode=mode
+        )
+        loader._cep_index = _OfflineCepIndex(dump)
+        baseline = self._max_rss_mb()
+        best = None
+        for _ in range(repeat):
+            loader.dataset = dump
+            started = time.perf_counter()
+            loader.transform_dataset()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        peak = self._max_rss_mb()
+        return {
+            "mode": mode,
+            "rows": len(loader.dataset),
+            "seconds": best,
+            "peak_mb": None if peak is None else peak - baseline,
+            "checksum": int(
+                loader.dataset.drop("historico_ids").hash_rows().sum()
+            ),
+        }
+
+    @staticmethod
+    def _max_rss_mb():
+        if resource is None:
+            return None
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    def _fake_dump(self, rows: int) -> pl.DataFrame:
+        """Interfaces no formato de `SolarInterfaceOriginal` (textos sujos, N/A, etc.)."""
+        rnd = random.Random(42)
+
+        def talvez(valor, vazio=0.15):
+            if rnd.random() < vazio:
+                return rnd.choice(["N/A", "", None, "null"])
+            return valor
+
+        def texto_livre():
+            partes = [
+                rnd.choice(["Gi0/1", "Te1/0/2", "Se0/0", "Po10"]),
+                rnd.choice(
+                    ["", rnd.choice(OPERADORAS).upper(), "link", "mpls"]
+                ),
+                f"  {rnd.randint(1, 999)}MB ",
+            ]
+            return " ".join(partes)
+
+        data = []
+        for i in range(rows):
+            data.append(
+                {
+                    "id": i,
+                    "nome_cliente": f"CLIENTE {rnd.randint(1, 2000)}",
+                    "company_remedy": f"COMPANY {rnd.randint(1, 500)}",
+                    "razao_social": talvez(f"RAZAO {rnd.randint(1, 2000)} LTDA"),
+                    "grupo_corporativo": talvez(f"GRUPO {rnd.randint(1, 100)}"),
+                    "id_vgr": talvez(str(rnd.randint(1000000, 1999999)), 0.1),
+                    "designador": f"DSG-{rnd.randint(1, 10**6)}",
+                    "operadora": talvez(rnd.choice(OPERADORAS).lower(), 0.4),
+                    "nome_operadora": talvez(rnd.choice(OPERADORAS)),
+                    "nome_operadora_atual": talvez(rnd.choice(OPERADORAS)),
+                    "tecnologia": talvez(rnd.choice(TECNOLOGIAS)),
+                    "cep": talvez(
+                        f"{rnd.randint(1000, 99999):05d}-{rnd.randint(0, 999):03d}"
+                    ),
+                    "velocidade": f"{rnd.choice([2, 10, 50, 100, 1000])} Mbps",
+                    "banda_contratada_entrada": str(rnd.randint(1, 1000)),
+                    "status_vantive": rnd.choice(STATUS),
+                    "interface_id": str(rnd.randint(1, 10**7)),
+                    "ip_interface": (
+                        f"10.{rnd.randint(0, 255)}.{rnd.randint(0, 255)}"
+                        f".{rnd.randint(1, 254)}"
+                    ),
+                    "ip_node": f"10.{rnd.randint(0, 255)}.{rnd.randint(0, 255)}.1",
+                    "description": texto_livre(),
+                    "interface_name": texto_livre(),
+                    "caption": texto_livre(),
+                    "nome_interface": texto_livre(),
+                }
+            )
+        return pl.DataFrame(data, infer_schema_length=None)
+
+
+class _OfflineSAEIdResolver(SAEIdResolver):
+    """Resolver com um SAE sintético em memória (sem linked server nem cache)."""
+
+    def __init__(self):
+        super().__init__(lineage_cache=None)
+
+    def fetch(self, ids) -> None:
+        for id_vgr in ids:
+            if id_vgr in self._sae:
+                continue
+            n = int(id_vgr)
+            # ~1/3 dos ids migraram para outro id já ativo
+            self._sae[id_vgr] = (
+                (str(n + 1), "RFS Faturável")
+                if n % 3 == 0
+                else (None, "Cancelado")
+            )
+
+
+class _OfflineLoadInterfaceVGR(LoadInterfaceVGR):
+    """LoadInterfaceVGR com as tabelas de/para e os lookups externos sintéticos."""
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.__dict__["sae_resolver"] = _OfflineSAEIdResolver()
+        self._cep_index = None
+
+    @property
+    def nome_operadora_correto(self) -> pl.DataFrame:
+        return pl.DataFrame(
+            {
+                "operadora": [o.lower() for o in OPERADORAS],
+                "nome_correto": OPERADORAS,
+            }
+        )
+
+    @property
+    def nome_tecnologia_correto(self) -> pl.DataFrame:
+        return pl.DataFrame(
+            {
+                "tecnologia": TECNOLOGIAS,
+                "nome_correto": [t.upper() for t in TECNOLOGIAS],
+            }
+        )
+
+    @property
+    def nome_cliente_correto(self) -> pl.DataFrame:
+        return pl.DataFrame(
+            {
+                "nome_cliente": [f"RAZAO {i} LTDA" for i in range(1, 2001, 7)],
+                "nome_correto": [
+                    f"CLIENTE CORRETO {i}" for i in range(1, 2001, 7)
+                ],
+            }
+        )
+
+    @property
+    def cep_index(self) -> CepIndex:
+        return self._cep_index
+
+
+class _OfflineCepIndex(CepIndex):
+    """Índice de CEPs sintético com os CEPs do próprio dump."""
+
+    def __init__(self, dump: pl.DataFrame):
+        super().__init__()
+        self._frame = (
+            dump.select(pl.col("cep").cast(pl.String).str.replace("-", ""))
+            .drop_nulls()
+            .unique()
+            .with_columns(
+                pl.lit(None, pl.String).alias("logradouro"),
+                pl.lit(None, pl.String).alias("bairro"),
+                pl.format("MUNICIPIO {}", pl.col("cep").str.slice(0, 3)).alias(
+                    "cidade"
+                ),
+            )
+            .with_columns(
+                pl.col("cidade").alias("cidade_sem_acento"),
+                pl.when(pl.col("cep").str.slice(0, 1) < "5")
+                .then(pl.lit("SP"))
+                .otherwise(pl.lit("RJ"))
+                .alias("estado"),
+            )
+        )
+
+    def frame(self) -> pl.DataFrame:
+        return self._frame
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.10 on 2026-10-18 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('power_bi', '0021_alter_solarinterface_interface_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SaeLineageCache',
+            fields=[
+                ('id', models.AutoField(db_column='id', primary_key=True, serialize=False)),
+                ('id_vgr', models.CharField(db_collation='SQL_Latin1_General_CP1_CI_AS', db_column='id_vgr', max_length=255, unique=True)),
+                ('novo_id_vgr', models.CharField(blank=True, db_collation='SQL_Latin1_General_CP1_CI_AS', db_column='novo_id_vgr', max_length=255, null=True)),
+                ('status_vantive', models.CharField(blank=True, db_collation='SQL_Latin1_General_CP1_CI_AS', db_column='status_vantive', max_length=255, null=True)),
+                ('historico_ids', models.JSONField(db_column='historico_ids', default=list)),
+                ('fetched_at', models.DateTimeField(db_column='fetched_at')),
+            ],
+            options={
+                'db_table': 'sae_lineage_cache',
+            },
+        ),
+    ]
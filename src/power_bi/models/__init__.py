@@ -1,3 +1,4 @@
+from .sae_lineage_cache import SaeLineageCache
 from .solar_interface import SolarInterface
 from .solar_interface_original import SolarInterfaceOriginal
 from .solar_node import SolarNode
@@ -0,0 +1,33 @@
+from django.db import models
+
+
+class SaeLineageCache(models.Model):
+    """Cadeia de ids do SAE já resolvida para um id_vgr (ver `SAELineageCache`)."""
+
+    id = models.AutoField(db_column="id", primary_key=True)
+    id_vgr = models.CharField(
+        db_column="id_vgr",
+        max_length=255,
+        db_collation="SQL_Latin1_General_CP1_CI_AS",
+        unique=True,
+    )
+    novo_id_vgr = models.CharField(
+        db_column="novo_id_vgr",
+        max_length=255,
+        db_collation="SQL_Latin1_General_CP1_CI_AS",
+        blank=True,
+        null=True,
+    )
+    status_vantive = models.CharField(
+        db_column="status_vantive",
+        max_length=255,
+        db_collation="SQL_Latin1_General_CP1_CI_AS",
+        blank=True,
+        null=True,
+    )
+    historico_ids = models.JSONField(default=list, db_column="historico_ids")
+    fetched_at = models.DateTimeField(db_column="fetched_at")
+
+    class Meta:
+        db_table = "sae_lineage_cache"
+        app_label = "power_bi"
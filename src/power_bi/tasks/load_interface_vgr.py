@@ -10,10 +10,14 @@ from ..utils import MixinETLSolar
 class LoadInterfaceVGR(Pipeline, MixinETLSolar):
     """Extrai, transforma e carrega os dados de Interfaces."""
 
+    load_backend = "fast"
+
     def __init__(self, **kwargs) -> None:
         super().__init__()
         self.company_remedy_list = kwargs.get("company_remedy_list")
         self.nome_cliente_list = kwargs.get("nome_cliente_list")
+        # "eager" ou "lazy" (ver `MixinETL.aplicar_etapas`)
+        self.frame_mode = kwargs.get("frame_mode") or self.frame_mode
 
     @property
     def _filtro(self) -> dict:
@@ -46,7 +50,10 @@ class LoadInterfaceVGR(Pipeline, MixinETLSolar):
             )
         print("...DATASET PRONTO PARA SER INSERIDO NO BANCO!...")
         self.load(
-            dataset=self.dataset, model=SolarInterface, filtro=self._filtro
+            dataset=self.dataset,
+            model=SolarInterface,
+            filtro=self._filtro,
+            mode="swap",
         )
         print("...FINALIZANDO A PIPELINE...")
         return self.log
@@ -65,21 +72,26 @@ class LoadInterfaceVGR(Pipeline, MixinETLSolar):
 
     def transform_dataset(self) -> None:
         """Extrai e transforma o dataset principal incluindo log de IDs antigos."""
-        self.dataset = (
-            self.dataset.pipe(self.limpar_texto)
-            .pipe(self.corrigir_operadoras)
-            .pipe(self.corrigir_tecnologias)
-            .pipe(self.corrigir_nome_cliente)
-            .pipe(self.get_uf_and_municipio)
-            .pipe(self.get_novo_id_vgr)
-            .pipe(self.selecionar_colunas)
+        self.dataset = self.aplicar_etapas(
+            self.dataset,
+            self.limpar_texto,
+            self.corrigir_operadoras,
+            self.corrigir_tecnologias,
+            self.corrigir_nome_cliente,
+            self.get_uf_and_municipio,
+            self.get_novo_id_vgr,
+            self.selecionar_colunas,
         )
 
     def corrigir_operadoras(self, df: pl.DataFrame) -> pl.DataFrame:
         """Corrige o nome das operadores conforme a tabela [SolarNomeOperadoraCorreto] e tenta buscar o nome da operadora em outras colunas."""
         print("...BUSCANDO E CORRIGINDO OS NOMES DE OPERADORAS...")
         return (
-            df.join(self.nome_operadora_correto, how="left", on="operadora")
+            df.join(
+                self._mesmo_tipo(df, self.nome_operadora_correto),
+                how="left",
+                on="operadora",
+            )
             .with_columns(
                 pl.when(pl.col("nome_correto").is_null())
                 .then(pl.col("operadora"))
@@ -94,36 +106,8 @@ class LoadInterfaceVGR(Pipeline, MixinETLSolar):
                     )
                 )
                 .then(
-                    pl.col("interface_name").map_elements(
-                        self.encontrar_operadora, return_dtype=str | None
-                    )
-                )
-                .otherwise(pl.col("operadora"))
-                .alias("operadora")
-            )
-            .with_columns(
-                pl.when(
-                    pl.col("operadora").is_in(
-                        [None, "N/A", "Null", "null", "None", "n/a"]
-                    )
-                )
-                .then(
-                    pl.col("caption").map_elements(
-                        self.encontrar_operadora, return_dtype=str | None
-                    )
-                )
-                .otherwise(pl.col("operadora"))
-                .alias("operadora")
-            )
-            .with_columns(
-                pl.when(
-                    pl.col("operadora").is_in(
-                        [None, "N/A", "Null", "null", "None", "n/a"]
-                    )
-                )
-                .then(
-                    pl.col("nome_interface").map_elements(
-                        self.encontrar_operadora, return_dtype=str | None
+                    self.encontrar_operadora_expr(
+                        "interface_name", "caption", "nome_interface"
                     )
                 )
                 .otherwise(pl.col("operadora"))
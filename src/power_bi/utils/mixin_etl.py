@@ -1,11 +1,54 @@
+from typing import Callable, TypeVar
+
 import polars as pl
 from django.db import connection
 
+Frame = TypeVar("Frame", pl.DataFrame, pl.LazyFrame)
+
 
 class MixinETL:
     """Classe que define como será o etl dos datasets do Solar."""
 
-    def limpar_texto(self, df: pl.DataFrame) -> pl.DataFrame:
+    # "eager": cada etapa materializa um DataFrame; "lazy": as etapas de
+    # `aplicar_etapas` formam um único plano (LazyFrame) coletado uma vez
+    frame_mode = "eager"
+
+    def aplicar_etapas(
+        self, df: pl.DataFrame, *etapas: Callable
+    ) -> pl.DataFrame:
+        """Aplica as etapas do ETL em sequência (`df.pipe(etapa)`).
+
+        No modo "lazy" as etapas recebem e devolvem `LazyFrame`; o plano inteiro
+        (com projection pushdown até as colunas da última etapa) é executado em um
+        único `collect()`. As etapas que precisam de valores do dataset para
+        consultar o banco (CEPs, ids do SAE) são barreiras: materializam o plano
+        até ali (`_materializar`) e seguem lazy a partir do resultado.
+        """
+        if self.frame_mode != "lazy":
+            for etapa in etapas:
+                df = df.pipe(etapa)
+            return df
+        lazy = df.lazy()
+        for etapa in etapas:
+            lazy = lazy.pipe(etapa)
+        print("...EXECUTANDO O PLANO LAZY DO ETL...")
+        return lazy.collect()
+
+    @staticmethod
+    def _mesmo_tipo(df: Frame, other: pl.DataFrame) -> Frame:
+        """`other` como LazyFrame quando `df` é lazy (para joins/concat)."""
+        return other.lazy() if isinstance(df, pl.LazyFrame) else other
+
+    @staticmethod
+    def _coletar(df: Frame) -> pl.DataFrame:
+        return df.collect() if isinstance(df, pl.LazyFrame) else df
+
+    @staticmethod
+    def _materializar(df: Frame) -> Frame:
+        """Executa o plano até aqui, para a consulta e o join não o recalcularem."""
+        return df.collect().lazy() if isinstance(df, pl.LazyFrame) else df
+
+    def limpar_texto(self, df: Frame) -> Frame:
         """Limpa o texto das colunas que tem texto."""
         print("...LIMPANDO OS TEXTO DE TODAS AS COLUNAS...")
         return df.select(
@@ -29,7 +72,7 @@ class MixinETL:
                 )
                 .str.strip_chars()
                 .str.replace(r"\s+", " ")
-                for col in df.columns
+                for col in df.collect_schema().names()
             ]
         ).with_columns(pl.col("cep").str.replace("-", ""))
 
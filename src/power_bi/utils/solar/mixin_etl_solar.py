@@ -1,11 +1,14 @@
-import re
+from functools import cached_property
 from itertools import islice
 
 import polars as pl
-from django.db import connection
+
+from correios.utils import CepIndex, cep_index
 
 from ..mixin_etl import MixinETL
 from .mixin_get_dataset_solar import MixinGetDatasetSolar
+from .operadora_matcher import OperadoraMatcher
+from .sae_resolver import STATUS_FINAIS, SAEIdResolver
 
 
 class MixinETLSolar(MixinETL, MixinGetDatasetSolar):
@@ -15,36 +18,30 @@ class MixinETLSolar(MixinETL, MixinGetDatasetSolar):
         """Implementar o método main retornando um DataFrame"""
         raise NotImplementedError("Subclass must implement this method")
 
-    def encontrar_operadora(self, nome_interface: str) -> str | None:
-        """Busca o nome de operadora em outras colunas e corrige o nome com o de x para"""
-        if nome_interface in (
-            "",
-            None,
-            "Null",
-            "null",
-            " ",
-            "none",
-            "None",
-            "-",
-            "N/A",
-            "#N/A",
-        ):
-            return None
-        operadoras_corretas = (
+    @cached_property
+    def operadora_matcher(self) -> OperadoraMatcher:
+        """Regex única com todos os nomes corretos de operadora (compilada uma vez por carga)."""
+        return OperadoraMatcher(
             self.nome_operadora_correto["nome_correto"].unique().to_list()
         )
-        for operadora in operadoras_corretas:
-            if re.search(
-                rf"\b{re.escape(operadora)}\b", nome_interface, re.IGNORECASE
-            ):
-                return operadora
-        return None
+
+    def encontrar_operadora(self, nome_interface: str) -> str | None:
+        """Busca o nome de operadora em outras colunas e corrige o nome com o de x para"""
+        return self.operadora_matcher.match(nome_interface)
+
+    def encontrar_operadora_expr(self, *colunas: str) -> pl.Expr:
+        """Versão vetorizada de `encontrar_operadora`: primeiro acerto entre as `colunas`."""
+        return self.operadora_matcher.coalesce(*colunas)
 
     def corrigir_tecnologias(self, df: pl.DataFrame) -> pl.DataFrame:
         """Busca o nome da tecnologia no de x para e corrige."""
         print("...BUSCANDO E CORRIGINDO OS NOMES DE TECNOLOGIAS...")
         return (
-            df.join(self.nome_tecnologia_correto, how="left", on="tecnologia")
+            df.join(
+                self._mesmo_tipo(df, self.nome_tecnologia_correto),
+                how="left",
+                on="tecnologia",
+            )
             .with_columns(
                 pl.when(
                     pl.col("nome_correto").is_in(
@@ -86,7 +83,11 @@ class MixinETLSolar(MixinETL, MixinGetDatasetSolar):
                 .otherwise(pl.col("nome_cliente"))
                 .alias("nome_cliente"),
             )
-            .join(self.nome_cliente_correto, how="left", on="nome_cliente")
+            .join(
+                self._mesmo_tipo(df, self.nome_cliente_correto),
+                how="left",
+                on="nome_cliente",
+            )
             .with_columns(
                 pl.when(pl.col("nome_correto").is_null())
                 .then(pl.col("nome_cliente"))
@@ -97,48 +98,27 @@ class MixinETLSolar(MixinETL, MixinGetDatasetSolar):
         )
 
     def get_uf_and_municipio(self, df: pl.DataFrame) -> pl.DataFrame:
-        """Atribui a cidade e a uf com base na lista de CEP's do dataset"""
+        """Atribui a cidade e a uf com base no CEP, pelo índice local da base dos correios."""
         print(
             "...ATRIBUINDO OS DADOS DE UF E MUNICÍPIO DA BASE DOS CORREIOS COM BASE NO CEP DO ID_VGR NO SAE..."
         )
-        cep_list = (
-            df.with_columns(pl.col("cep").cast(pl.String))
-            .select("cep")
-            .filter(~pl.col("cep").is_in(["NULL"]))
-            .drop_nulls()
-            .unique()
-            .to_series()
-            .to_list()
-        )
-        return df.join(
-            self.get_correios_uf_and_municipio(cep_list=cep_list),
-            on="cep",
-            how="left",
+        return self.cep_index.join(
+            df.with_columns(pl.col("cep").cast(pl.String)),
+            {"estado": "uf", "cidade_sem_acento": "municipio"},
         )
 
+    @property
+    def cep_index(self) -> CepIndex:
+        """Índice CEP -> UF/município compartilhado no processo."""
+        return cep_index
+
     def get_correios_uf_and_municipio(self, cep_list: list) -> pl.DataFrame:
         """Retorna os dados de UF e Município com base nos CEP's que ja existem no dataset."""
-        schema = {
-            "cep": {"rename": "cep", "dtype": pl.String},
-            "estado": {"rename": "uf", "dtype": pl.String},
-            "cidade_id__cidade_sem_acento": {
-                "rename": "municipio",
-                "dtype": pl.String,
-            },
-        }
-        resultados = []
-
-        for chunk in self.chunked_iterable(cep_list, 2000):
-            query_set = (
-                self.get_uf_and_municipio_queryset()
-                .filter(cep__in=chunk)
-                .values(*schema.keys())
-            )
-            resultados.append(
-                self.get_dataset(query_set=query_set, schema=schema)
-            )
-
-        return pl.concat(resultados)
+        return self.cep_index.lookup(cep_list).select(
+            "cep",
+            pl.col("estado").alias("uf"),
+            pl.col("cidade_sem_acento").alias("municipio"),
+        )
 
     def chunked_iterable(self, iterable, size):
         """Divide uma lista em partes menores."""
@@ -174,137 +154,87 @@ class MixinETLSolar(MixinETL, MixinGetDatasetSolar):
         )
 
     def get_novo_id_vgr(self, df: pl.DataFrame) -> pl.DataFrame:
-        """Com base nos ID's VGR de cada interface, busca o status correto e o novo ID caso exista."""
+        """Com base nos ID's VGR de cada interface, busca o status correto e o novo ID caso exista.
+
+        Os pares (id_vgr, status_vantive) distintos são resolvidos de uma vez pelo
+        `SAEIdResolver` (uma consulta ao SAE por nível de salto) e o resultado
+        volta ao dataset por join.
+        """
         print(
             "...CORRIGINDO O STATUS VANTIVE E BUSCANDO NOVOS IDS VGR QUANDO EXISTEM...."
         )
 
+        df = self._materializar(df)
+        to_resolve = df.filter(
+            ~pl.col("status_vantive").is_in(list(STATUS_FINAIS))
+            | pl.col("status_vantive").is_null()
+        ).with_columns(
+            pl.when(pl.col("id_vgr").str.contains(r"^[0-9]{7}$"))
+            .then(pl.col("id_vgr"))
+            .otherwise(None)
+            .alias("id_vgr")
+        )
+        pairs = self._coletar(
+            to_resolve.select("id_vgr", "status_vantive").unique()
+        ).iter_rows()
+        resultados = self.sae_resolver.resolve_many(pairs)
+        resolved = pl.DataFrame(
+            {
+                "id_vgr_sae": [id_vgr for id_vgr, _ in resultados],
+                "status_vantive_sae": [status for _, status in resultados],
+                "novo_id_vgr": [r["id_vgr"] for r in resultados.values()],
+                "novo_status_vantive": [
+                    r["status_vantive"] for r in resultados.values()
+                ],
+                "historico_ids": [
+                    r["historico_ids"] for r in resultados.values()
+                ],
+            },
+            schema={
+                "id_vgr_sae": pl.String,
+                "status_vantive_sae": pl.String,
+                "novo_id_vgr": pl.String,
+                "novo_status_vantive": pl.String,
+                "historico_ids": pl.List(pl.Utf8),
+            },
+        )
         new_id_dataframe = (
-            df.filter(
-                ~pl.col("status_vantive").is_in(
-                    ["RFS Faturável", "RFS Técnico"]
-                )
-                | pl.col("status_vantive").is_null()
-            )
-            .with_columns(
-                pl.col("id_vgr").map_elements(
-                    lambda x: x
-                    if isinstance(x, str) and x.isdigit() and len(x) == 7
-                    else None,
-                    return_dtype=pl.String,
-                )
-            )
-            .with_columns(
-                pl.struct(["id_vgr", "status_vantive"])
-                .map_elements(
-                    lambda row: self.get_final_id_vgr(
-                        row["id_vgr"], row["status_vantive"]
-                    ),
-                    return_dtype=pl.Struct,
-                )
-                .alias("novo_valores")
+            to_resolve.join(
+                self._mesmo_tipo(to_resolve, resolved),
+                left_on=["id_vgr", "status_vantive"],
+                right_on=["id_vgr_sae", "status_vantive_sae"],
+                how="left",
+                join_nulls=True,
             )
             .with_columns(
-                pl.col("novo_valores")
-                .struct.field("id_vgr")
-                .cast(str)
-                .alias("id_vgr"),
-                pl.col("novo_valores")
-                .struct.field("status_vantive")
-                .cast(str)
-                .alias("status_vantive"),
-                pl.col("novo_valores")
-                .struct.field("historico_ids")
-                .alias("historico_ids"),
+                pl.col("novo_id_vgr").alias("id_vgr"),
+                pl.col("novo_status_vantive").alias("status_vantive"),
             )
-            .drop("novo_valores")
+            .drop("novo_id_vgr", "novo_status_vantive")
         )
 
         faturavel_and_tecnico_dataset = df.filter(
-            pl.col("status_vantive").is_in(["RFS Faturável", "RFS Técnico"])
+            pl.col("status_vantive").is_in(list(STATUS_FINAIS))
         ).with_columns(
             pl.lit([]).cast(pl.List(pl.Utf8)).alias("historico_ids")
         )
 
         return pl.concat([faturavel_and_tecnico_dataset, new_id_dataframe])
 
+    @cached_property
+    def sae_resolver(self) -> SAEIdResolver:
+        """Resolver das cadeias de id do SAE (memoriza as consultas da carga)."""
+        return SAEIdResolver()
+
     def get_final_id_vgr(self, id_vgr: str, status_vantive: str) -> dict:
         """Busca o ID final iterativamente e mantém um log de IDs."""
-        if id_vgr in (None, "N/A", "AMERICA TOWER - MTR-CORP-3226", "SPO-815"):
-            return {
-                "id_vgr": id_vgr,
-                "status_vantive": status_vantive,
-                "historico_ids": [],
-            }
-
-        if status_vantive in ("RFS Faturável", "RFS Técnico", "Cancelado"):
-            return {
-                "id_vgr": id_vgr,
-                "status_vantive": status_vantive,
-                "historico_ids": [],
-            }
-
-        historico_ids = [id_vgr]
-        while True:
-            result = self.query_sae(id_vgr)
-            novo_id = str(result["novo_id"])
-            novo_status = result["status_vantive"]
-            if novo_id in (None, "None", id_vgr):
-                if status_vantive == novo_status:
-                    return {
-                        "id_vgr": id_vgr,
-                        "status_vantive": status_vantive,
-                        "historico_ids": historico_ids,
-                    }
-                return {
-                    "id_vgr": id_vgr,
-                    "status_vantive": novo_status,
-                    "historico_ids": historico_ids,
-                }
-
-            elif novo_status in ("RFS Faturável", "RFS Técnico"):
-                historico_ids.append(novo_id)
-                return {
-                    "id_vgr": novo_id,
-                    "status_vantive": novo_status,
-                    "historico_ids": historico_ids,
-                }
-
-            historico_ids.append(novo_id)
-            id_vgr = novo_id
+        return self.sae_resolver.resolve(id_vgr, status_vantive)
 
     def query_sae(self, id_vgr: str) -> dict:
-        """Executa a query para buscar o novo ID e seu status e retorna um dicionário."""
-        query = f"""
-            WITH OrderedResults AS (
-                SELECT  
-                    ID_VANTIVE AS id_vgr,  
-                    ID_VANTIVE_PRINCIPAL AS novo_id,  
-                    STATUS_VANTIVE AS status_vantive,  
-                    ROW_NUMBER() OVER (ORDER BY CASE WHEN STATUS_VANTIVE IS NOT NULL THEN 0 ELSE 1 END) AS rn
-                FROM  
-                OPENQUERY([10.128.223.125],  
-                'SELECT *  
-                FROM LK_RELATORIO_12.SAE.SAE.TB_PEDIDOS_DADOS WITH (NOLOCK)  
-                WHERE ID_VANTIVE = ''{id_vgr}''')
-            )
-            SELECT id_vgr, novo_id, status_vantive
-            FROM OrderedResults
-            WHERE rn = 1;
-        """
-        with connection.cursor() as cursor:
-            cursor.execute(query)
-            result = cursor.fetchone()
-
-        if result:
-            return {
-                "id_vgr": result[0],
-                "status_vantive": result[2],
-                "novo_id": result[1],
-            }
-
+        """Busca o novo ID e seu status no SAE e retorna um dicionário."""
+        novo_id, status_vantive = self.sae_resolver.lookup(id_vgr)
         return {
             "id_vgr": id_vgr,
-            "status_vantive": None,
-            "novo_id": None,
+            "status_vantive": status_vantive,
+            "novo_id": novo_id,
         }
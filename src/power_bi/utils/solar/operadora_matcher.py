@@ -0,0 +1,69 @@
+import re
+from typing import Dict, Iterable, Optional
+
+import polars as pl
+
+# valores de texto tratados como "sem informação"
+VALORES_VAZIOS = (
+    "",
+    "Null",
+    "null",
+    " ",
+    "none",
+    "None",
+    "-",
+    "N/A",
+    "#N/A",
+)
+
+
+class OperadoraMatcher:
+    """Encontra o nome de operadora dentro de textos livres em uma única passada.
+
+    Todos os nomes corretos são compilados uma vez em uma alternância
+    `(?i)\\b(nome1|nome2|...)\\b` (nomes mais longos primeiro, para que
+    "Claro Empresas" ganhe de "Claro" na mesma posição). `expr` aplica a regex como
+    `str.extract` nativo do Polars e devolve o nome correto (com a grafia da tabela
+    de/para); `coalesce` testa várias colunas e fica com o primeiro acerto.
+
+    Quando o texto cita mais de uma operadora, vale a que aparece primeiro.
+    """
+
+    def __init__(self, nomes: Iterable[Optional[str]]):
+        nomes = [n for n in dict.fromkeys(nomes) if n and n.strip()]
+        self.canonical: Dict[str, str] = {}
+        for nome in nomes:
+            self.canonical.setdefault(nome.lower(), nome)
+        alternatives = sorted(self.canonical.values(), key=len, reverse=True)
+        self.pattern = (
+            r"(?i)\b(" + "|".join(re.escape(n) for n in alternatives) + r")\b"
+            if alternatives
+            else None
+        )
+        self._regex = re.compile(self.pattern) if self.pattern else None
+
+    def expr(self, column: str) -> pl.Expr:
+        """Nome correto da operadora encontrada em `column` (ou null)."""
+        if self.pattern is None:
+            return pl.lit(None, dtype=pl.String)
+        col = pl.col(column).cast(pl.String)
+        return (
+            pl.when(col.is_in(list(VALORES_VAZIOS)))
+            .then(None)
+            .otherwise(
+                col.str.extract(self.pattern, 1)
+                .str.to_lowercase()
+                .replace_strict(self.canonical, default=None)
+            )
+        )
+
+    def coalesce(self, *columns: str) -> pl.Expr:
+        """Primeira operadora encontrada, testando as colunas na ordem dada."""
+        return pl.coalesce([self.expr(column) for column in columns])
+
+    def match(self, texto: Optional[str]) -> Optional[str]:
+        """Mesma busca de `expr` para um único texto."""
+        if texto in (None,) + VALORES_VAZIOS or self._regex is None:
+            return None
+        found = self._regex.search(texto)
+        return self.canonical.get(found.group(1).lower()) if found else None
@@ -0,0 +1,142 @@
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Dict, Iterable
+
+from django.db import DatabaseError, router, transaction
+from django.utils import timezone
+
+# validade (h) de uma cadeia resolvida; depois disso o id volta a ser consultado no SAE
+SAE_LINEAGE_TTL_HOURS = int(os.getenv("SAE_LINEAGE_TTL_HOURS", "168"))
+# quantas cadeias ficam no LRU em memória do processo
+SAE_LINEAGE_LRU_SIZE = int(os.getenv("SAE_LINEAGE_LRU_SIZE", "100000"))
+# ids por consulta `id_vgr__in` na tabela
+SAE_LINEAGE_BATCH_SIZE = 2000
+
+
+class SAELineageCache:
+    """Cache das cadeias `id_vgr -> novo_id` já resolvidas no SAE.
+
+    Duas camadas, consultadas antes do linked server:
+    - LRU em memória do processo (até `lru_size` ids);
+    - tabela `sae_lineage_cache` no banco power_bi, compartilhada entre processos.
+
+    Cada cadeia guarda `novo_id_vgr`, `status_vantive` final, `historico_ids` e
+    `fetched_at`; cadeias mais velhas que `ttl_hours` contam como ausentes e são
+    resolvidas de novo (com `ttl_hours = 0` o cache não é usado).
+    """
+
+    def __init__(
+        self,
+        ttl_hours: int = SAE_LINEAGE_TTL_HOURS,
+        lru_size: int = SAE_LINEAGE_LRU_SIZE,
+    ):
+        self.ttl_hours = ttl_hours
+        self.lru_size = lru_size
+        self._lock = threading.Lock()
+        self._lru: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get_many(self, ids: Iterable[str]) -> Dict[str, dict]:
+        """Cadeias válidas (dentro do TTL) dos ids, primeiro do LRU e depois da tabela."""
+        if not self.ttl_hours:
+            return {}
+        oldest = timezone.now() - timedelta(hours=self.ttl_hours)
+        found = {}
+        missing = []
+        with self._lock:
+            for id_vgr in dict.fromkeys(ids):
+                entry = self._lru.get(id_vgr)
+                if entry is not None and entry[1] >= oldest:
+                    self._lru.move_to_end(id_vgr)
+                    found[id_vgr] = entry[0]
+                else:
+                    missing.append(id_vgr)
+
+        from ...models import SaeLineageCache
+
+        iterator = iter(missing)
+        while chunk := list(islice(iterator, SAE_LINEAGE_BATCH_SIZE)):
+            rows = SaeLineageCache.objects.filter(
+                id_vgr__in=chunk, fetched_at__gte=oldest
+            ).values_list(
+                "id_vgr",
+                "novo_id_vgr",
+                "status_vantive",
+                "historico_ids",
+                "fetched_at",
+            )
+            for id_vgr, novo_id, status, historico, fetched_at in rows:
+                found[id_vgr] = self._entry(novo_id, status, historico)
+                self._remember(id_vgr, found[id_vgr], fetched_at)
+        return found
+
+    def set_many(self, resolved: Dict[str, dict]) -> None:
+        """Grava (ou renova) as cadeias recém resolvidas na tabela e no LRU.
+
+        Falhar ao gravar na tabela não interrompe a carga: o LRU é atualizado
+        mesmo assim e os ids voltam a ser consultados no SAE em outro processo.
+        """
+        if not resolved or not self.ttl_hours:
+            return
+        fetched_at = timezone.now()
+        for id_vgr, result in resolved.items():
+            self._remember(id_vgr, result, fetched_at)
+        try:
+            self._write(resolved, fetched_at)
+        except DatabaseError as exc:
+            # ex.: LoadInterfaceVGR e LoadNodeVGR gravando os mesmos ids ao mesmo
+            # tempo (IntegrityError no id_vgr único)
+            print(f"...CACHE SAE: FALHA AO GRAVAR AS CADEIAS ({exc!r})...")
+            return
+        print(f"...CACHE SAE: {len(resolved)} CADEIAS GRAVADAS...")
+
+    @staticmethod
+    def _write(resolved: Dict[str, dict], fetched_at: datetime) -> None:
+        from ...models import SaeLineageCache
+
+        using = router.db_for_write(SaeLineageCache)
+        ids = list(resolved)
+        with transaction.atomic(using=using):
+            for i in range(0, len(ids), SAE_LINEAGE_BATCH_SIZE):
+                SaeLineageCache.objects.using(using).filter(
+                    id_vgr__in=ids[i : i + SAE_LINEAGE_BATCH_SIZE]
+                ).delete()
+            SaeLineageCache.objects.using(using).bulk_create(
+                [
+                    SaeLineageCache(
+                        id_vgr=id_vgr,
+                        novo_id_vgr=result["id_vgr"],
+                        status_vantive=result["status_vantive"],
+                        historico_ids=result["historico_ids"],
+                        fetched_at=fetched_at,
+                    )
+                    for id_vgr, result in resolved.items()
+                ],
+                batch_size=SAE_LINEAGE_BATCH_SIZE,
+            )
+
+    def clear(self) -> None:
+        """Esvazia o LRU do processo (a tabela não é alterada)."""
+        with self._lock:
+            self._lru.clear()
+
+    def _remember(self, id_vgr: str, result: dict, fetched_at: datetime) -> None:
+        with self._lock:
+            self._lru[id_vgr] = (result, fetched_at)
+            self._lru.move_to_end(id_vgr)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+
+    @staticmethod
+    def _entry(novo_id, status_vantive, historico_ids) -> dict:
+        return {
+            "id_vgr": novo_id,
+            "status_vantive": status_vantive,
+            "historico_ids": list(historico_ids or []),
+        }
+
+
+# instância compartilhada pelas cargas do Solar no processo
+sae_lineage_cache = SAELineageCache()
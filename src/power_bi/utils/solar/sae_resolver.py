@@ -0,0 +1,168 @@
+import os
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import connection
+
+from .sae_lineage_cache import SAELineageCache, sae_lineage_cache
+
+# status em que a cadeia de ids termina (o id já é o vigente)
+STATUS_FINAIS = ("RFS Faturável", "RFS Técnico")
+# status que não são consultados no SAE
+STATUS_SEM_CONSULTA = STATUS_FINAIS + ("Cancelado",)
+# id_vgr que não são consultados no SAE
+IDS_SEM_CONSULTA = (None, "N/A", "AMERICA TOWER - MTR-CORP-3226", "SPO-815")
+# ids por consulta OPENQUERY (o texto da OPENQUERY é limitado a 8 KB)
+SAE_CHUNK_SIZE = int(os.getenv("SAE_CHUNK_SIZE", "400"))
+
+
+class SAEIdResolver:
+    """Resolve as cadeias `ID_VANTIVE -> ID_VANTIVE_PRINCIPAL` do SAE em lote.
+
+    Em vez de uma OPENQUERY por salto de cada linha, as cadeias são percorridas por
+    nível: todos os ids pendentes de um nível são buscados juntos (em blocos de
+    `chunk_size`) em `TB_PEDIDOS_DADOS`, e cada cadeia avança em memória até
+    chegar a RFS Faturável/Técnico, a um id sem principal ou a um id já visitado.
+
+    As linhas do SAE (`id -> (novo_id, status)`) e as cadeias resolvidas ficam
+    memorizadas na instância, então ids repetidos não voltam ao linked server.
+    Antes de consultar o SAE, as cadeias são procuradas no `lineage_cache` (LRU do
+    processo + tabela `sae_lineage_cache`); só ids ausentes ou vencidos são
+    percorridos, e as cadeias novas são gravadas de volta no cache.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = SAE_CHUNK_SIZE,
+        lineage_cache: Optional[SAELineageCache] = sae_lineage_cache,
+    ):
+        self.chunk_size = chunk_size
+        self.lineage_cache = lineage_cache
+        self._sae: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self._resolved: Dict[Tuple, dict] = {}
+        self.n_queries = 0
+
+    def resolve(self, id_vgr: str, status_vantive: str) -> dict:
+        """Mesmo resultado de `resolve_many` para um único id."""
+        return self.resolve_many([(id_vgr, status_vantive)])[
+            (id_vgr, status_vantive)
+        ]
+
+    def resolve_many(
+        self, pairs: Iterable[Tuple[Optional[str], Optional[str]]]
+    ) -> Dict[Tuple, dict]:
+        """Resolve cada (id_vgr, status_vantive) para o id e status finais.
+
+        Retorna `{(id_vgr, status_vantive): {"id_vgr", "status_vantive",
+        "historico_ids"}}`, com `historico_ids` = ids percorridos (vazio quando o
+        id não é consultado).
+        """
+        pairs = list(dict.fromkeys(pairs))
+        chains = {}
+        for pair in pairs:
+            if pair in self._resolved:
+                continue
+            id_vgr, status_vantive = pair
+            if (
+                id_vgr in IDS_SEM_CONSULTA
+                or status_vantive in STATUS_SEM_CONSULTA
+            ):
+                self._resolved[pair] = {
+                    "id_vgr": id_vgr,
+                    "status_vantive": status_vantive,
+                    "historico_ids": [],
+                }
+            else:
+                chains[pair] = [id_vgr]
+
+        if chains and self.lineage_cache is not None:
+            cached = self.lineage_cache.get_many(
+                historico[0] for historico in chains.values()
+            )
+            for pair in [p for p in chains if p[0] in cached]:
+                self._resolved[pair] = cached[pair[0]]
+                del chains[pair]
+        roots = {pair: historico[0] for pair, historico in chains.items()}
+
+        while chains:
+            self.fetch([historico[-1] for historico in chains.values()])
+            pending = {}
+            for pair, historico in chains.items():
+                atual = historico[-1]
+                novo_id, novo_status = self._sae[atual]
+                if novo_id in (None, "None", atual) or novo_id in historico:
+                    result = (atual, novo_status, historico)
+                elif novo_status in STATUS_FINAIS:
+                    result = (novo_id, novo_status, historico + [novo_id])
+                else:
+                    pending[pair] = historico + [novo_id]
+                    continue
+                self._resolved[pair] = {
+                    "id_vgr": result[0],
+                    "status_vantive": result[1],
+                    "historico_ids": result[2],
+                }
+            chains = pending
+
+        if roots and self.lineage_cache is not None:
+            # a cadeia depende só do id de origem (o status só decide se consulta)
+            self.lineage_cache.set_many(
+                {root: self._resolved[pair] for pair, root in roots.items()}
+            )
+        return {pair: self._resolved[pair] for pair in pairs}
+
+    def lookup(self, id_vgr: str) -> Tuple[Optional[str], Optional[str]]:
+        """(ID_VANTIVE_PRINCIPAL, STATUS_VANTIVE) de um id; (None, None) se não existe."""
+        self.fetch([id_vgr])
+        return self._sae[id_vgr]
+
+    def fetch(self, ids: Iterable[str]) -> None:
+        """Busca no SAE os ids ainda não memorizados (uma consulta por bloco)."""
+        missing = list(dict.fromkeys(i for i in ids if i not in self._sae))
+        iterator = iter(missing)
+        while chunk := list(islice(iterator, self.chunk_size)):
+            with connection.cursor() as cursor:
+                cursor.execute(self._query(chunk))
+                rows = cursor.fetchall()
+            self.n_queries += 1
+            found = {
+                str(id_vgr): (
+                    None if novo_id is None else str(novo_id),
+                    status_vantive,
+                )
+                for id_vgr, novo_id, status_vantive in rows
+            }
+            for id_vgr in chunk:
+                self._sae[id_vgr] = found.get(id_vgr, (None, None))
+        if missing:
+            print(
+                f"...SAE: {len(missing)} IDS CONSULTADOS "
+                f"({self.n_queries} CONSULTAS NO TOTAL)..."
+            )
+
+    @staticmethod
+    def _query(ids: List[str]) -> str:
+        """Uma linha por ID_VANTIVE, preferindo a que tem STATUS_VANTIVE."""
+        in_list = ", ".join(
+            "''" + str(i).replace("'", "''''") + "''" for i in ids
+        )
+        return f"""
+            WITH OrderedResults AS (
+                SELECT
+                    ID_VANTIVE AS id_vgr,
+                    ID_VANTIVE_PRINCIPAL AS novo_id,
+                    STATUS_VANTIVE AS status_vantive,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY ID_VANTIVE
+                        ORDER BY CASE WHEN STATUS_VANTIVE IS NOT NULL THEN 0 ELSE 1 END
+                    ) AS rn
+                FROM
+                OPENQUERY([10.128.223.125],
+                'SELECT ID_VANTIVE, ID_VANTIVE_PRINCIPAL, STATUS_VANTIVE
+                FROM LK_RELATORIO_12.SAE.SAE.TB_PEDIDOS_DADOS WITH (NOLOCK)
+                WHERE ID_VANTIVE IN ({in_list})')
+            )
+            SELECT id_vgr, novo_id, status_vantive
+            FROM OrderedResults
+            WHERE rn = 1;
+        """